@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """module main"""
+
 import argparse
 import logging
 import pathlib
 
 from rtl2gds import flow
 from rtl2gds.chip import Chip
+from rtl2gds.chip.config import Keyword
+from rtl2gds.step import abc_portfolio
+from rtl2gds.utils import compression, progress, watchdog
+from rtl2gds.utils.threads import ThreadBudget
 
 
 def main():
@@ -25,6 +30,174 @@ def main():
         required=True,
         help="design config file",
     )
+    parser.add_argument(
+        "--cache_dir",
+        type=pathlib.Path,
+        default=None,
+        help="step result cache directory, unchanged steps are restored instead of rerun",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=flow.scheduler.DEFAULT_MAX_WORKERS,
+        help="flow steps running at the same time (GDS dumps overlap with P&R), 1 is sequential",
+    )
+    parser.add_argument(
+        "--ieda_session",
+        action="store_true",
+        help="run all P&R steps in one iEDA process that keeps the design database in memory",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the newest valid checkpoint of the config instead of from synthesis",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="log the progress parsed from the tool output (placement iterations, routing stages, "
+        "yosys passes), not available for sweep points",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="threads of each iEDA step, default all cores available to the process "
+        "(a share of them per sweep point), per-step counts go in the THREADS config section",
+    )
+    parser.add_argument(
+        "--compress_intermediates",
+        type=str,
+        default=None,
+        choices=list(compression.CODECS),
+        help="store the DEF/verilog written between P&R steps compressed",
+    )
+    parser.add_argument(
+        "--scratch_dir",
+        type=pathlib.Path,
+        default=None,
+        help="run the steps in a directory below this local path (tmpfs, NVMe) and sync "
+        "their results back to the result dir",
+    )
+    parser.add_argument(
+        "--retention",
+        type=str,
+        default=None,
+        choices=flow.retention.RETENTION_MODES,
+        help="artifacts kept after the run: all, only the final outputs, or also those of "
+        "the newest --keep_checkpoints checkpoints",
+    )
+    parser.add_argument(
+        "--keep_checkpoints",
+        type=int,
+        default=1,
+        help="checkpoints kept by --retention checkpoints",
+    )
+    parser.add_argument(
+        "--hierarchical_synth",
+        action="store_true",
+        help="synthesize each module on its own and reuse the cached netlists of unchanged "
+        "modules",
+    )
+    parser.add_argument(
+        "--abc_portfolio",
+        type=str,
+        nargs="+",
+        default=None,
+        choices=list(abc_portfolio.ABC_RECIPES),
+        help="map the synthesized design with these ABC recipes in parallel and keep the best",
+    )
+    parser.add_argument(
+        "--abc_objective",
+        type=str,
+        default="area",
+        choices=abc_portfolio.OBJECTIVES,
+        help="what --abc_portfolio keeps: the smallest area, or the smallest area meeting "
+        "the clock period (the smallest delay if none does)",
+    )
+    parser.add_argument(
+        "--step_timeout",
+        type=float,
+        default=None,
+        help="wall-clock limit of each tool run in seconds, per-step limits go in the "
+        "WATCHDOG section of the config",
+    )
+    parser.add_argument(
+        "--stall_timeout",
+        type=float,
+        default=None,
+        help="stop a tool that printed nothing and used no CPU for this many seconds",
+    )
+    parser.add_argument(
+        "--step_retries",
+        type=int,
+        default=None,
+        help="rerun a step stopped by the timeout or stall detection up to this many times, "
+        "not with --ieda_session",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    gc_parser = subparsers.add_parser(
+        "gc",
+        help="delete the artifacts of the config's result dir that --retention does not keep",
+    )
+    gc_parser.add_argument(
+        "--dry_run", action="store_true", help="only report what would be deleted"
+    )
+    gc_parser.add_argument(
+        "--delete_failed", action="store_true", help="also collect the result dir of a failed run"
+    )
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="run the flow over a grid or sample of core_util/clk_freq_mhz, "
+        "using the config as the base design",
+    )
+    sweep_parser.add_argument(
+        "--core_util", type=float, nargs="+", help="core utilization values to sweep"
+    )
+    sweep_parser.add_argument(
+        "--clk_freq_mhz", type=float, nargs="+", help="clock frequency values to sweep"
+    )
+    sweep_parser.add_argument(
+        "--sample",
+        type=str,
+        default="grid",
+        choices=flow.sweep.SAMPLE_METHODS,
+        help="grid: every combination of the values, random/lhs: sample between min and max",
+    )
+    sweep_parser.add_argument(
+        "--num_points", type=int, default=0, help="number of points for random/lhs sampling"
+    )
+    sweep_parser.add_argument("--seed", type=int, default=None, help="random/lhs sampling seed")
+    sweep_parser.add_argument(
+        "--sweep_dir",
+        type=pathlib.Path,
+        default=pathlib.Path("rtl2gds_sweep"),
+        help="each point runs in <sweep_dir>/<point name>",
+    )
+    sweep_parser.add_argument(
+        "--parallel",
+        type=int,
+        default=None,
+        help="flows running at the same time, default by available cores and memory",
+    )
+    sweep_parser.add_argument(
+        "--max_core_util",
+        type=float,
+        default=None,
+        help="stop a point whose reported core utilization exceeds this value",
+    )
+    sweep_parser.add_argument(
+        "--min_wns",
+        type=float,
+        default=None,
+        help="stop a point whose WNS (ns) after any step is below this value",
+    )
+    sweep_parser.add_argument(
+        "--max_overflow",
+        type=float,
+        default=None,
+        help="stop a point whose total routing overflow after placement exceeds this value",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -33,10 +206,104 @@ def main():
     )
 
     logging.info("rtl2gds starting...")
+    if args.progress:
+        progress.add_listener(progress.log_listener)
 
     chip_design = Chip(config_yaml=args.config)
 
-    flow.rtl2gds_flow.run(chip_design)
+    if args.threads is not None:
+        chip_design.config[Keyword.THREADS] = ThreadBudget(default=args.threads).to_config()
+    if args.compress_intermediates is not None:
+        chip_design.config[Keyword.INTERMEDIATE_COMPRESSION] = args.compress_intermediates
+    if args.scratch_dir is not None:
+        chip_design.config[Keyword.SCRATCH_DIR] = str(args.scratch_dir.absolute())
+    if args.hierarchical_synth:
+        chip_design.config[Keyword.SYNTH_HIERARCHICAL] = True
+    if args.abc_portfolio:
+        chip_design.config[Keyword.ABC_PORTFOLIO] = abc_portfolio.AbcPortfolio(
+            recipes=args.abc_portfolio, objective=args.abc_objective
+        ).to_config()
+    if args.retention is not None:
+        chip_design.config[Keyword.RETENTION] = flow.retention.RetentionPolicy(
+            mode=args.retention, keep_checkpoints=args.keep_checkpoints
+        ).to_config()
+
+    if args.ieda_session and args.step_retries:
+        # a stopped session step loses the in-memory design, there is nothing to rerun it on
+        parser.error("--step_retries does not apply with --ieda_session")
+    watchdog_args = {
+        "timeout_seconds": args.step_timeout,
+        "stall_seconds": args.stall_timeout,
+        "retries": args.step_retries,
+    }
+    if any(value is not None for value in watchdog_args.values()):
+        policy = (
+            watchdog.WatchdogPolicy.from_config(chip_design.config.get(Keyword.WATCHDOG))
+            or watchdog.WatchdogPolicy()
+        )
+        for name, value in watchdog_args.items():
+            if value is not None:
+                setattr(policy, name, value)
+        # recorded with the config, so every checkpoint holds the policy of its run
+        chip_design.config[Keyword.WATCHDOG] = policy.to_config()
+
+    if args.command == "gc":
+        policy = flow.retention.RetentionPolicy.from_config(
+            chip_design.config.get(Keyword.RETENTION)
+        )
+        if policy is None:
+            parser.error("gc needs --retention or a RETENTION section in the config")
+        if args.delete_failed:
+            policy.keep_failed = False
+        flow.retention.collect(
+            chip_design.path_setting.result_dir,
+            chip_design.top_name,
+            policy,
+            config_yaml=chip_design.config_yaml,
+            protected_dirs=[str(args.cache_dir)] if args.cache_dir else None,
+            dry_run=args.dry_run,
+        )
+        return
+
+    if args.command == "sweep":
+        values = {
+            name: value
+            for name, value in (
+                (Keyword.CORE_UTIL, args.core_util),
+                (Keyword.CLK_FREQ_MHZ, args.clk_freq_mhz),
+            )
+            if value
+        }
+        if not values:
+            parser.error("sweep needs --core_util and/or --clk_freq_mhz values")
+        points = flow.sweep.make_points(values, args.sample, args.num_points, args.seed)
+        predicates = []
+        if args.max_core_util is not None:
+            predicates.append(flow.pruning.MaxCoreUtil(args.max_core_util))
+        if args.min_wns is not None:
+            predicates.append(flow.pruning.MinWns(args.min_wns))
+        if args.max_overflow is not None:
+            predicates.append(flow.pruning.MaxOverflow(args.max_overflow))
+        flow.sweep.run(
+            chip_design,
+            points,
+            sweep_dir=args.sweep_dir,
+            max_parallel=args.parallel,
+            cache_dir=args.cache_dir,
+            max_workers=args.max_workers,
+            pruner=flow.pruning.Pruner(predicates) if predicates else None,
+        )
+        logging.info("rtl2gds sweep finished")
+        return
+
+    cache = flow.StepCache(args.cache_dir) if args.cache_dir else None
+    flow.rtl2gds_flow.run(
+        chip_design,
+        cache=cache,
+        max_workers=args.max_workers,
+        resume=args.resume,
+        ieda_session=args.ieda_session,
+    )
 
     logging.info("rtl2gds finished")
 
@@ -9,6 +9,26 @@ from rtl2gds.chip.config import Keyword
 from rtl2gds.chip.design_constrain import DesignConstrain
 from rtl2gds.chip.design_path import DesignPath
 from rtl2gds.chip.metrics import DesignMetrics
+from rtl2gds.utils.hashing import file_digest
+
+# what a checkpoint restores, the run options (threads, watchdog, ...) stay the resuming run's
+CHECKPOINT_KEYS = (
+    Keyword.TOP_NAME,
+    Keyword.RTL_FILE,
+    Keyword.RESULT_DIR,
+    Keyword.NETLIST_FILE,
+    Keyword.DEF_FILE,
+    Keyword.GDS_FILE,
+    Keyword.SDC_FILE,
+    Keyword.CLK_PORT_NAME,
+    Keyword.CLK_FREQ_MHZ,
+    Keyword.DIE_BBOX,
+    Keyword.CORE_BBOX,
+    Keyword.CORE_UTIL,
+    Keyword.FINISHED_STEP,
+    Keyword.EXPECTED_STEP,
+    Keyword.ARTIFACT_CHECKSUMS,
+)
 
 
 class Chip:
@@ -167,12 +187,40 @@ class Chip:
                 Keyword.FINISHED_STEP: self.finished_step,
                 Keyword.EXPECTED_STEP: self.expected_step,
                 Keyword.LAST_UPDATE_TIME: self.last_update_time,
+                Keyword.ARTIFACT_CHECKSUMS: self.artifact_checksums(),
             }
         )
 
         if save_yaml:
             self.dump_config_yaml(override=True)
 
+    def artifact_checksums(self) -> dict[str, str]:
+        """Checksums of the existing netlist and DEF files, keyed by their config keyword"""
+        checksums = {}
+        for key, path in (
+            (Keyword.NETLIST_FILE, self.path_setting.netlist_file),
+            (Keyword.DEF_FILE, self.path_setting.def_file),
+        ):
+            if path and os.path.isfile(path):
+                checksums[key] = file_digest(path)
+        return checksums
+
+    def restore_checkpoint(self, checkpoint_yaml: str | Path) -> None:
+        """
+        Restore paths, constraints and flow progress from a checkpoint YAML.
+
+        The chip keeps its own `config_yaml`, so later checkpoints are named after
+        the original config rather than after the checkpoint. Only `CHECKPOINT_KEYS`
+        are taken from the checkpoint, the other keys of `config` (e.g. the options
+        of the resuming command line) are kept.
+        """
+        with open(checkpoint_yaml, "r", encoding="utf-8") as f:
+            checkpoint = {key.upper(): value for key, value in yaml.safe_load(f).items()}
+        config = dict(self.config)
+        config.update({key: checkpoint[key] for key in CHECKPOINT_KEYS if key in checkpoint})
+        self._init_from_config(config)
+        self.last_update_time = self._strtime()
+
     def to_env(self) -> dict[str, str]:
         """Get environment variables for running tools"""
         io_env = global_configs.ENV_TOOLS_PATH.copy()
@@ -25,4 +25,28 @@ class Keyword:
     EXPECTED_STEP = "EXPECTED_STEP"
     INIT_TIME = "INIT_TIME"
     LAST_UPDATE_TIME = "LAST_UPDATE_TIME"
+    # sha256 of the netlist/def recorded at each checkpoint, checked on resume
+    ARTIFACT_CHECKSUMS = "ARTIFACT_CHECKSUMS"
+    # timeouts, stall detection and retries of the steps, see `utils.watchdog`
+    WATCHDOG = "WATCHDOG"
+    # threads per step, see `utils.threads.ThreadBudget`, all available cores if unset
+    THREADS = "THREADS"
+    # iEDA config file name -> nested values overriding the template, see `step.ieda_config`
+    IEDA_CONFIG = "IEDA_CONFIG"
+    # gzip/zstd compression of the P&R DEF/verilog, see `utils.compression`, off if unset
+    INTERMEDIATE_COMPRESSION = "INTERMEDIATE_COMPRESSION"
+    # local directory (tmpfs, NVMe) the steps run in, synced to RESULT_DIR, see `flow.scratch`
+    SCRATCH_DIR = "SCRATCH_DIR"
+    # artifacts kept after a run, see `flow.retention.RetentionPolicy`, all if unset
+    RETENTION = "RETENTION"
+    # synthesize module by module through the module cache, see `step.synth_modules`
+    SYNTH_HIERARCHICAL = "SYNTH_HIERARCHICAL"
+    # ABC recipes tried in parallel by synthesis, see `step.abc_portfolio.AbcPortfolio`
+    ABC_PORTFOLIO = "ABC_PORTFOLIO"
+    # also export the layout JSON in the binary format of `step.layout_bin`
+    LAYOUT_BINARY = "LAYOUT_BINARY"
+    # also export the layout JSON as quadtree tiles, see `step.layout_tiles.TilePolicy`
+    LAYOUT_TILES = "LAYOUT_TILES"
+    # export the layout JSON of a step as a delta against the previous one, see `step.layout_delta`
+    LAYOUT_DELTA = "LAYOUT_DELTA"
     # LAST_UPDATE_INFO = "LAST_UPDATE_INFO" top+f_step+time
@@ -41,7 +41,13 @@ class DesignMetrics:
     # Design statistics
     # wirelength: float = 0
     num_instances: int = 0
-    # num_seq_cells: int = 0
+    num_seq_cells: int = 0
+    # share of the cell area used by flip-flops and latches
+    sequential_ratio: float = 0.0
+    # cell type -> instances after synthesis, the cell mix of the design
+    cell_types: dict[str, int] = field(default_factory=dict)
+    # module -> cells of its own, where the cells of a hierarchical design are
+    module_cells: dict[str, int] = field(default_factory=dict)
     # num_comb_cells: int = 0
     # num_instances: int = 0
     # num_equivalent_gates: int = 0
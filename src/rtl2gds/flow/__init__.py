@@ -1,6 +1,22 @@
-from rtl2gds.flow import rtl2gds_flow, single_step
+from rtl2gds.flow import (
+    checkpoint,
+    pruning,
+    retention,
+    rtl2gds_flow,
+    scheduler,
+    single_step,
+    sweep,
+)
+from rtl2gds.flow.step_cache import StepCache
 
 __all__ = [
+    "checkpoint",
+    "pruning",
+    "retention",
     "rtl2gds_flow",
+    "scheduler",
     "single_step",
+    "sweep",
+    # Classes
+    "StepCache",
 ]
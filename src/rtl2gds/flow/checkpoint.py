@@ -0,0 +1,127 @@
+"""
+Resume a flow from the checkpoint YAMLs written by `Chip.dump_config_yaml`
+
+Checkpoints are named `<config stem>_checkpoint_<time>_<finished step>.yaml`
+and live next to the chip config. A checkpoint is usable when the netlist/DEF
+it records still exist and match the checksums taken when it was written.
+"""
+
+import logging
+import re
+from pathlib import Path
+
+import yaml
+
+from rtl2gds.chip import Chip
+from rtl2gds.chip.config import Keyword
+from rtl2gds.global_configs import RTL2GDS_FLOW_STEPS, StepName
+from rtl2gds.utils.hashing import file_digest
+
+
+def _required_artifacts(finished_step: str) -> list[str]:
+    """Config keys of the files the next step reads"""
+    if finished_step == StepName.SYNTHESIS:
+        return [Keyword.NETLIST_FILE]
+    return [Keyword.DEF_FILE]
+
+
+def list_checkpoints(config_yaml: str | Path) -> list[Path]:
+    """
+    List the checkpoints of a chip config, newest first.
+
+    Args:
+        config_yaml (str | Path): The chip config the checkpoints were written for.
+
+    Returns:
+        list[Path]: Checkpoint files, ordered by time and then by flow step.
+    """
+    config_yaml = Path(config_yaml)
+    pattern = re.compile(
+        rf"^{re.escape(config_yaml.stem)}_checkpoint_(\d{{8}}_\d{{6}})_(\w+)\.yaml$"
+    )
+    checkpoints = []
+    for candidate in config_yaml.parent.glob(f"{config_yaml.stem}_checkpoint_*.yaml"):
+        match = pattern.match(candidate.name)
+        if not match or match.group(2) not in RTL2GDS_FLOW_STEPS:
+            continue
+        order = (match.group(1), RTL2GDS_FLOW_STEPS.index(match.group(2)))
+        checkpoints.append((order, candidate))
+    return [path for _, path in sorted(checkpoints, reverse=True)]
+
+
+def validate_checkpoint(checkpoint_yaml: str | Path) -> str | None:
+    """
+    Check that a checkpoint can be resumed from.
+
+    Args:
+        checkpoint_yaml (str | Path): Checkpoint file.
+
+    Returns:
+        str | None: Why the checkpoint is unusable, or None if it is valid.
+    """
+    try:
+        with open(checkpoint_yaml, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        return f"unreadable: {e}"
+    if not isinstance(config, dict):
+        return "not a config mapping"
+
+    finished_step = config.get(Keyword.FINISHED_STEP)
+    if finished_step not in RTL2GDS_FLOW_STEPS or finished_step == StepName.INIT:
+        return f"nothing to resume from finished step {finished_step}"
+
+    checksums = config.get(Keyword.ARTIFACT_CHECKSUMS) or {}
+    for key in _required_artifacts(finished_step):
+        path = config.get(key)
+        if not path or not Path(path).is_file():
+            return f"{key} {path} does not exist"
+        if key not in checksums:
+            logging.warning("Checkpoint %s has no checksum for %s", checkpoint_yaml, key)
+            continue
+        if file_digest(path) != checksums[key]:
+            return f"{key} {path} does not match its checksum"
+    return None
+
+
+def find_latest_checkpoint(config_yaml: str | Path) -> Path | None:
+    """
+    Find the newest valid checkpoint of a chip config.
+
+    Args:
+        config_yaml (str | Path): The chip config the checkpoints were written for.
+
+    Returns:
+        Path | None: The checkpoint to resume from, None if there is none.
+    """
+    for checkpoint in list_checkpoints(config_yaml):
+        reason = validate_checkpoint(checkpoint)
+        if reason is None:
+            return checkpoint
+        logging.warning("Skip checkpoint %s: %s", checkpoint, reason)
+    return None
+
+
+def resume(chip: Chip) -> Path | None:
+    """
+    Restore `chip` from its newest valid checkpoint.
+
+    Args:
+        chip (Chip): The chip to restore, its `config_yaml` locates the checkpoints.
+
+    Returns:
+        Path | None: The checkpoint restored, None if the chip starts from scratch.
+    """
+    checkpoint = find_latest_checkpoint(chip.config_yaml)
+    if checkpoint is None:
+        logging.info("No valid checkpoint for %s, start from scratch", chip.config_yaml)
+        return None
+
+    chip.restore_checkpoint(checkpoint)
+    logging.info(
+        "Resume from %s: finished step %s, expected step %s",
+        checkpoint,
+        chip.finished_step,
+        chip.expected_step,
+    )
+    return checkpoint
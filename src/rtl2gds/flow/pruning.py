@@ -0,0 +1,156 @@
+"""
+Early abort of hopeless flow runs
+
+A predicate looks at the intermediate results of a finished step and returns
+why the run should stop, or None to let it go on. The `Pruner` evaluates them
+after every step, so a sweep point with an overflowing floorplan or a deeply
+negative WNS does not burn CTS and routing time.
+
+Predicates are pickled into sweep worker processes: use top-level functions or
+instances of top-level classes such as the ones below, not lambdas.
+"""
+
+import csv
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+from rtl2gds.chip import Chip
+from rtl2gds.global_configs import StepName
+
+# congestion map written by iEDA-iPL, relative to the result dir
+PLACE_OVERFLOW_CSV = "report/iEDA-iPL/rt/place_egr_union_overflow.csv"
+
+
+class PruneError(Exception):
+    """Raised by `Pruner.check` to stop a run that failed a predicate"""
+
+    def __init__(self, step_name: str, reason: str):
+        super().__init__(step_name, reason)
+        self.step_name = step_name
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"pruned after {self.step_name}: {self.reason}"
+
+
+def _collect_wns(data: object) -> list[float]:
+    """Every numeric value stored under a key containing `wns`, at any depth"""
+    values = []
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if "wns" in str(key).lower() and isinstance(value, (int, float)):
+                values.append(float(value))
+            else:
+                values += _collect_wns(value)
+    elif isinstance(data, list):
+        for item in data:
+            values += _collect_wns(item)
+    return values
+
+
+@dataclass
+class StepReport:
+    """What a predicate gets to see of a finished step"""
+
+    step_name: str
+    chip: Chip
+
+    @property
+    def result_dir(self) -> str:
+        return self.chip.path_setting.result_dir
+
+    def timing_report(self) -> dict | None:
+        """The step's timing evaluation JSON, None if the step has none"""
+        report = f"{self.result_dir}/evaluation/{self.step_name}/timing_result.json"
+        if not os.path.exists(report):
+            return None
+        with open(report, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def wns(self) -> float | None:
+        """Worst negative slack over all clocks of the step's timing report, in ns"""
+        values = _collect_wns(self.timing_report() or {})
+        return min(values) if values else None
+
+    def total_overflow(self) -> float | None:
+        """Sum of the early global routing overflow map after placement, None if missing"""
+        overflow_csv = f"{self.result_dir}/{PLACE_OVERFLOW_CSV}"
+        if not os.path.exists(overflow_csv):
+            return None
+        total = 0.0
+        with open(overflow_csv, "r", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                for cell in row:
+                    try:
+                        total += float(cell)
+                    except ValueError:
+                        continue
+        return total
+
+
+Predicate = Callable[[StepReport], str | None]
+
+
+@dataclass
+class MaxCoreUtil:
+    """Prune when the core utilization reported by the step exceeds `limit`"""
+
+    limit: float = 1.0
+
+    def __call__(self, report: StepReport) -> str | None:
+        core_util = report.chip.metrics.area.core_util
+        if report.step_name != StepName.SYNTHESIS and core_util > self.limit:
+            return f"core utilization {core_util:.3f} > {self.limit}"
+        return None
+
+
+@dataclass
+class MinWns:
+    """Prune when the step's WNS is below `limit_ns` (e.g. -2.0)"""
+
+    limit_ns: float
+
+    def __call__(self, report: StepReport) -> str | None:
+        wns = report.wns()
+        if wns is not None and wns < self.limit_ns:
+            return f"WNS {wns:.3f} ns < {self.limit_ns} ns"
+        return None
+
+
+@dataclass
+class MaxOverflow:
+    """Prune when the total early global routing overflow after placement exceeds `limit`"""
+
+    limit: float
+
+    def __call__(self, report: StepReport) -> str | None:
+        if report.step_name != StepName.PLACEMENT:
+            return None
+        overflow = report.total_overflow()
+        if overflow is not None and overflow > self.limit:
+            return f"routing overflow {overflow:g} > {self.limit:g}"
+        return None
+
+
+class Pruner:
+    """Evaluate pruning predicates after each step of a flow"""
+
+    def __init__(self, predicates: list[Predicate]):
+        self.predicates = list(predicates)
+
+    def check(self, chip: Chip, step_name: str) -> None:
+        """
+        Evaluate every predicate against the step the chip just finished.
+
+        Raises:
+            PruneError: With the first reason given by a predicate.
+        """
+        report = StepReport(step_name=step_name, chip=chip)
+        for predicate in self.predicates:
+            reason = predicate(report)
+            if reason:
+                logging.warning("(pruning) %s: stop after %s, %s", chip.top_name, step_name, reason)
+                raise PruneError(step_name, reason)
@@ -0,0 +1,235 @@
+"""
+Retention policy of the result directories
+
+A finished run leaves the DEF/verilog of every P&R step, several GDS files,
+snapshots and layout json chunks in its result dir. `collect` deletes the bulky
+artifacts a `RetentionPolicy` does not keep:
+- "all": keep everything (the default),
+- "final": keep the outputs of the last step (DEF, verilog, GDS, snapshot,
+  layout json) only,
+- "checkpoints": also keep the files and step outputs of the
+  `keep_checkpoints` newest checkpoints, so the flow can be resumed from them.
+Failed runs are kept whole unless `keep_failed` is disabled. Reports, logs,
+the synthesized netlist and the evaluation JSONs are small and always kept.
+
+The artifacts are known from the artifact manifest every flow writes
+(`write_manifest`), the artifacts dict of each flow node. Checkpoints that
+refer to a deleted file are deleted with it. The step cache keeps its own
+copies of the artifacts, so cached steps are still restored after a collection,
+and nothing below a cache dir is ever deleted.
+"""
+
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import yaml
+
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow.checkpoint import list_checkpoints
+from rtl2gds.global_configs import PR_FLOW_STEPS, StepName
+from rtl2gds.utils.json_helper import dump_json, load_json
+
+KEEP_ALL = "all"
+KEEP_FINAL = "final"
+KEEP_CHECKPOINTS = "checkpoints"
+RETENTION_MODES = [KEEP_ALL, KEEP_FINAL, KEEP_CHECKPOINTS]
+# artifact keys of the bulky files, the ones a policy may delete
+BULK_ARTIFACTS = ("def", "verilog", "gds_file", "snapshot_file", "json_files")
+# flow nodes whose artifacts are the final outputs
+FINAL_NODES = [
+    PR_FLOW_STEPS[-1],
+    f"{StepName.LAYOUT_GDS}_{PR_FLOW_STEPS[-1]}",
+    f"{StepName.LAYOUT_JSON}_{PR_FLOW_STEPS[-1]}",
+]
+# files of a checkpoint, config keyword of each
+_CHECKPOINT_FILES = (Keyword.NETLIST_FILE, Keyword.DEF_FILE, Keyword.GDS_FILE)
+
+STATUS_FINISHED = "finished"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    What `collect` keeps of a result dir.
+
+    Attributes:
+        mode (str): One of `RETENTION_MODES`.
+        keep_checkpoints (int): Newest checkpoints kept in "checkpoints" mode.
+        keep_failed (bool): Keep everything of a failed run.
+    """
+
+    mode: str = KEEP_ALL
+    keep_checkpoints: int = 1
+    keep_failed: bool = True
+
+    def __post_init__(self):
+        if self.mode not in RETENTION_MODES:
+            raise ValueError(
+                f"Unknown retention mode {self.mode}, expected one of {RETENTION_MODES}"
+            )
+
+    def to_config(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_config(cls, config: dict | str | None) -> "RetentionPolicy | None":
+        """Policy stored in a chip config value, a dict like `to_config` or a mode name"""
+        if not config:
+            return None
+        if isinstance(config, str):
+            return cls(mode=config)
+        return cls(
+            **{key: value for key, value in config.items() if key in cls.__dataclass_fields__}
+        )
+
+
+@dataclass
+class RetentionReport:
+    """Files deleted by `collect`, or that would be in a dry run"""
+
+    result_dir: str
+    deleted: list[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+    skipped: str | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def manifest_path(result_dir: str, top_name: str) -> str:
+    return f"{result_dir}/evaluation/{top_name}_artifacts.json"
+
+
+def write_manifest(result_dir: str, top_name: str, results: dict, status: str) -> str:
+    """
+    Record the artifacts of a flow run, paths relative to `result_dir` so the manifest
+    stays valid when the result dir is moved (or synced from a scratch dir). The nodes of
+    an earlier run in the same result dir, resumed by this one, are kept.
+
+    Args:
+        results (dict): Node name to its result, the artifacts dicts are recorded.
+        status (str): `STATUS_FINISHED` or `STATUS_FAILED`.
+    """
+    result_dir = os.path.abspath(result_dir)
+
+    def relative(path):
+        if isinstance(path, (list, tuple)):
+            return [relative(item) for item in path]
+        if isinstance(path, str) and path.startswith(result_dir + os.sep):
+            return os.path.relpath(path, result_dir)
+        return path
+
+    json_file = manifest_path(result_dir, top_name)
+    nodes = load_json(json_file)["nodes"] if os.path.exists(json_file) else {}
+    nodes.update(
+        {
+            name: {key: relative(value) for key, value in artifacts.items()}
+            for name, artifacts in results.items()
+            if isinstance(artifacts, dict)
+        }
+    )
+    os.makedirs(os.path.dirname(json_file), exist_ok=True)
+    return dump_json(json_file, {"status": status, "nodes": nodes})
+
+
+def _bulk_files(artifacts: dict, result_dir: str) -> list[str]:
+    files = []
+    for key in BULK_ARTIFACTS:
+        value = artifacts.get(key)
+        for path in value if isinstance(value, list) else [value]:
+            if isinstance(path, str):
+                files.append(os.path.normpath(os.path.join(result_dir, path)))
+    return files
+
+
+def _load_checkpoint(checkpoint_yaml: Path) -> dict:
+    with open(checkpoint_yaml, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _checkpoint_files(config: dict) -> set[str]:
+    return {os.path.normpath(config[key]) for key in _CHECKPOINT_FILES if config.get(key)}
+
+
+def collect(
+    result_dir: str,
+    top_name: str,
+    policy: RetentionPolicy,
+    config_yaml: str | Path | None = None,
+    protected_dirs: list[str] | None = None,
+    dry_run: bool = False,
+) -> RetentionReport:
+    """
+    Delete the artifacts of a result dir that `policy` does not keep.
+
+    Args:
+        result_dir (str): Result dir of a flow run, with its artifact manifest.
+        top_name (str): Top module of the run.
+        policy (RetentionPolicy): What to keep.
+        config_yaml (str | Path, optional): Chip config locating the checkpoints.
+        protected_dirs (list[str], optional): Never delete below these, e.g. cache dirs.
+        dry_run (bool): Only report what would be deleted.
+
+    Returns:
+        RetentionReport: The files deleted and the bytes reclaimed.
+    """
+    result_dir = os.path.abspath(result_dir)
+    report = RetentionReport(result_dir=result_dir)
+    if policy.mode == KEEP_ALL:
+        report.skipped = "policy keeps everything"
+        return report
+    manifest_file = manifest_path(result_dir, top_name)
+    if not os.path.exists(manifest_file):
+        report.skipped = f"no artifact manifest {manifest_file}"
+        logging.warning("(retention) %s, nothing deleted", report.skipped)
+        return report
+    manifest = load_json(manifest_file)
+    if manifest.get("status") != STATUS_FINISHED and policy.keep_failed:
+        report.skipped = "failed run kept"
+        return report
+
+    checkpoints = [
+        (path, _load_checkpoint(path))
+        for path in (list_checkpoints(config_yaml) if config_yaml else [])
+    ]
+    kept = set()
+    for node in FINAL_NODES:
+        kept.update(_bulk_files(manifest["nodes"].get(node, {}), result_dir))
+    if policy.mode == KEEP_CHECKPOINTS:
+        # the files a checkpoint resumes from, and the outputs of its step
+        for _, config in checkpoints[: policy.keep_checkpoints]:
+            kept.update(_checkpoint_files(config))
+            step_artifacts = manifest["nodes"].get(config.get(Keyword.FINISHED_STEP), {})
+            kept.update(_bulk_files(step_artifacts, result_dir))
+    protected = [os.path.abspath(path) + os.sep for path in protected_dirs or []]
+
+    doomed = set()
+    for artifacts in manifest["nodes"].values():
+        for path in _bulk_files(artifacts, result_dir):
+            if path in kept or any(path.startswith(prefix) for prefix in protected):
+                continue
+            if os.path.isfile(path):
+                doomed.add(path)
+    # a checkpoint without its files can not be resumed from
+    for path, config in checkpoints:
+        if _checkpoint_files(config) & doomed:
+            doomed.add(str(path))
+
+    for path in sorted(doomed):
+        report.reclaimed_bytes += os.path.getsize(path)
+        report.deleted.append(path)
+        if not dry_run:
+            os.remove(path)
+
+    logging.info(
+        "(retention) %s %d files, %.1f MiB in %s (%s)",
+        "would delete" if dry_run else "deleted",
+        len(report.deleted),
+        report.reclaimed_bytes / (1 << 20),
+        result_dir,
+        policy.mode,
+    )
+    return report
@@ -3,38 +3,279 @@ import os
 import time
 
 from rtl2gds.chip import Chip
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow import checkpoint, retention
+from rtl2gds.flow.pruning import Pruner
+from rtl2gds.flow.scheduler import DEFAULT_MAX_WORKERS, DagScheduler
+from rtl2gds.flow.scratch import ScratchSync
+from rtl2gds.flow.step_cache import StepCache
 from rtl2gds.flow.step_wrapper import StepWrapper
 from rtl2gds.global_configs import PR_FLOW_STEPS, StepName
+from rtl2gds.step.ieda_session import IEDASession
+from rtl2gds.utils import trace, watchdog
 
+# steps followed by a GDS dump, and whether it takes a snapshot
+LAYOUT_GDS_STEPS = {
+    StepName.FLOORPLAN: False,
+    StepName.PLACEMENT: True,
+    StepName.FILLER: True,
+}
+# steps followed by a layout json export when `layout_json` is enabled
+LAYOUT_JSON_STEPS = [
+    StepName.FLOORPLAN,
+    StepName.PLACEMENT,
+    StepName.CTS,
+    StepName.LEGALIZATION,
+    StepName.ROUTING,
+    StepName.FILLER,
+]
 
-def run(chip: Chip):
+
+def previous_layout_json_step(step_name: str) -> str | None:
+    """The step exported before `step_name`, the base of its layout json delta"""
+    if step_name not in LAYOUT_JSON_STEPS[1:]:
+        return None
+    return LAYOUT_JSON_STEPS[LAYOUT_JSON_STEPS.index(step_name) - 1]
+
+
+def build_graph(
+    runner: StepWrapper,
+    layout_json: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> DagScheduler:
+    """
+    Express the RTL2GDS flow as a dependency graph.
+
+    The critical path (synthesis, floorplan, P&R steps) is a chain on the "main" branch.
+    GDS dumps, snapshots and layout json exports only read the DEF of the step they
+    follow, so they hang off that step and run while the next step is already running.
+    The timing report merge only needs the evaluation reports of the last P&R step.
+    With `Keyword.LAYOUT_DELTA`, each layout json export also waits for the previous
+    one, its delta base.
+    Steps the chip already finished (see `checkpoint.resume`) are left out.
+
+    Args:
+        runner (StepWrapper): Runner of the chip to build the graph for.
+        layout_json (bool): Also export the layout json of P&R steps.
+        max_workers (int): Number of nodes running at the same time.
+
+    Returns:
+        DagScheduler: The graph, ready to `run`.
+    """
+    scheduler = DagScheduler(max_workers=max_workers)
+    json_deltas = bool(runner.chip.config.get(Keyword.LAYOUT_DELTA))
+
+    def step_def(step_name: str) -> str:
+        # the DEF path comes from the step result, not from the chip: by the time
+        # the side branch starts the chip may already point at a later step
+        if step_name in scheduler.results:
+            return scheduler.results[step_name]["def"]
+        # finished before this run (resumed flow), the chip still points at it
+        return runner.chip.path_setting.def_file
+
+    def add_side_branches(step_name: str, deps: list[str]):
+        if step_name in LAYOUT_GDS_STEPS:
+            scheduler.add(
+                f"{StepName.LAYOUT_GDS}_{step_name}",
+                lambda: runner.run_save_layout_gds(
+                    step_name=step_name,
+                    take_snapshot=LAYOUT_GDS_STEPS[step_name],
+                    input_def=step_def(step_name),
+                    update_chip=False,
+                ),
+                deps=deps,
+                branch=StepName.LAYOUT_GDS,
+            )
+        if layout_json and step_name in LAYOUT_JSON_STEPS:
+            base_step = previous_layout_json_step(step_name) if json_deltas else None
+            base_node = f"{StepName.LAYOUT_JSON}_{base_step}"
+            scheduler.add(
+                f"{StepName.LAYOUT_JSON}_{step_name}",
+                lambda: runner.run_save_layout_json(
+                    step_name=step_name,
+                    input_def=step_def(step_name),
+                    base_step=base_step,
+                ),
+                deps=deps + ([base_node] if base_node in scheduler.nodes else []),
+                branch=StepName.LAYOUT_JSON,
+            )
+
+    step_runners = {
+        StepName.SYNTHESIS: runner.run_synthesis,
+        StepName.FLOORPLAN: runner.run_floorplan,
+    }
+    flow_steps = list(step_runners) + PR_FLOW_STEPS
+    finished_step = runner.chip.finished_step
+    if finished_step in flow_steps:
+        # resumed flow: steps up to `finished_step` are done
+        todo_steps = flow_steps[flow_steps.index(finished_step) + 1 :]
+    else:
+        todo_steps = flow_steps
+
+    prev = None
+    if not todo_steps:
+        # only the final GDS is missing
+        add_side_branches(finished_step, deps=[])
+    for step_name in todo_steps:
+        step_func = step_runners.get(
+            step_name, lambda step_name=step_name: runner.run_pr_step(step_name)
+        )
+        prev = scheduler.add(step_name, step_func, deps=[prev] if prev else [])
+        add_side_branches(step_name, deps=[prev])
+
+    scheduler.add(
+        "timing_report",
+        runner.run_collect_timing_metrics,
+        deps=[prev] if prev else [],
+        branch="timing",
+    )
+
+    return scheduler
+
+
+def run(
+    chip: Chip,
+    cache: StepCache | None = None,
+    layout_json: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    resume: bool = False,
+    pruner: Pruner | None = None,
+    ieda_session: bool = False,
+):
+    """
+    Run the full RTL2GDS flow.
+
+    Args:
+        chip (Chip): Design to run.
+        cache (StepCache, optional): Step result cache, synthesis, floorplan and
+            P&R steps are restored from it when their inputs are unchanged.
+        layout_json (bool): Also export the layout json of P&R steps for the cloud viewer.
+        max_workers (int): Number of flow nodes running at the same time,
+            1 runs the flow strictly sequentially.
+        resume (bool): Continue from the newest valid checkpoint of the chip config
+            instead of starting from synthesis.
+        pruner (Pruner, optional): Predicates checked after each step, a failing one
+            stops the flow with `PruneError`.
+        ieda_session (bool): Run all P&R steps in one persistent iEDA process that keeps
+            the design in memory. DEFs are only written for the steps that the GDS
+            dumps and layout json exports read, and for the last step. The watchdog
+            bounds each session command but does not retry the P&R steps.
+
+    With `SCRATCH_DIR` in the chip config the steps run in a scratch dir below it and
+    their results are synced back to the result dir, see `flow.scratch`. A `RETENTION`
+    policy deletes the artifacts it does not keep afterwards, see `flow.retention`.
+    """
     start_time = time.perf_counter()
-    runner = StepWrapper(chip)
+    trace_json = trace_json_path(chip.path_setting.result_dir, chip.top_name)
+    scratch_root = chip.config.get(Keyword.SCRATCH_DIR)
+    scratch = ScratchSync(chip.path_setting.result_dir, scratch_root) if scratch_root else None
+    failed = True
+    try:
+        with trace.span("rtl2gds_flow", trace.FLOW, top_name=chip.top_name):
+            _run(chip, cache, layout_json, max_workers, resume, pruner, ieda_session, scratch)
+        failed = False
+    finally:
+        if scratch is not None:
+            # a failed flow flushes everything it has, for debugging and resuming
+            scratch.close(chip, failed=failed)
+        # also for failed and pruned runs, that is when the trace is most useful
+        trace.tracer.save_chrome_trace(trace_json)
+        logging.info("Trace saved to: %s", trace_json)
+        policy = retention.RetentionPolicy.from_config(chip.config.get(Keyword.RETENTION))
+        if policy is not None:
+            retention.collect(
+                chip.path_setting.result_dir,
+                chip.top_name,
+                policy,
+                config_yaml=chip.config_yaml,
+                protected_dirs=[cache.cache_dir] if cache else None,
+            )
+
+    end_time = time.perf_counter()
+    logging.info("Total elapsed time: %.2f seconds", end_time - start_time)
+
+
+def trace_json_path(result_dir: str, top_name: str) -> str:
+    """Chrome trace of a flow run, see `rtl2gds.utils.trace`"""
+    return f"{result_dir}/evaluation/{top_name}_trace.json"
 
-    # Run synthesis
-    runner.run_synthesis()
 
-    # Run floorplan
-    runner.run_floorplan()
-    runner.run_save_layout_gds(step_name=StepName.FLOORPLAN)
+def _run(
+    chip: Chip,
+    cache: StepCache | None,
+    layout_json: bool,
+    max_workers: int,
+    resume: bool,
+    pruner: Pruner | None,
+    ieda_session: bool,
+    scratch: ScratchSync | None,
+):
+    if resume:
+        checkpoint.resume(chip)
+    if scratch is not None:
+        scratch.attach(chip)
+    session = None
+    def_checkpoints = None
+    if ieda_session:
+        policy = watchdog.WatchdogPolicy.from_config(chip.config.get(Keyword.WATCHDOG))
+        if policy is not None and policy.retries:
+            logging.warning(
+                "Watchdog retries do not apply to the P&R steps of an iEDA session, "
+                "a stopped step fails the flow"
+            )
+        session = IEDASession(
+            chip.top_name,
+            chip.path_setting.result_dir,
+            ieda_overrides=chip.config.get(Keyword.IEDA_CONFIG),
+        )
+        def_checkpoints = list(LAYOUT_GDS_STEPS) + (LAYOUT_JSON_STEPS if layout_json else [])
+        def_checkpoints.append(PR_FLOW_STEPS[-1])
+    runner = StepWrapper(
+        chip,
+        cache=cache,
+        pruner=pruner,
+        ieda_session=session,
+        def_checkpoints=def_checkpoints,
+        scratch=scratch,
+    )
 
-    # Run P&R flow
-    for step_name in PR_FLOW_STEPS:
-        runner.run_pr_step(step_name)
-        if step_name in [StepName.PLACEMENT, StepName.FILLER]:
-            runner.run_save_layout_gds(step_name=step_name, take_snapshot=True)
+    scheduler = build_graph(runner, layout_json=layout_json, max_workers=max_workers)
+    status = retention.STATUS_FAILED
+    try:
+        results = scheduler.run()
+        status = retention.STATUS_FINISHED
+    finally:
+        if session is not None:
+            session.close()
+        # read by `retention.collect`, also for failed runs
+        retention.write_manifest(
+            chip.path_setting.result_dir, chip.top_name, scheduler.results, status
+        )
 
     assert chip.finished_step == StepName.FILLER
+
+    # side branches leave the chip alone, record the final layout now
+    chip.path_setting.gds_file = results[f"{StepName.LAYOUT_GDS}_{StepName.FILLER}"]["gds_file"]
+    runner.save_checkpoint()
     assert os.path.exists(chip.path_setting.gds_file)
 
-    # Collect timing metrics
-    runner.run_collect_timing_metrics()
+    branch_report_json = scheduler.save_branch_report(
+        f"{chip.path_setting.result_dir}/evaluation/{chip.top_name}_branch_time.json"
+    )
+    for branch, report in scheduler.branch_report().items():
+        logging.info(
+            "Branch %s: wall %.2f seconds, busy %.2f seconds",
+            branch,
+            report["wall_seconds"],
+            report["busy_seconds"],
+        )
+    logging.info("Branch time report saved to: %s", branch_report_json)
 
     # Save time report
     execute_time_json = runner.save_execute_time_report()
     logging.info("Execute time report saved to: %s", execute_time_json)
 
-    runner.save_merged_metrics(execute_time_json)
+    resource_json = runner.save_resource_report()
+    logging.info("Resource usage report saved to: %s", resource_json)
 
-    end_time = time.perf_counter()
-    logging.info("Total elapsed time: %.2f seconds", end_time - start_time)
+    runner.save_merged_metrics(execute_time_json, resource_json=resource_json)
@@ -0,0 +1,176 @@
+"""
+Dependency graph scheduler for flow steps
+
+Each node is a callable plus the names of the nodes whose results it needs.
+A node starts as soon as all of its dependencies finished, so side branches
+(GDS dumps, snapshots, layout json export, report merges) overlap with the
+critical P&R path instead of blocking it.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from rtl2gds.utils import trace
+from rtl2gds.utils.json_helper import dump_json
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class StepNode:
+    """A unit of work in the flow graph"""
+
+    name: str
+    func: Callable[[], object]
+    deps: list[str] = field(default_factory=list)
+    # nodes of the same branch are reported together
+    branch: str = "main"
+    start_time: float = 0.0
+    end_time: float = 0.0
+    start_datetime: str = ""
+    end_datetime: str = ""
+
+    @property
+    def elapsed(self) -> float:
+        return self.end_time - self.start_time
+
+
+class DagScheduler:
+    """
+    Run `StepNode`s on a thread pool in dependency order.
+
+    The heavy lifting of every node happens in a tool subprocess, so threads
+    are enough to overlap them.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.nodes: dict[str, StepNode] = {}
+        self.results: dict[str, object] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], object],
+        deps: list[str] | None = None,
+        branch: str = "main",
+    ) -> str:
+        """
+        Add a node to the graph.
+
+        Args:
+            name (str): Unique node name.
+            func (Callable): Work of the node, its return value is kept in `results[name]`.
+            deps (list[str], optional): Names of nodes that must finish first.
+            branch (str): Branch label used in the wall time report.
+
+        Returns:
+            str: The node name, handy for chaining `deps`.
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicated flow node: {name}")
+        deps = list(deps or [])
+        for dep in deps:
+            if dep not in self.nodes:
+                raise ValueError(f"Flow node {name} depends on unknown node {dep}")
+        self.nodes[name] = StepNode(name=name, func=func, deps=deps, branch=branch)
+        return name
+
+    def _run_node(self, node: StepNode) -> object:
+        node.start_datetime = datetime.now().isoformat()
+        node.start_time = time.perf_counter()
+        try:
+            with trace.span(node.name, trace.NODE, branch=node.branch):
+                return node.func()
+        finally:
+            node.end_time = time.perf_counter()
+            node.end_datetime = datetime.now().isoformat()
+            logging.info(
+                "(scheduler) node %s [%s] finished in %.2f seconds",
+                node.name,
+                node.branch,
+                node.elapsed,
+            )
+
+    def run(self) -> dict[str, object]:
+        """
+        Run all nodes, each one as soon as its dependencies are done.
+
+        Returns:
+            dict: Node results by node name.
+
+        Raises:
+            Exception: The first exception raised by a node, after running nodes finished.
+        """
+        pending = dict(self.nodes)
+        running: dict[Future, StepNode] = {}
+        done: set[str] = set()
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    ready = [
+                        node for node in pending.values() if all(dep in done for dep in node.deps)
+                    ]
+                    for node in ready:
+                        del pending[node.name]
+                        # run in a copy of this context, so node spans nest under the caller's
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, self._run_node, node)] = node
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        logging.error("(scheduler) node %s failed: %s", node.name, exc)
+                        error = error or exc
+                        continue
+                    self.results[node.name] = future.result()
+                    done.add(node.name)
+
+        if error is not None:
+            raise error
+        return self.results
+
+    def branch_report(self) -> dict[str, dict]:
+        """
+        Summarize the wall time of each branch.
+
+        Returns:
+            dict: Per branch, its nodes with their elapsed time, the busy time
+            (sum of node times) and the wall time from first start to last end.
+        """
+        report = {}
+        for node in self.nodes.values():
+            if not node.end_time:
+                continue
+            branch = report.setdefault(
+                node.branch,
+                {"nodes": {}, "busy_seconds": 0.0, "_start": node.start_time, "_end": 0.0},
+            )
+            branch["nodes"][node.name] = {
+                "start_time": node.start_datetime,
+                "end_time": node.end_datetime,
+                "elapsed_seconds": node.elapsed,
+            }
+            branch["busy_seconds"] += node.elapsed
+            branch["_start"] = min(branch["_start"], node.start_time)
+            branch["_end"] = max(branch["_end"], node.end_time)
+
+        for branch in report.values():
+            branch["wall_seconds"] = branch.pop("_end") - branch.pop("_start")
+        return report
+
+    def save_branch_report(self, json_file: str) -> str:
+        """Save `branch_report` to a JSON file and return its path"""
+        return dump_json(json_file=json_file, data=self.branch_report())
@@ -0,0 +1,207 @@
+"""
+Scratch directory mode: run the steps on local storage, sync results back
+
+The result dir often lives on slow network storage (NFS, the cloud PVC), and
+every step writes and rereads its DEF, reports and evaluation JSON there. In
+scratch mode the chip's result dir is swapped for a fresh directory under a
+local scratch root (tmpfs, NVMe) for the whole flow. At each step boundary
+the artifacts the step returned are copied back to the real result dir by a
+thread pool, while the flow continues. The checkpoint YAMLs follow once the
+artifacts they refer to are copied, with their paths rewritten to the result
+dir, so a resume never sees a checkpoint whose DEF is not there yet.
+
+A flow that fails flushes everything the scratch dir holds, a finished one the
+`FINAL_DIRS` besides the step artifacts. The scratch dir is removed afterwards.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from rtl2gds.chip import Chip
+from rtl2gds.utils import trace
+
+# files copied back at the same time
+SYNC_WORKERS = 4
+# result subdirs synced when a flow finishes, besides the step artifacts
+FINAL_DIRS = ["evaluation", "log"]
+# checkpoint YAMLs are written here and synced by `sync_step` only, with rewritten paths
+_CHECKPOINT_SUBDIR = ".checkpoints"
+
+
+def _artifact_paths(artifacts: dict) -> list[str]:
+    """File and directory paths of an artifacts dict, list values flattened"""
+    paths = []
+    for value in artifacts.values():
+        for path in value if isinstance(value, (list, tuple)) else [value]:
+            if isinstance(path, str):
+                paths.append(path)
+    return paths
+
+
+class ScratchSync:
+    """
+    Scratch dir of one flow and the background copies back to its result dir.
+
+    Args:
+        result_dir (str): The real result dir.
+        scratch_root (str): Local directory the scratch dir is created in.
+        max_workers (int): Files copied at the same time.
+    """
+
+    def __init__(self, result_dir: str, scratch_root: str, max_workers: int = SYNC_WORKERS):
+        self.result_dir = os.path.abspath(result_dir)
+        os.makedirs(scratch_root, exist_ok=True)
+        self.scratch_dir = tempfile.mkdtemp(
+            prefix=f"{os.path.basename(self.result_dir)}_", dir=scratch_root
+        )
+        self.checkpoint_dir: str | None = None
+        self.errors: list[str] = []
+        self._lock = threading.Lock()
+        self._pending: list[Future] = []
+        self._copy_pool = ThreadPoolExecutor(max_workers, thread_name_prefix="scratch_sync")
+        # one thread: checkpoints are written in order, each after its artifacts
+        self._checkpoint_pool = ThreadPoolExecutor(1, thread_name_prefix="scratch_checkpoint")
+
+    def to_scratch(self, path: str) -> str:
+        return self._swap_prefix(path, self.result_dir, self.scratch_dir)
+
+    def to_result(self, path: str) -> str:
+        return self._swap_prefix(path, self.scratch_dir, self.result_dir)
+
+    @staticmethod
+    def _swap_prefix(path: str, old: str, new: str) -> str:
+        if path == old or path.startswith(old + os.sep):
+            return new + path[len(old) :]
+        return path
+
+    def attach(self, chip: Chip) -> None:
+        """
+        Point the chip's result dir, checkpoints and the files below the result dir at
+        the scratch dir. Existing netlist/DEF files are copied in, for resumed flows.
+        """
+        path_setting = chip.path_setting
+        for name in ("netlist_file", "def_file", "gds_file"):
+            path = getattr(path_setting, name)
+            scratch_path = self.to_scratch(path)
+            if scratch_path != path and os.path.isfile(path):
+                os.makedirs(os.path.dirname(scratch_path), exist_ok=True)
+                shutil.copy2(path, scratch_path)
+            setattr(path_setting, name, scratch_path)
+        path_setting.result_dir = self.scratch_dir
+        self.checkpoint_dir = str(chip.config_yaml.parent)
+        chip.config_yaml = Path(self.scratch_dir) / _CHECKPOINT_SUBDIR / chip.config_yaml.name
+        chip.update2config()
+        logging.info("Scratch dir %s, synced to %s", self.scratch_dir, self.result_dir)
+
+    def _detach(self, chip: Chip) -> None:
+        path_setting = chip.path_setting
+        for name in ("netlist_file", "def_file", "gds_file"):
+            setattr(path_setting, name, self.to_result(getattr(path_setting, name)))
+        path_setting.result_dir = self.result_dir
+        if self.checkpoint_dir is not None:
+            chip.config_yaml = Path(self.checkpoint_dir) / chip.config_yaml.name
+        chip.update2config()
+
+    def _copy_file(self, src: str) -> None:
+        dest = self.to_result(src)
+        try:
+            if os.path.exists(dest):
+                src_stat, dest_stat = os.stat(src), os.stat(dest)
+                # copy2 keeps the mtime, an unchanged file was synced before
+                if (src_stat.st_size, src_stat.st_mtime_ns) == (
+                    dest_stat.st_size,
+                    dest_stat.st_mtime_ns,
+                ):
+                    return
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = f"{dest}.{os.getpid()}.{threading.get_ident()}.sync"
+            shutil.copy2(src, tmp)
+            os.replace(tmp, dest)
+        except OSError as e:
+            logging.warning("(scratch) failed to sync %s: %s", src, e)
+            with self._lock:
+                self.errors.append(f"{src}: {e}")
+
+    def sync(self, paths: list[str]) -> list[Future]:
+        """Start copying the files and directory trees among `paths` below the scratch dir"""
+        files = []
+        for path in paths:
+            if self.to_result(path) == path or not os.path.exists(path):
+                continue
+            if os.path.isdir(path):
+                for dirpath, dirnames, filenames in os.walk(path):
+                    if _CHECKPOINT_SUBDIR in dirnames:
+                        dirnames.remove(_CHECKPOINT_SUBDIR)
+                    files.extend(os.path.join(dirpath, name) for name in filenames)
+            else:
+                files.append(path)
+        futures = [self._copy_pool.submit(self._copy_file, path) for path in files]
+        with self._lock:
+            self._pending.extend(futures)
+        return futures
+
+    def _write_checkpoint(self, checkpoint_yaml: str, after: list[Future]) -> None:
+        wait(after)
+        dest = os.path.join(self.checkpoint_dir, os.path.basename(checkpoint_yaml))
+        try:
+            with open(checkpoint_yaml, "r", encoding="utf-8") as f:
+                text = f.read()
+            tmp = f"{dest}.{os.getpid()}.sync"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text.replace(self.scratch_dir, self.result_dir))
+            os.replace(tmp, dest)
+        except OSError as e:
+            logging.warning("(scratch) failed to sync checkpoint %s: %s", checkpoint_yaml, e)
+            with self._lock:
+                self.errors.append(f"{checkpoint_yaml}: {e}")
+
+    def sync_step(self, artifacts: dict, checkpoint_yaml: str | Path | None = None) -> None:
+        """
+        Start syncing a step's artifacts and then, with the result dir paths, the
+        checkpoint YAML written after it.
+        """
+        futures = self.sync(_artifact_paths(artifacts))
+        if checkpoint_yaml is not None and self.checkpoint_dir is not None:
+            future = self._checkpoint_pool.submit(
+                self._write_checkpoint, str(checkpoint_yaml), futures
+            )
+            with self._lock:
+                self._pending.append(future)
+
+    def flush(self) -> None:
+        """Wait for the copies started so far"""
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            wait(pending)
+
+    def close(self, chip: Chip, failed: bool = False) -> None:
+        """
+        Sync what is left, point the chip back at the result dir and remove the scratch
+        dir. A failed flow syncs the whole scratch dir, a finished one its `FINAL_DIRS`.
+        """
+        with trace.span("scratch_sync", trace.POST, failed=failed):
+            if failed:
+                self.sync([self.scratch_dir])
+            else:
+                self.sync([os.path.join(self.scratch_dir, name) for name in FINAL_DIRS])
+            self.flush()
+        self._copy_pool.shutdown()
+        self._checkpoint_pool.shutdown()
+        self._detach(chip)
+        if self.errors:
+            logging.error(
+                "Scratch dir %s not fully synced to %s, kept: %s",
+                self.scratch_dir,
+                self.result_dir,
+                self.errors,
+            )
+            return
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
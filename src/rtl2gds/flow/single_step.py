@@ -1,8 +1,11 @@
 from rtl2gds import step
 from rtl2gds.chip import Chip
+from rtl2gds.chip.config import Keyword
 from rtl2gds.flow import rtl2gds_flow
+from rtl2gds.flow.step_cache import StepCache
 from rtl2gds.flow.step_wrapper import StepWrapper
 from rtl2gds.global_configs import StepName
+from rtl2gds.step import layout_delta
 
 
 def run(
@@ -10,6 +13,7 @@ def run(
     expect_step: str,
     take_snapshot: bool = False,
     cloud_outputs: bool = False,
+    cache: StepCache | None = None,
 ) -> dict:
     """
     Step Router
@@ -17,10 +21,10 @@ def run(
     save_layout_json = False
     result_files = {}
     if expect_step == StepName.RTL2GDS_ALL:
-        rtl2gds_flow.run(chip)
+        rtl2gds_flow.run(chip, cache=cache)
         save_layout_json = True
     else:
-        runner = StepWrapper(chip)
+        runner = StepWrapper(chip, cache=cache)
 
         if expect_step == StepName.SYNTHESIS:
             result_files = runner.run_synthesis()
@@ -50,10 +54,23 @@ def run(
 
     # Dump and return json files
     if cloud_outputs and save_layout_json:
+        delta = bool(chip.config.get(Keyword.LAYOUT_DELTA))
+        base_step = rtl2gds_flow.previous_layout_json_step(chip.finished_step)
+        delta_base = None
+        if delta and base_step:
+            delta_base = layout_delta.base_index(
+                f"{chip.path_setting.result_dir}/{chip.top_name}_{base_step}.json"
+            )
         json_files = step.layout_json.run(
             input_def=chip.path_setting.def_file,
             result_dir=chip.path_setting.result_dir,
             layout_json_file=f"{chip.path_setting.result_dir}/{chip.top_name}_{chip.finished_step}.json",
+            ieda_overrides=chip.config.get(Keyword.IEDA_CONFIG),
+            binary=bool(chip.config.get(Keyword.LAYOUT_BINARY)),
+            tiles=chip.config.get(Keyword.LAYOUT_TILES) or None,
+            die_bbox=chip.constrain.die_bbox,
+            delta=delta,
+            delta_base=delta_base,
         )
         result_files.update({"json_files": json_files})
 
@@ -0,0 +1,227 @@
+"""
+Content-addressed cache of step results
+
+A step is keyed on everything that can change its outputs: input file bytes,
+the tool scripts and configs, the step parameters/environment and the tool binary.
+On a hit, artifacts are copied back into the result directory and the recorded
+metrics are returned, so the caller can not tell a restored step from a fresh run.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import orjson
+
+from rtl2gds.global_configs import DEFAULT_CACHE_DIR
+from rtl2gds.utils.hashing import file_digest, tool_fingerprint, tree_digest, value_digest
+
+CACHE_FORMAT_VERSION = 1
+# placeholder for the result directory in cache keys and manifests
+RESULT_DIR_TOKEN = "${RESULT_DIR}"
+# tool search paths vary by host, the tool binary itself is fingerprinted instead
+_ENV_KEYS_NOT_HASHED = ("PATH", "LD_LIBRARY_PATH")
+
+
+def _normalize(value: object, result_dir: str) -> object:
+    """Replace the result directory prefix with a placeholder, recursively"""
+    if isinstance(value, str):
+        return value.replace(result_dir, RESULT_DIR_TOKEN)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item, result_dir) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item, result_dir) for key, item in value.items()}
+    return value
+
+
+class StepCache:
+    """
+    Persistent step result cache
+
+    Layout of `cache_dir`:
+        steps/<key[:2]>/<key>.json      manifest: metrics and artifact -> blob mapping
+        blobs/<digest[:2]>/<digest>     artifact file contents, shared between entries
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        self.cache_dir = os.path.abspath(cache_dir or DEFAULT_CACHE_DIR)
+        self.steps_dir = f"{self.cache_dir}/steps"
+        self.blobs_dir = f"{self.cache_dir}/blobs"
+
+    def make_key(
+        self,
+        step_name: str,
+        result_dir: str,
+        input_files: list[str],
+        shell_cmd: list[str],
+        env: dict[str, str],
+        params: dict[str, object],
+        support_paths: list[str] | None = None,
+    ) -> str:
+        """
+        Compute the cache key of a step run.
+
+        Args:
+            step_name (str): Name of the step.
+            result_dir (str): Result directory, hashed as a placeholder so runs in
+                different directories share entries.
+            input_files (list[str]): Files read by the step, hashed by content.
+            shell_cmd (list[str]): Step command, file arguments (tcl scripts) are hashed by content.
+            env (dict[str, str]): Tool environment merged into the step env.
+            params (dict[str, object]): Step parameters the step env is derived from.
+            support_paths (list[str], optional): Extra files or directories the tool
+                reads (sourced scripts, iEDA json configs, sdc), hashed by content.
+
+        Returns:
+            str: Hex digest identifying the step run.
+        """
+        result_dir = os.path.abspath(result_dir)
+        cmd_record = []
+        for arg in shell_cmd:
+            arg = str(arg)
+            cmd_record.append(file_digest(arg) if os.path.isfile(arg) else arg)
+
+        hashed_env = {key: value for key, value in env.items() if key not in _ENV_KEYS_NOT_HASHED}
+
+        record = {
+            "version": CACHE_FORMAT_VERSION,
+            "step": step_name,
+            "inputs": [file_digest(path) for path in input_files],
+            "cmd": cmd_record,
+            "tool": tool_fingerprint(str(shell_cmd[0]), env.get("PATH")),
+            "env": _normalize(hashed_env, result_dir),
+            "params": _normalize(params, result_dir),
+            "support": [
+                tree_digest(path) if os.path.exists(path) else f"{path}:missing"
+                for path in (support_paths or [])
+            ],
+        }
+        return value_digest(record)
+
+    def _manifest_path(self, key: str) -> str:
+        return f"{self.steps_dir}/{key[:2]}/{key}.json"
+
+    def _blob_path(self, digest: str) -> str:
+        return f"{self.blobs_dir}/{digest[:2]}/{digest}"
+
+    def _store_blob(self, file_path: str) -> str:
+        digest = file_digest(file_path)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path))
+            os.close(fd)
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, blob_path)
+        return digest
+
+    def load(self, key: str, result_dir: str) -> tuple[dict, dict] | None:
+        """
+        Restore a cached step into `result_dir`.
+
+        Args:
+            key (str): Cache key from `make_key`.
+            result_dir (str): Result directory to restore artifacts into.
+
+        Returns:
+            tuple | None: (metrics, artifacts) as returned by the step, or None on a miss.
+        """
+        manifest_path = self._manifest_path(key)
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path, "rb") as f:
+            manifest = orjson.loads(f.read())
+
+        blobs = [
+            self._blob_path(digest)
+            for artifact in manifest["artifacts"].values()
+            for digest in artifact["files"].values()
+        ]
+        if not all(os.path.exists(blob) for blob in blobs):
+            logging.warning("(step_cache) entry %s has missing blobs, ignored", key[:12])
+            return None
+
+        result_dir = os.path.abspath(result_dir)
+        artifacts = {}
+        for name, artifact in manifest["artifacts"].items():
+            dest = artifact["path"].replace(RESULT_DIR_TOKEN, result_dir)
+            for rel_path, digest in artifact["files"].items():
+                file_dest = os.path.join(dest, rel_path) if rel_path else dest
+                os.makedirs(os.path.dirname(file_dest), exist_ok=True)
+                shutil.copyfile(self._blob_path(digest), file_dest)
+            if artifact["is_dir"]:
+                os.makedirs(dest, exist_ok=True)
+            artifacts[name] = dest
+
+        logging.info("(step_cache) hit %s for step %s", key[:12], manifest["step"])
+        return manifest["metrics"], artifacts
+
+    def save(
+        self,
+        key: str,
+        step_name: str,
+        result_dir: str,
+        metrics: dict,
+        artifacts: dict,
+    ) -> bool:
+        """
+        Store a finished step in the cache.
+
+        Args:
+            key (str): Cache key from `make_key`.
+            step_name (str): Name of the step.
+            result_dir (str): Result directory the step wrote into.
+            metrics (dict): Metrics returned by the step, must be json-serializable.
+            artifacts (dict): Artifacts returned by the step, files or directories.
+
+        Returns:
+            bool: True if stored, False if some artifact is missing.
+        """
+        result_dir = os.path.abspath(result_dir)
+        manifest_artifacts = {}
+        for name, path in artifacts.items():
+            path = os.path.abspath(str(path))
+            if os.path.isdir(path):
+                files = {}
+                for root, _, names in os.walk(path):
+                    for file_name in names:
+                        file_path = os.path.join(root, file_name)
+                        files[os.path.relpath(file_path, path)] = self._store_blob(file_path)
+                is_dir = True
+            elif os.path.isfile(path):
+                files = {"": self._store_blob(path)}
+                is_dir = False
+            else:
+                logging.warning(
+                    "(step_cache) step %s artifact %s not found: %s, not cached",
+                    step_name,
+                    name,
+                    path,
+                )
+                return False
+            manifest_artifacts[name] = {
+                "path": _normalize(path, result_dir),
+                "is_dir": is_dir,
+                "files": files,
+            }
+
+        manifest = {
+            "version": CACHE_FORMAT_VERSION,
+            "step": step_name,
+            "created": time.strftime("%Y%m%d_%H%M%S"),
+            "metrics": metrics,
+            "artifacts": manifest_artifacts,
+        }
+
+        manifest_path = self._manifest_path(key)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(manifest_path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, manifest_path)
+
+        logging.info("(step_cache) stored %s for step %s", key[:12], step_name)
+        return True
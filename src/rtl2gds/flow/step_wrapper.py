@@ -1,11 +1,36 @@
+import logging
 import os
+import shutil
 
 from rtl2gds import step
 from rtl2gds.chip import Chip
-from rtl2gds.global_configs import RTL2GDS_FLOW_STEPS, StepName
-from rtl2gds.utils import process
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow.pruning import Pruner
+from rtl2gds.flow.scratch import ScratchSync
+from rtl2gds.flow.step_cache import StepCache
+from rtl2gds.global_configs import (
+    DEFAULT_SDC_FILE,
+    ENV_TOOLS_PATH,
+    R2G_TOOL_DIR,
+    RTL2GDS_FLOW_STEPS,
+    StepName,
+)
+from rtl2gds.step import layout_delta
+from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.step.ieda_session import IEDASession
+from rtl2gds.utils import compression, process, stream, watchdog
+from rtl2gds.utils.rusage import save_resource_data
+from rtl2gds.utils.threads import ThreadBudget
 from rtl2gds.utils.time import save_execute_time_data
 
+# files sourced or read by the tools besides the step script itself
+YOSYS_SUPPORT_PATHS = [f"{R2G_TOOL_DIR}/yosys"]
+IEDA_SUPPORT_PATHS = [
+    ENV_TOOLS_PATH["IEDA_TCL_SCRIPT_DIR"],
+    ENV_TOOLS_PATH["IEDA_CONFIG_DIR"],
+    DEFAULT_SDC_FILE,
+]
+
 
 def get_expected_step(finished_step: str) -> str | None:
     """Get the expected step for the rtl2gds flow"""
@@ -20,28 +45,163 @@ class StepWrapper:
     return step metrics file
     """
 
-    def __init__(self, chip: Chip):
+    def __init__(
+        self,
+        chip: Chip,
+        cache: StepCache | None = None,
+        pruner: Pruner | None = None,
+        ieda_session: IEDASession | None = None,
+        def_checkpoints: list[str] | None = None,
+        thread_budget: ThreadBudget | None = None,
+        scratch: ScratchSync | None = None,
+    ):
+        """
+        Args:
+            chip (Chip): The design, updated after each step.
+            cache (StepCache, optional): Step result cache.
+            pruner (Pruner, optional): Predicates checked after each step.
+            ieda_session (IEDASession, optional): Run P&R steps in this persistent
+                iEDA session instead of one process per step. Such steps bypass the cache,
+                their result depends on the in-memory database.
+            def_checkpoints (list[str], optional): In a session, the P&R steps whose
+                DEF/verilog are written, all of them by default.
+            thread_budget (ThreadBudget, optional): Threads of the P&R steps, from the
+                `THREADS` config or all the cores available to this process by default.
+            scratch (ScratchSync, optional): The chip runs in a scratch dir, step results
+                and checkpoints are synced back to the result dir by it.
+        """
         self.chip = chip
+        self.cache = cache
+        self.pruner = pruner
+        self.ieda_session = ieda_session
+        self.def_checkpoints = def_checkpoints
+        self.watchdog_policy = watchdog.WatchdogPolicy.from_config(
+            chip.config.get(Keyword.WATCHDOG)
+        )
+        self.thread_budget = thread_budget or ThreadBudget.from_config(
+            chip.config.get(Keyword.THREADS)
+        )
+        self.scratch = scratch
+        self.ieda_overrides = chip.config.get(Keyword.IEDA_CONFIG) or None
+        self.compression_codec = compression.check_codec(
+            chip.config.get(Keyword.INTERMEDIATE_COMPRESSION) or None
+        )
 
     def _check_expected_step(self, step_name: str) -> None:
         expected_step = get_expected_step(self.chip.finished_step)
         if expected_step != step_name:
             raise ValueError(f"Expected step: {expected_step}, but got: {step_name}")
 
+    def save_checkpoint(self, artifacts: dict | None = None) -> None:
+        """Record the chip in a checkpoint YAML, synced after `artifacts` in scratch mode"""
+        self.chip.update2config()
+        checkpoint_yaml = self.chip.dump_config_yaml()
+        if self.scratch is not None:
+            self.scratch.sync_step(artifacts or {}, checkpoint_yaml)
+
+    def _check_pruning(self, step_name: str) -> None:
+        """Stop the run (raise `PruneError`) if the finished step fails a pruning predicate"""
+        if self.pruner is not None:
+            self.pruner.check(self.chip, step_name)
+
+    def _archive_attempt(self, step_name: str, attempt: int, error: Exception) -> str:
+        """Move the log of a stopped attempt to `attempts/<step>_<attempt>/`"""
+        result_dir = self.chip.path_setting.result_dir
+        attempt_dir = f"{result_dir}/attempts/{step_name}_{attempt}"
+        os.makedirs(attempt_dir, exist_ok=True)
+        log_file = stream.step_log_file(result_dir, step_name)
+        if os.path.exists(log_file):
+            shutil.move(log_file, f"{attempt_dir}/{os.path.basename(log_file)}")
+        with open(f"{attempt_dir}/reason.txt", "w", encoding="utf-8") as f:
+            f.write(f"{error}\n")
+        return attempt_dir
+
+    def _attempt(self, step_name: str, step_func, params: dict) -> tuple[dict, dict]:
+        """Run `step_func(**params)` under the watchdog policy, retrying stopped runs"""
+        policy = self.watchdog_policy
+        attempts = 1 + (policy.retries if policy else 0)
+        for attempt in range(1, attempts + 1):
+            try:
+                with watchdog.policy_scope(policy):
+                    return step_func(**params)
+            except watchdog.WatchdogError as e:
+                if attempt == attempts:
+                    raise
+                attempt_dir = self._archive_attempt(step_name, attempt, e)
+                logging.warning(
+                    "%s, retrying (%d/%d), previous attempt in %s",
+                    e,
+                    attempt,
+                    attempts - 1,
+                    attempt_dir,
+                )
+
+    def _run_step(
+        self,
+        step_name: str,
+        step_func,
+        params: dict,
+        input_files: list[str],
+        support_paths: list[str],
+    ) -> tuple[dict, dict]:
+        """Run `step_func(**params)`, or restore its results from the step cache"""
+        if self.cache is None:
+            return self._record(step_name, *self._attempt(step_name, step_func, params))
+
+        result_dir = self.chip.path_setting.result_dir
+        key = self.cache.make_key(
+            step_name=step_name,
+            result_dir=result_dir,
+            input_files=input_files,
+            shell_cmd=SHELL_CMD[step_name],
+            env=ENV_TOOLS_PATH,
+            params=params,
+            support_paths=support_paths,
+        )
+        cached = self.cache.load(key, result_dir)
+        if cached is not None:
+            return self._record(step_name, *cached)
+
+        metrics, artifacts = self._attempt(step_name, step_func, params)
+        self.cache.save(key, step_name, result_dir, metrics, artifacts)
+        return self._record(step_name, metrics, artifacts)
+
+    def _record(self, step_name: str, metrics: dict, artifacts: dict) -> tuple[dict, dict]:
+        """Account the intermediate compression stats of a step result"""
+        if "intermediate_compression" in metrics:
+            compression.record(step_name, metrics["intermediate_compression"])
+        return metrics, artifacts
+
     def run_synthesis(self) -> dict:
         """Run synthesis step"""
         step_name = StepName.SYNTHESIS
         self._check_expected_step(step_name)
 
-        metrics, artifacts = step.synthesis.run(
-            top_name=self.chip.top_name,
-            rtl_file=self.chip.path_setting.rtl_file,
-            netlist_file=self.chip.path_setting.netlist_file,
-            result_dir=self.chip.path_setting.result_dir,
-            clk_freq_mhz=self.chip.constrain.clk_freq_mhz,
-            die_bbox=self.chip.constrain.die_bbox,
-            core_bbox=self.chip.constrain.core_bbox,
-            core_util=self.chip.constrain.core_util,
+        rtl_file = self.chip.path_setting.rtl_file
+        metrics, artifacts = self._run_step(
+            step_name=step_name,
+            step_func=step.synthesis.run,
+            params=dict(
+                top_name=self.chip.top_name,
+                rtl_file=rtl_file,
+                netlist_file=self.chip.path_setting.netlist_file,
+                result_dir=self.chip.path_setting.result_dir,
+                clk_freq_mhz=self.chip.constrain.clk_freq_mhz,
+                die_bbox=self.chip.constrain.die_bbox,
+                core_bbox=self.chip.constrain.core_bbox,
+                core_util=self.chip.constrain.core_util,
+                hierarchical=bool(self.chip.config.get(Keyword.SYNTH_HIERARCHICAL)),
+                portfolio=self.chip.config.get(Keyword.ABC_PORTFOLIO) or None,
+                # sv2v and module caches next to the step cache, e.g. on a shared farm path
+                cache_dir=self.cache.cache_dir if self.cache is not None else None,
+            ),
+            # `DesignPath.to_env_dict` may have joined a file list with newlines
+            input_files=(
+                rtl_file
+                if isinstance(rtl_file, list)
+                else [f.strip() for f in rtl_file.split("\n")]
+            ),
+            support_paths=YOSYS_SUPPORT_PATHS,
         )
 
         self.chip.constrain.die_bbox = metrics["die_bbox"]
@@ -51,12 +211,17 @@ class StepWrapper:
         self.chip.metrics.num_instances = metrics["num_cells"]
         self.chip.metrics.area.cell = metrics["cell_area"]
         self.chip.metrics.area.core_util = metrics["core_util"]
+        # absent from step cache entries of older versions
+        self.chip.metrics.num_seq_cells = metrics.get("num_sequential_cells", 0)
+        self.chip.metrics.sequential_ratio = metrics.get("sequential_ratio", 0.0)
+        self.chip.metrics.cell_types = metrics.get("cell_types", {})
+        self.chip.metrics.module_cells = metrics.get("module_cells", {})
 
         self.chip.finished_step = step_name
         self.chip.expected_step = get_expected_step(step_name)
 
-        self.chip.update2config()
-        self.chip.dump_config_yaml()
+        self.save_checkpoint(artifacts)
+        self._check_pruning(step_name)
 
         return artifacts
 
@@ -70,17 +235,26 @@ class StepWrapper:
         output_def = f"{self.chip.path_setting.result_dir}/{self.chip.top_name}_{step_name}.def"
         self.chip.path_setting.def_file = output_def
 
-        metrics, artifacts = step.floorplan.run(
-            top_name=self.chip.top_name,
-            result_dir=self.chip.path_setting.result_dir,
-            sdc_file=self.chip.path_setting.sdc_file,
-            input_netlist=self.chip.path_setting.netlist_file,
-            output_def=self.chip.path_setting.def_file,
-            die_bbox=self.chip.constrain.die_bbox,
-            core_bbox=self.chip.constrain.core_bbox,
-            clk_port_name=self.chip.constrain.clk_port_name,
-            clk_freq_mhz=self.chip.constrain.clk_freq_mhz,
+        metrics, artifacts = self._run_step(
+            step_name=step_name,
+            step_func=step.floorplan.run,
+            params=dict(
+                top_name=self.chip.top_name,
+                result_dir=self.chip.path_setting.result_dir,
+                sdc_file=self.chip.path_setting.sdc_file,
+                input_netlist=self.chip.path_setting.netlist_file,
+                output_def=self.chip.path_setting.def_file,
+                die_bbox=self.chip.constrain.die_bbox,
+                core_bbox=self.chip.constrain.core_bbox,
+                clk_port_name=self.chip.constrain.clk_port_name,
+                clk_freq_mhz=self.chip.constrain.clk_freq_mhz,
+                ieda_overrides=self.ieda_overrides,
+                compression_codec=self.compression_codec,
+            ),
+            input_files=[self.chip.path_setting.netlist_file],
+            support_paths=IEDA_SUPPORT_PATHS + [self.chip.path_setting.sdc_file],
         )
+        self.chip.path_setting.def_file = artifacts["def"]
 
         self.chip.constrain.die_bbox = metrics["die_bbox"]
         self.chip.constrain.core_bbox = metrics["core_bbox"]
@@ -97,8 +271,8 @@ class StepWrapper:
         self.chip.finished_step = step_name
         self.chip.expected_step = get_expected_step(step_name)
 
-        self.chip.update2config()
-        self.chip.dump_config_yaml()
+        self.save_checkpoint(artifacts)
+        self._check_pruning(step_name)
 
         return artifacts
 
@@ -116,7 +290,7 @@ class StepWrapper:
         # Create metrics directory (iEDA issue workaround)
         os.makedirs(f"{self.chip.path_setting.result_dir}/metrics", exist_ok=True)
 
-        metrics, artifacts = step_obj.run(
+        params = dict(
             top_name=self.chip.top_name,
             input_def=self.chip.path_setting.def_file,
             result_dir=self.chip.path_setting.result_dir,
@@ -124,9 +298,29 @@ class StepWrapper:
             output_verilog=output_verilog,
             clk_port_name=self.chip.constrain.clk_port_name,
             clk_freq_mhz=self.chip.constrain.clk_freq_mhz,
+            num_threads=self.thread_budget.for_step(step_name),
+            ieda_overrides=self.ieda_overrides,
+            compression_codec=self.compression_codec,
         )
-
-        self.chip.path_setting.def_file = output_def
+        if self.ieda_session is not None:
+            save_def = self.def_checkpoints is None or step_name in self.def_checkpoints
+            # the watchdog bounds each session command, a stopped step is not retried:
+            # the in-memory design it worked on is gone with the session
+            with watchdog.policy_scope(self.watchdog_policy):
+                result = step_obj.run(**params, session=self.ieda_session, save_def=save_def)
+            metrics, artifacts = self._record(step_name, *result)
+        else:
+            metrics, artifacts = self._run_step(
+                step_name=step_name,
+                step_func=step_obj.run,
+                params=params,
+                input_files=[self.chip.path_setting.def_file],
+                support_paths=IEDA_SUPPORT_PATHS,
+            )
+
+        # in a session without a DEF checkpoint this file is not written, so the
+        # checkpoint of this step is not resumable, as intended
+        self.chip.path_setting.def_file = artifacts.get("def", output_def)
 
         self.chip.finished_step = step_name
         self.chip.expected_step = get_expected_step(step_name)
@@ -136,34 +330,86 @@ class StepWrapper:
         self.chip.metrics.area.core_util = metrics["core_util"]
         self.chip.metrics.num_instances = metrics["num_instances"]
 
-        self.chip.update2config()
-        self.chip.dump_config_yaml()
+        self.save_checkpoint(artifacts)
+        self._check_pruning(step_name)
 
         return artifacts
 
-    def run_save_layout_gds(self, step_name: str, take_snapshot: bool = False) -> dict:
-        """Run dump layout GDS step"""
+    def run_save_layout_gds(
+        self,
+        step_name: str,
+        take_snapshot: bool = False,
+        input_def: str | None = None,
+        update_chip: bool = True,
+    ) -> dict:
+        """
+        Run dump layout GDS step
+
+        Args:
+            step_name (str): Step whose DEF is dumped, used in output file names.
+            take_snapshot (bool): Also save a PNG snapshot of the GDS.
+            input_def (str, optional): DEF to dump, defaults to the chip's current DEF.
+            update_chip (bool): Record the GDS in the chip config. Disable it when
+                dumping concurrently with later steps that update the chip.
+        """
         gds_file = f"{self.chip.path_setting.result_dir}/{self.chip.top_name}_{step_name}.gds"
         snapshot_file = f"{self.chip.path_setting.result_dir}/{self.chip.top_name}_{step_name}.png"
 
-        step.layout_gds.run(
-            top_name=self.chip.top_name,
-            input_def=self.chip.path_setting.def_file,
-            die_area_bbox=self.chip.constrain.die_bbox,
-            gds_file=gds_file,
-            snapshot_file=snapshot_file if take_snapshot else None,
-            tool="magic",
-        )
-
-        self.chip.path_setting.gds_file = gds_file
-
-        self.chip.update2config()
-        self.chip.dump_config_yaml()
+        with watchdog.policy_scope(self.watchdog_policy):
+            step.layout_gds.run(
+                top_name=self.chip.top_name,
+                input_def=input_def or self.chip.path_setting.def_file,
+                die_area_bbox=self.chip.constrain.die_bbox,
+                gds_file=gds_file,
+                snapshot_file=snapshot_file if take_snapshot else None,
+                tool="magic",
+                ieda_overrides=self.ieda_overrides,
+            )
 
         if take_snapshot:
-            return dict({"gds_file": gds_file, "snapshot_file": snapshot_file})
+            artifacts = dict({"gds_file": gds_file, "snapshot_file": snapshot_file})
         else:
-            return dict({"gds_file": gds_file})
+            artifacts = dict({"gds_file": gds_file})
+
+        if update_chip:
+            self.chip.path_setting.gds_file = gds_file
+            self.save_checkpoint(artifacts)
+        elif self.scratch is not None:
+            self.scratch.sync_step(artifacts)
+        return artifacts
+
+    def run_save_layout_json(
+        self, step_name: str, input_def: str | None = None, base_step: str | None = None
+    ) -> dict:
+        """
+        Run dump layout JSON step (split into chunk files for the cloud viewer)
+
+        With `Keyword.LAYOUT_DELTA`, the export is a delta against the one of `base_step`
+        when it exists (see `step.layout_delta`).
+        """
+        layout_json_file = self._layout_json_file(step_name)
+        delta = bool(self.chip.config.get(Keyword.LAYOUT_DELTA))
+        delta_base = None
+        if delta and base_step:
+            delta_base = layout_delta.base_index(self._layout_json_file(base_step))
+        with watchdog.policy_scope(self.watchdog_policy):
+            json_files = step.layout_json.run(
+                input_def=input_def or self.chip.path_setting.def_file,
+                result_dir=self.chip.path_setting.result_dir,
+                layout_json_file=layout_json_file,
+                ieda_overrides=self.ieda_overrides,
+                binary=bool(self.chip.config.get(Keyword.LAYOUT_BINARY)),
+                tiles=self.chip.config.get(Keyword.LAYOUT_TILES) or None,
+                die_bbox=self.chip.constrain.die_bbox,
+                delta=delta,
+                delta_base=delta_base,
+            )
+        if self.scratch is not None:
+            self.scratch.sync_step({"json_files": json_files})
+        return dict({"json_files": json_files})
+
+    def _layout_json_file(self, step_name: str) -> str:
+        return f"{self.chip.path_setting.result_dir}/{self.chip.top_name}_{step_name}.json"
 
     def run_collect_timing_metrics(self) -> dict:
         """Run collect timing metrics step"""
@@ -173,6 +419,8 @@ class StepWrapper:
             result_dir=f"{self.chip.path_setting.result_dir}",
             log_path=f"{self.chip.path_setting.result_dir}/{self.chip.top_name}.log",
         )
+        if self.scratch is not None:
+            self.scratch.sync_step({output_file: output_file})
 
         return dict({output_file: output_file})
 
@@ -180,8 +428,14 @@ class StepWrapper:
         """Save execute time report"""
         return save_execute_time_data(self.chip.path_setting.result_dir, self.chip.top_name)
 
-    def save_merged_metrics(self, execute_time_json: str):
-        """Merge and save the metrics from execution time and timing reports"""
+    def save_resource_report(self) -> str:
+        """Save per-step resource usage report"""
+        return save_resource_data(self.chip.path_setting.result_dir, self.chip.top_name)
+
+    def save_merged_metrics(self, execute_time_json: str, resource_json: str | None = None):
+        """Merge and save the metrics from execution time, resource usage and timing reports"""
         from ..utils import time as time_utils
 
-        return time_utils.save_merged_metrics(self.chip, execute_time_json=execute_time_json)
+        return time_utils.save_merged_metrics(
+            self.chip, execute_time_json=execute_time_json, resource_json=resource_json
+        )
@@ -0,0 +1,319 @@
+"""
+Design space exploration: run the flow over a grid or sample of constraints
+
+Every point is an isolated flow in its own process and its own `result_dir`,
+built from a copy of the base config with `CORE_UTIL` / `CLK_FREQ_MHZ` overridden.
+The `final_metrics.json` of each point is collected into one table.
+"""
+
+import csv
+import itertools
+import logging
+import multiprocessing
+import os
+import random
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rtl2gds.chip import Chip
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow import rtl2gds_flow
+from rtl2gds.flow.pruning import PruneError, Pruner
+from rtl2gds.flow.scheduler import DEFAULT_MAX_WORKERS
+from rtl2gds.flow.step_cache import StepCache
+from rtl2gds.utils import compression, rusage, trace
+from rtl2gds.utils.json_helper import dump_json, load_json
+from rtl2gds.utils.threads import ThreadBudget, available_cpus
+
+SWEEP_PARAMS = (Keyword.CORE_UTIL, Keyword.CLK_FREQ_MHZ)
+SAMPLE_METHODS = ("grid", "random", "lhs")
+# rough peak memory of one flow on a mid-size design, used to bound concurrency
+DEFAULT_MEM_PER_RUN_GB = 4.0
+DEFAULT_CORES_PER_RUN = 2
+# flow progress that must not leak from the base config into the points
+_RUN_STATE_KEYS = (
+    Keyword.FINISHED_STEP,
+    Keyword.EXPECTED_STEP,
+    Keyword.INIT_TIME,
+    Keyword.LAST_UPDATE_TIME,
+    Keyword.ARTIFACT_CHECKSUMS,
+)
+
+
+def grid_points(values: dict[str, list]) -> list[dict]:
+    """
+    Cartesian product of parameter values.
+
+    Args:
+        values (dict): Parameter name to the list of values to try.
+
+    Returns:
+        list[dict]: One dict of parameter values per point.
+    """
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*values.values())]
+
+
+def random_points(ranges: dict[str, tuple[float, float]], num_points: int, seed=None) -> list[dict]:
+    """Uniform random sample of `num_points` points inside `ranges` (name -> (low, high))"""
+    rng = random.Random(seed)
+    return [
+        {name: rng.uniform(low, high) for name, (low, high) in ranges.items()}
+        for _ in range(num_points)
+    ]
+
+
+def lhs_points(ranges: dict[str, tuple[float, float]], num_points: int, seed=None) -> list[dict]:
+    """
+    Latin hypercube sample of `num_points` points inside `ranges`.
+
+    Each parameter range is split in `num_points` equal strata and every stratum
+    is used exactly once, so a few points still cover each axis evenly.
+    """
+    rng = random.Random(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        step = (high - low) / num_points
+        strata = [low + (i + rng.random()) * step for i in range(num_points)]
+        rng.shuffle(strata)
+        columns[name] = strata
+    return [{name: columns[name][i] for name in ranges} for i in range(num_points)]
+
+
+def make_points(
+    values: dict[str, list], method: str = "grid", num_points: int = 0, seed=None
+) -> list[dict]:
+    """
+    Build sweep points from the values given for each parameter.
+
+    Args:
+        values (dict): Parameter name to values. `grid` uses the values as is,
+            `random` and `lhs` sample between the min and max value.
+        method (str): One of `SAMPLE_METHODS`.
+        num_points (int): Number of points for `random` and `lhs`.
+        seed: Random seed for `random` and `lhs`.
+
+    Returns:
+        list[dict]: One dict of parameter values per point.
+    """
+    if method == "grid":
+        return grid_points(values)
+    if method not in SAMPLE_METHODS:
+        raise ValueError(f"Unknown sample method {method}, expected one of {SAMPLE_METHODS}")
+    if num_points <= 0:
+        raise ValueError(f"{method} sampling needs a positive number of points")
+    ranges = {name: (min(v), max(v)) for name, v in values.items()}
+    if method == "random":
+        return random_points(ranges, num_points, seed)
+    return lhs_points(ranges, num_points, seed)
+
+
+def point_name(point: dict) -> str:
+    """Directory-safe name of a sweep point, e.g. `core_util_0.5__clk_freq_mhz_100`"""
+    return "__".join(f"{name.lower()}_{value:g}" for name, value in point.items())
+
+
+def point_config(base_chip: Chip, point: dict, sweep_dir: str) -> dict:
+    """
+    Config of one sweep point: the base config with its own result dir and constraints.
+
+    Paths of the base chip are already absolute, so the config does not depend
+    on the working directory of the worker process.
+    """
+    result_dir = os.path.abspath(f"{sweep_dir}/{point_name(point)}")
+    top_name = base_chip.top_name
+    config = {key: value for key, value in base_chip.config.items() if key not in _RUN_STATE_KEYS}
+    config.update(
+        {
+            Keyword.TOP_NAME: top_name,
+            Keyword.RTL_FILE: base_chip.path_setting.rtl_file,
+            Keyword.RESULT_DIR: result_dir,
+            Keyword.NETLIST_FILE: f"{result_dir}/{top_name}_netlist.v",
+            Keyword.DEF_FILE: f"{result_dir}/{top_name}.def",
+            Keyword.GDS_FILE: f"{result_dir}/{top_name}.gds",
+        }
+    )
+    for name, value in point.items():
+        config[name.upper()] = value
+    if Keyword.CORE_UTIL in point:
+        # an explicit floorplan would override the utilization under test
+        config[Keyword.DIE_BBOX] = ""
+        config[Keyword.CORE_BBOX] = ""
+    return config
+
+
+def available_memory_gb() -> float | None:
+    """Available memory from /proc/meminfo, None if unknown"""
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024 / 1024
+    except OSError:
+        pass
+    return None
+
+
+def default_parallelism(
+    cores_per_run: int = DEFAULT_CORES_PER_RUN,
+    mem_per_run_gb: float = DEFAULT_MEM_PER_RUN_GB,
+) -> int:
+    """
+    Number of flows that fit on this machine at the same time.
+
+    Args:
+        cores_per_run (int): Cores one flow keeps busy.
+        mem_per_run_gb (float): Peak memory of one flow.
+
+    Returns:
+        int: At least 1.
+    """
+    by_cpu = available_cpus() // max(cores_per_run, 1)
+    mem_gb = available_memory_gb()
+    by_mem = int(mem_gb // mem_per_run_gb) if mem_gb and mem_per_run_gb > 0 else by_cpu
+    return max(1, min(by_cpu, by_mem))
+
+
+def _run_point(
+    config: dict, cache_dir: str | None, max_workers: int, pruner: Pruner | None = None
+) -> str:
+    """Run one sweep point, in a worker process. Returns its `final_metrics.json`."""
+    # pool workers are reused, do not report the steps of the previous point
+    trace.tracer.reset()
+    rusage.reset_resource_data()
+    compression.reset_compression_data()
+
+    chip = Chip(config_dict=config)
+    cache = StepCache(cache_dir) if cache_dir else None
+    rtl2gds_flow.run(chip, cache=cache, max_workers=max_workers, pruner=pruner)
+    return f"{chip.path_setting.result_dir}/evaluation/final_metrics.json"
+
+
+def _flatten(data: dict, prefix: str = "") -> dict:
+    """Flatten nested dicts into dotted keys, keeping scalar leaves only"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif not isinstance(value, (list, tuple)):
+            flat[name] = value
+    return flat
+
+
+def save_table(rows: list[dict], csv_file: str) -> str:
+    """Save sweep rows as a CSV table, one column per flattened metric"""
+    flat_rows = [_flatten(row) for row in rows]
+    columns = []
+    for row in flat_rows:
+        columns += [column for column in row if column not in columns]
+    os.makedirs(os.path.dirname(os.path.abspath(csv_file)), exist_ok=True)
+    with open(csv_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(flat_rows)
+    return csv_file
+
+
+def run(
+    base_chip: Chip,
+    points: list[dict],
+    sweep_dir: str,
+    max_parallel: int | None = None,
+    cache_dir: str | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    pruner: Pruner | None = None,
+) -> list[dict]:
+    """
+    Run the flow for every sweep point in a process pool.
+
+    Args:
+        base_chip (Chip): Design whose config every point starts from.
+        points (list[dict]): Parameter values per point, see `make_points`.
+        sweep_dir (str): Each point runs in `<sweep_dir>/<point name>`.
+        max_parallel (int, optional): Flows running at the same time,
+            `default_parallelism()` if not set. Unless the base config sets `THREADS`,
+            each flow gets an equal share of the available cores.
+        cache_dir (str, optional): Step result cache shared by all points,
+            e.g. synthesis is only run once for a utilization sweep.
+        max_workers (int): Flow nodes running at the same time inside one point.
+        pruner (Pruner, optional): Stop points failing a predicate early, their
+            worker moves on to the next point. Must be picklable.
+
+    Returns:
+        list[dict]: One row per point with its parameters, status (finished, pruned
+        or failed) and final metrics.
+        The rows are also saved to `<sweep_dir>/sweep_results.json` and `.csv`, the
+        traces of the points are merged into `<sweep_dir>/sweep_trace.json`.
+    """
+    for point in points:
+        unknown = [name for name in point if name.upper() not in SWEEP_PARAMS]
+        if unknown:
+            raise ValueError(f"Cannot sweep {unknown}, supported parameters: {SWEEP_PARAMS}")
+
+    sweep_dir = os.path.abspath(sweep_dir)
+    os.makedirs(sweep_dir, exist_ok=True)
+    max_parallel = max_parallel or default_parallelism()
+    logging.info("Sweep %d points, %d at a time, in %s", len(points), max_parallel, sweep_dir)
+    # flows running side by side share the cores instead of each taking all of them
+    threads = (
+        base_chip.config.get(Keyword.THREADS)
+        or ThreadBudget(default=max(1, available_cpus() // max_parallel)).to_config()
+    )
+
+    rows = [
+        {
+            "name": point_name(point),
+            "params": point,
+            "result_dir": f"{sweep_dir}/{point_name(point)}",
+            "status": "pending",
+        }
+        for point in points
+    ]
+    # spawn: a fresh interpreter per worker, nothing mutable is inherited from this process
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_parallel, mp_context=mp_context) as executor:
+        futures = {
+            executor.submit(
+                _run_point,
+                {**point_config(base_chip, point, sweep_dir), Keyword.THREADS: threads},
+                cache_dir,
+                max_workers,
+                pruner,
+            ): row
+            for point, row in zip(points, rows)
+        }
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                metrics_json = future.result()
+                row["status"] = "finished"
+                row["final_metrics"] = load_json(metrics_json)
+                logging.info("Sweep point %s finished", row["name"])
+            except PruneError as e:
+                row["status"] = "pruned"
+                row["pruned_after"] = e.step_name
+                row["error"] = e.reason
+                logging.info("Sweep point %s %s", row["name"], e)
+            except Exception as e:  # pylint: disable=broad-except
+                row["status"] = "failed"
+                row["error"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+                logging.error("Sweep point %s failed: %s", row["name"], row["error"])
+
+    dump_json(json_file=f"{sweep_dir}/sweep_results.json", data=rows)
+    save_table(rows, f"{sweep_dir}/sweep_results.csv")
+    logging.info("Sweep results saved to: %s/sweep_results.{json,csv}", sweep_dir)
+
+    traced = [
+        (row["name"], rtl2gds_flow.trace_json_path(row["result_dir"], base_chip.top_name))
+        for row in rows
+    ]
+    traced = [(name, trace_json) for name, trace_json in traced if os.path.exists(trace_json)]
+    if traced:
+        sweep_trace_json = trace.merge_chrome_traces(
+            [trace_json for _, trace_json in traced],
+            f"{sweep_dir}/sweep_trace.json",
+            labels=[name for name, _ in traced],
+        )
+        logging.info("Sweep trace saved to: %s", sweep_trace_json)
+    return rows
@@ -37,6 +37,9 @@ DEFAULT_RESULT_DIR = "rtl2gds_result"
 DEFAULT_NETLIST_FILE = f"{DEFAULT_RESULT_DIR}/rtl2gds_top_netlist.v"
 DEFAULT_DEF_FILE = f"{DEFAULT_RESULT_DIR}/rtl2gds_top_step.def"
 DEFAULT_GDS_FILE = f"{DEFAULT_RESULT_DIR}/rtl2gds_top_layout.gds"
+DEFAULT_CACHE_DIR = os.environ.get(
+    "RTL2GDS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rtl2gds")
+)
 
 
 # Flow & Step settings
@@ -0,0 +1,232 @@
+"""
+Portfolio of ABC mapping recipes run in parallel, the best result is kept
+
+The design is elaborated and mapped to flip-flops once (the "elaborate" half of
+`yosys_synthesis.tcl`, saved as RTLIL), then every recipe maps the saved design
+with its own ABC script at the same time (the "map" half). The candidates are
+scored on their `synth_stat.json` area and the delay of ABC's final `stime`:
+- "area": the smallest cell area,
+- "delay": the smallest area among the candidates meeting the clock period, the
+  smallest delay if none does.
+The reports and netlist of the winner become the outputs of the synthesis step.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from rtl2gds.global_configs import ENV_TOOLS_PATH, R2G_TOOL_DIR, StepName
+from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.utils import progress, rusage, stream, trace
+from rtl2gds.utils.threads import available_cpus
+
+ABC_RECIPES = {
+    "balanced": f"{R2G_TOOL_DIR}/yosys/scripts/abc-opt.script",
+    "area": f"{R2G_TOOL_DIR}/yosys/scripts/abc-area.script",
+    "delay": f"{R2G_TOOL_DIR}/yosys/scripts/abc-delay.script",
+}
+OBJECTIVES = ["area", "delay"]
+
+# `stime`: ... Area = 1234.56 ( 94.0 %)   Delay = 567.89 ps  ( 12.3 %)
+_RE_DELAY = re.compile(r"Delay\s*=\s*([\d.]+)\s*ps")
+
+
+@dataclass
+class AbcPortfolio:
+    """
+    Recipes run by the synthesis step and how their results are compared.
+
+    Attributes:
+        recipes (list[str]): Names of `ABC_RECIPES`.
+        objective (str): One of `OBJECTIVES`.
+    """
+
+    recipes: list[str] = field(default_factory=lambda: list(ABC_RECIPES))
+    objective: str = "area"
+
+    def __post_init__(self):
+        unknown = [recipe for recipe in self.recipes if recipe not in ABC_RECIPES]
+        if unknown or not self.recipes:
+            raise ValueError(f"Unknown ABC recipes {unknown}, expected some of {list(ABC_RECIPES)}")
+        if self.objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {self.objective}, expected one of {OBJECTIVES}")
+
+    def to_config(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_config(cls, config: dict | list | None) -> "AbcPortfolio | None":
+        """Portfolio stored in a chip config value, a dict like `to_config` or a recipe list"""
+        if not config:
+            return None
+        if isinstance(config, list):
+            return cls(recipes=config)
+        return cls(
+            **{key: value for key, value in config.items() if key in cls.__dataclass_fields__}
+        )
+
+
+@dataclass
+class Candidate:
+    """Result of one recipe, `area`/`delay_ps` are None if unknown"""
+
+    recipe: str
+    output_dir: str
+    ret_code: int | None = None
+    area: float | None = None
+    delay_ps: float | None = None
+
+    def file(self, name: str) -> str:
+        return f"{self.output_dir}/{name}"
+
+
+def parse_delay(log_file: str) -> float | None:
+    """Delay of the last ABC `stime` in a yosys log, in ps"""
+    delay = None
+    with open(log_file, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _RE_DELAY.search(line)
+            if match:
+                delay = float(match.group(1))
+    return delay
+
+
+def select(candidates: list[Candidate], objective: str, clk_freq_mhz: str) -> Candidate:
+    """
+    The best of the successful `candidates` for `objective`, see the module doc.
+
+    Raises:
+        ValueError: If no candidate has an area.
+    """
+    finished = [c for c in candidates if c.ret_code == 0 and c.area is not None]
+    if not finished:
+        raise ValueError("No ABC recipe produced a netlist")
+
+    if objective == "delay":
+        clk_period_ps = 1e6 / float(clk_freq_mhz)
+        met = [c for c in finished if c.delay_ps is not None and c.delay_ps <= clk_period_ps]
+        if not met:
+            return min(finished, key=lambda c: (c.delay_ps is None, c.delay_ps or 0.0, c.area))
+        finished = met
+    return min(finished, key=lambda c: (c.area, c.delay_ps or 0.0))
+
+
+def _step_env(top_name: str, rtl_file: str, clk_freq_mhz: str, output_dir: str) -> dict:
+    step_env = {
+        "TOP_NAME": str(top_name),
+        "RTL_FILE": str(rtl_file),
+        "NETLIST_FILE": f"{output_dir}/netlist.v",
+        "SYNTH_STAT_JSON": f"{output_dir}/synth_stat.json",
+        "SYNTH_CHECK_TXT": f"{output_dir}/synth_check.txt",
+        "CLK_FREQ_MHZ": str(clk_freq_mhz),
+        "RESULT_DIR": output_dir,
+    }
+    step_env.update(ENV_TOOLS_PATH)
+    return step_env
+
+
+def _map(candidate: Candidate, step_env: dict, result_dir: str) -> Candidate:
+    os.makedirs(candidate.output_dir, exist_ok=True)
+    log_file = stream.step_log_file(result_dir, f"{StepName.SYNTHESIS}_{candidate.recipe}")
+    candidate.ret_code = rusage.call(
+        SHELL_CMD[StepName.SYNTHESIS],
+        StepName.SYNTHESIS,
+        log_file=log_file,
+        env=step_env,
+    )
+    if candidate.ret_code != 0:
+        logging.warning("(abc_portfolio) recipe %s failed, see %s", candidate.recipe, log_file)
+        return candidate
+    with open(candidate.file("synth_stat.json"), "r", encoding="utf-8") as f:
+        candidate.area = float(json.load(f)["design"]["area"])
+    candidate.delay_ps = parse_delay(log_file)
+    return candidate
+
+
+def run(
+    portfolio: AbcPortfolio,
+    top_name: str,
+    rtl_file: str,
+    artifacts: dict,
+    clk_freq_mhz: str,
+    result_dir: str,
+) -> dict:
+    """
+    Synthesize with every recipe of `portfolio` and keep the best netlist.
+
+    Args:
+        rtl_file (str): RTL file(s), newline separated like `yosys_synthesis.tcl` expects.
+        artifacts (dict): Output paths of the synthesis step, "netlist",
+            "synth_stat_json" and "synth_check_txt", the winner is copied there.
+
+    Returns:
+        dict: The objective, the selected recipe and the area/delay of every candidate.
+
+    Raises:
+        subprocess.CalledProcessError: If the elaboration or every recipe fails.
+    """
+    portfolio_dir = f"{result_dir}/abc_portfolio"
+    os.makedirs(portfolio_dir, exist_ok=True)
+    design_rtlil = f"{portfolio_dir}/{top_name}_elaborated.il"
+    step_cmd = SHELL_CMD[StepName.SYNTHESIS]
+
+    step_env = _step_env(top_name, rtl_file, clk_freq_mhz, portfolio_dir)
+    step_env.update({"SYNTH_STAGE": "elaborate", "DESIGN_RTLIL": design_rtlil})
+    ret_code = rusage.call(
+        step_cmd,
+        StepName.SYNTHESIS,
+        log_file=stream.step_log_file(result_dir, StepName.SYNTHESIS),
+        parsers=progress.parsers_for("yosys"),
+        env=step_env,
+    )
+    if ret_code != 0:
+        raise subprocess.CalledProcessError(ret_code, step_cmd)
+
+    candidates = [Candidate(recipe, f"{portfolio_dir}/{recipe}") for recipe in portfolio.recipes]
+    with trace.span("abc_portfolio", trace.SUBPROCESS, recipes=portfolio.recipes) as span:
+        max_workers = min(len(candidates), available_cpus())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for candidate in candidates:
+                step_env = _step_env(top_name, rtl_file, clk_freq_mhz, candidate.output_dir)
+                step_env.update(
+                    {
+                        "SYNTH_STAGE": "map",
+                        "DESIGN_RTLIL": design_rtlil,
+                        "ABC_SCRIPT": ABC_RECIPES[candidate.recipe],
+                    }
+                )
+                futures.append(executor.submit(_map, candidate, step_env, result_dir))
+            for future in futures:
+                future.result()
+        try:
+            best = select(candidates, portfolio.objective, clk_freq_mhz)
+        except ValueError:
+            raise subprocess.CalledProcessError(
+                next(c.ret_code for c in candidates if c.ret_code), step_cmd
+            ) from None
+        span.args["selected"] = best.recipe
+
+    logging.info(
+        "(abc_portfolio) %s selected for %s: %s",
+        best.recipe,
+        portfolio.objective,
+        ", ".join(f"{c.recipe} area {c.area} delay {c.delay_ps} ps" for c in candidates),
+    )
+    shutil.copyfile(best.file("netlist.v"), artifacts["netlist"])
+    shutil.copyfile(best.file("synth_check.txt"), artifacts["synth_check_txt"])
+    for suffix in ("", ".rpt"):
+        shutil.copyfile(
+            best.file(f"synth_stat.json{suffix}"), artifacts["synth_stat_json"] + suffix
+        )
+
+    return {
+        "objective": portfolio.objective,
+        "selected": best.recipe,
+        "candidates": {c.recipe: {"area": c.area, "delay_ps": c.delay_ps} for c in candidates},
+    }
@@ -60,3 +60,25 @@ SHELL_CMD = {
         f'{ENV_TOOLS_PATH["IEDA_TCL_SCRIPT_DIR"]}/iSTA_script/run_iSTA.tcl',
     ],
 }
+
+# persistent iEDA session (see `step.ieda_session`): one process for all P&R steps
+IEDA_SESSION_CMD = [
+    "iEDA",
+    "-script",
+    f'{ENV_TOOLS_PATH["IEDA_TCL_SCRIPT_DIR"]}/session_script/run_session.tcl',
+]
+# step bodies sourced by the session, they expect the design to be loaded already
+IEDA_SESSION_SCRIPT = {
+    step_name: f'{ENV_TOOLS_PATH["IEDA_TCL_SCRIPT_DIR"]}/session_script/{step_name}.tcl'
+    for step_name in [
+        StepName.NETLIST_OPT,
+        StepName.PLACEMENT,
+        StepName.CTS,
+        StepName.LEGALIZATION,
+        StepName.ROUTING,
+        StepName.FILLER,
+    ]
+}
+
+# hierarchical synthesis (see `step.synth_modules`): joins the separately synthesized modules
+YOSYS_STITCH_CMD = ["yosys", f"{R2G_TOOL_DIR}/yosys/scripts/yosys_stitch.tcl"]
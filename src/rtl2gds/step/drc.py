@@ -7,6 +7,7 @@ import time
 import klayout.rdb
 
 from rtl2gds.global_configs import R2G_PDK_DIR_IHP130, R2G_TOOL_DIR, StepName
+from rtl2gds.utils import rusage, stream
 
 
 def run(top_name: str, gds_file: str, result_dir: str, tool: str = "magic"):
@@ -66,9 +67,10 @@ def drc_magic(top_name: str, gds_file: str, result_dir: str):
     full_env = os.environ.copy()
     full_env.update(step_env)
     try:
-        ret_code = subprocess.run(
+        ret_code = rusage.call(
             shell_cmd,
-            check=True,
+            StepName.DRC,
+            log_file=stream.step_log_file(result_dir, "drc_magic"),
             stdin=subprocess.DEVNULL,
             env=full_env,
         )
@@ -135,7 +137,9 @@ def drc_klayout(
     )
 
     start_time = time.perf_counter()
-    ret_code = subprocess.call(shell_cmd)
+    ret_code = rusage.call(
+        shell_cmd, StepName.DRC, log_file=stream.step_log_file(result_dir, "drc_klayout")
+    )
     end_time = time.perf_counter()
     logging.info("KLayout DRC elapsed time: %.2f seconds", end_time - start_time)
 
@@ -7,7 +7,9 @@ import logging
 import subprocess
 
 from rtl2gds.global_configs import ENV_TOOLS_PATH, StepName
+from rtl2gds.step import ieda_config
 from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.utils import compression, rusage, stream, trace
 
 
 def run(
@@ -20,6 +22,8 @@ def run(
     core_bbox: str,
     clk_port_name: str,
     clk_freq_mhz: float,
+    ieda_overrides: dict | None = None,
+    compression_codec: str | None = None,
 ):
     """
     Run floorplan step using iEDA-iFP.
@@ -27,6 +31,7 @@ def run(
     Args:
         design_path (DesignPath): Design paths including netlist and DEF files
         design_constrain (DesignConstrain): Design timing and area constraints
+        compression_codec (str, optional): Compress the output DEF, see `utils.compression`
 
     Returns:
         metrics (dict): Updated environment variables
@@ -69,9 +74,21 @@ def run(
     )
 
     shell_env.update(ENV_TOOLS_PATH)
-    ret_code = subprocess.call(shell_cmd, env=shell_env)
-    if ret_code != 0:
-        raise subprocess.CalledProcessError(ret_code, shell_cmd)
+    shell_env.update(ieda_config.step_env(result_dir, overrides=ieda_overrides))
+    with (
+        trace.span(StepName.FLOORPLAN, trace.STEP, tool="iEDA-iFP"),
+        compression.StagedOutputs({"def": output_def}, compression_codec) as staged,
+    ):
+        shell_env["OUTPUT_DEF"] = staged.tool_path("def")
+        ret_code = rusage.call(
+            shell_cmd,
+            StepName.FLOORPLAN,
+            log_file=stream.step_log_file(result_dir, StepName.FLOORPLAN),
+            env=shell_env,
+        )
+        if ret_code != 0:
+            raise subprocess.CalledProcessError(ret_code, shell_cmd)
+        artifacts.update(staged.commit())
 
     # collect results
     with open(
@@ -112,6 +129,8 @@ def run(
         "cell_area": cell_area,
         "num_instances": num_instances,
     }
+    if staged.stats.files:
+        metrics["intermediate_compression"] = staged.stats.to_metrics()
 
     return metrics, artifacts
 
@@ -0,0 +1,121 @@
+"""
+Per-run rendered iEDA config directories
+
+The configs in `tools/iEDA/iEDA_config` are templates shared by every run. A
+step gets its own rendering of them instead: the templates with the chip's
+`IEDA_CONFIG` overrides and the step's thread count applied, written to
+`<result_dir>/config/<digest>/` and passed as the step's `IEDA_CONFIG_DIR`.
+
+The directory name is the digest of the rendered content, so steps and reruns
+with the same settings share one directory, and differently configured flows
+never write to the same files.
+"""
+
+import copy
+import json
+import os
+import threading
+
+from rtl2gds.global_configs import ENV_TOOLS_PATH
+from rtl2gds.utils.hashing import value_digest
+from rtl2gds.utils.threads import thread_env
+
+TEMPLATE_DIR = ENV_TOOLS_PATH["IEDA_CONFIG_DIR"]
+# config file -> json path of its thread count
+THREAD_FIELDS = {
+    "pl_default_config.json": ("PL", "num_threads"),
+}
+# the templates refer to each other through this placeholder (see flow_config.json)
+CONFIG_DIR_PLACEHOLDER = "$IEDA_CONFIG_DIR"
+# written last, a directory without it is still being rendered
+_COMPLETE_MARKER = ".complete"
+
+
+def _merge(config: dict, overrides: dict) -> dict:
+    """`config` with the nested `overrides` applied, neither is modified"""
+    merged = copy.deepcopy(config)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _set_field(config: dict, path: tuple[str, ...], value) -> None:
+    for key in path[:-1]:
+        config = config.setdefault(key, {})
+    config[path[-1]] = value
+
+
+def render(overrides: dict[str, dict] | None = None, num_threads: int | None = None) -> dict:
+    """
+    Render the config templates in memory.
+
+    Args:
+        overrides (dict, optional): Config file name to the nested values to override,
+            e.g. `{"pl_default_config.json": {"PL": {"is_timing_effort": 1}}}`.
+        num_threads (int, optional): Thread count written into the configs that have one.
+
+    Returns:
+        dict: Config file name to its rendered text, still with the config dir placeholder.
+
+    Raises:
+        ValueError: If `overrides` names a file that is not a JSON template.
+    """
+    overrides = overrides or {}
+    names = sorted(
+        name for name in os.listdir(TEMPLATE_DIR) if os.path.isfile(f"{TEMPLATE_DIR}/{name}")
+    )
+    unknown = [name for name in overrides if name not in names or not name.endswith(".json")]
+    if unknown:
+        raise ValueError(f"Unknown iEDA config files {unknown}, expected one of {names}")
+
+    rendered = {}
+    for name in names:
+        with open(f"{TEMPLATE_DIR}/{name}", "r", encoding="utf-8") as f:
+            text = f.read()
+        thread_field = THREAD_FIELDS.get(name) if num_threads is not None else None
+        if name in overrides or thread_field:
+            config = _merge(json.loads(text), overrides.get(name, {}))
+            if thread_field:
+                _set_field(config, thread_field, num_threads)
+            text = json.dumps(config, indent=4) + "\n"
+        rendered[name] = text
+    return rendered
+
+
+def render_config_dir(
+    result_dir: str, overrides: dict[str, dict] | None = None, num_threads: int | None = None
+) -> str:
+    """
+    Write `render(overrides, num_threads)` to `<result_dir>/config/<digest>/`,
+    unless a complete rendering is already there, and return the directory.
+    """
+    rendered = render(overrides, num_threads)
+    config_dir = os.path.join(result_dir, "config", value_digest(rendered)[:16])
+    if os.path.exists(os.path.join(config_dir, _COMPLETE_MARKER)):
+        return config_dir
+
+    os.makedirs(config_dir, exist_ok=True)
+    for name, text in rendered.items():
+        # concurrent steps may render the same dir, never expose a half-written file
+        tmp = os.path.join(config_dir, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text.replace(CONFIG_DIR_PLACEHOLDER, config_dir))
+        os.replace(tmp, os.path.join(config_dir, name))
+    with open(os.path.join(config_dir, _COMPLETE_MARKER), "w", encoding="utf-8"):
+        pass
+    return config_dir
+
+
+def step_env(
+    result_dir: str, num_threads: int | None = None, overrides: dict[str, dict] | None = None
+) -> dict[str, str]:
+    """
+    Environment of an iEDA step, to apply after `ENV_TOOLS_PATH`: the step's rendered
+    config dir and, if `num_threads` is set, its thread count.
+    """
+    env = thread_env(num_threads) if num_threads is not None else {}
+    env["IEDA_CONFIG_DIR"] = render_config_dir(result_dir, overrides, num_threads)
+    return env
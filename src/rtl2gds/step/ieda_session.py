@@ -0,0 +1,216 @@
+"""
+Persistent iEDA session
+
+One long-lived `iEDA` process serves all P&R steps of a flow: the LEFs, liberty
+and sdc are read once, the design DEF is parsed once, and the in-memory database
+carries over from one step to the next. Steps are driven over the process stdin,
+each command is acknowledged by a token line on stdout (see `run_session.tcl`).
+DEF/netlist files are only written when a step asks for them.
+
+The active watchdog policy (`utils.watchdog.policy_scope`) bounds every command,
+a command stopped by it kills the session, the next step starts a new one.
+"""
+
+import logging
+import re
+import subprocess
+import time
+
+from rtl2gds.global_configs import DEFAULT_SDC_FILE, ENV_TOOLS_PATH
+from rtl2gds.step import ieda_config
+from rtl2gds.step.configs import IEDA_SESSION_CMD, IEDA_SESSION_SCRIPT
+from rtl2gds.utils import progress, rusage, stream, watchdog
+
+SESSION_TOKEN = "__RTL2GDS_SESSION__"
+# the session process serves several steps, its resource usage is recorded as a whole
+SESSION_STEP_NAME = "ieda_session"
+
+
+def _tcl_word(value: str) -> str:
+    """Quote `value` as a single Tcl word"""
+    return re.sub(r'([\\\[\]{}"$;\s])', r"\\\1", str(value))
+
+
+class IEDASession:
+    """
+    Drive one iEDA process step by step.
+
+    The process is started by the first step, which also loads its input DEF.
+    """
+
+    def __init__(
+        self,
+        top_name: str,
+        result_dir: str,
+        sdc_file: str = DEFAULT_SDC_FILE,
+        ieda_overrides: dict | None = None,
+    ):
+        self.top_name = top_name
+        self.result_dir = result_dir
+        self.sdc_file = sdc_file
+        self.ieda_overrides = ieda_overrides
+        self.loaded_def: str | None = None
+        self._process: subprocess.Popen | None = None
+        self._start_time = 0.0
+        # output outside of a step (library loading, DEF saving) goes to the session log
+        self._session_sink = stream.LineSink(
+            SESSION_STEP_NAME, stream.step_log_file(result_dir, SESSION_STEP_NAME)
+        )
+        self._sink = self._session_sink
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the design database is in memory"""
+        return self._process is not None and self.loaded_def is not None
+
+    def start(self) -> None:
+        """Start the iEDA process and wait until the libraries are read"""
+        shell_env = {
+            "TOP_NAME": self.top_name,
+            "RESULT_DIR": self.result_dir,
+            "SDC_FILE": self.sdc_file,
+            "R2G_SESSION_TOKEN": SESSION_TOKEN,
+        }
+        logging.info(
+            "(ieda_session) \n subprocess cmd: %s \n subprocess env: %s",
+            str(IEDA_SESSION_CMD),
+            str(shell_env),
+        )
+        shell_env.update(ENV_TOOLS_PATH)
+        # steps switch to their own rendering (thread count) before running
+        shell_env.update(ieda_config.step_env(self.result_dir, overrides=self.ieda_overrides))
+        self._start_time = time.perf_counter()
+        self._session_sink.open(IEDA_SESSION_CMD)
+        self._process = subprocess.Popen(
+            IEDA_SESSION_CMD,
+            env=shell_env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            # errors go to the step logs and failure tails like the rest of the output
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            # own process group, the watchdog stops iEDA with all its children
+            start_new_session=True,
+        )
+        self._watched("session init")
+
+    def _wait_reply(self, command: str) -> str:
+        """Forward tool output until the reply to `command`, return the Tcl result"""
+        for line in self._process.stdout:
+            if not line.startswith(SESSION_TOKEN):
+                self._sink.feed(line)
+                continue
+            code, _, result = line[len(SESSION_TOKEN) :].strip().partition(" ")
+            if code != "0":
+                # the database may be half-modified, do not reuse the session
+                self.close()
+                raise subprocess.CalledProcessError(
+                    int(code), command, output=f"iEDA session command failed: {result}"
+                )
+            return result
+
+        ret_code = rusage.wait(self._process, SESSION_STEP_NAME, self._start_time)
+        self._process = None
+        self.loaded_def = None
+        logging.error(
+            "(ieda_session) iEDA exited with %d, last output:\n%s", ret_code, self._sink.tail()
+        )
+        self._session_sink.close(ret_code)
+        raise subprocess.CalledProcessError(
+            ret_code, IEDA_SESSION_CMD, output=f"iEDA session exited while running: {command}"
+        )
+
+    def send(self, command: str) -> str:
+        """
+        Evaluate a single-line Tcl command in the session.
+
+        Returns:
+            str: The Tcl result of the command.
+
+        Raises:
+            subprocess.CalledProcessError: If the command fails or the process dies,
+                the session is closed in both cases.
+            watchdog.WatchdogError: If the watchdog stopped the command, the session
+                is closed.
+        """
+        if self._process is None:
+            self.start()
+        logging.debug("(ieda_session) %s", command)
+        return self._watched(command, send=True)
+
+    def _watched(self, command: str, send: bool = False) -> str:
+        """`_wait_reply` (after sending `command`) under the active watchdog policy"""
+        policy = watchdog.active_policy()
+        step_name = self._sink.step_name
+        dog = None
+        if policy is not None and (policy.timeout_for(step_name) or policy.stall_seconds):
+            dog = watchdog.Watchdog(
+                self._process, step_name, policy, last_output=self._sink.last_output
+            ).start()
+        try:
+            if send:
+                self._process.stdin.write(command + "\n")
+                self._process.stdin.flush()
+            return self._wait_reply(command)
+        except (subprocess.CalledProcessError, OSError) as e:
+            if dog is None or not dog.reason:
+                raise
+            raise watchdog.WatchdogError(step_name, dog.reason, IEDA_SESSION_CMD) from e
+        finally:
+            if dog is not None:
+                dog.stop()
+                if dog.reason:
+                    self.close()
+
+    def run_step(self, step_name: str, input_def: str, shell_env: dict[str, str]) -> None:
+        """
+        Run a P&R step on the in-memory design.
+
+        Args:
+            step_name (str): Step with a body script in `IEDA_SESSION_SCRIPT`.
+            input_def (str): DEF to load if the session has no design yet.
+            shell_env (dict): Step environment (report paths, clock, ...).
+        """
+        for key, value in shell_env.items():
+            self.send(f"set ::env({key}) {_tcl_word(value)}")
+        if not self.loaded:
+            self.send(f"def_init -path {_tcl_word(input_def)}")
+            self.loaded_def = input_def
+        self._sink = stream.LineSink(
+            step_name,
+            stream.step_log_file(self.result_dir, step_name),
+            progress.parsers_for("iEDA"),
+        ).open(IEDA_SESSION_SCRIPT[step_name])
+        try:
+            self.send(f"source {_tcl_word(IEDA_SESSION_SCRIPT[step_name])}")
+        finally:
+            self._sink.close()
+            self._sink = self._session_sink
+
+    def save_def(self, output_def: str, output_verilog: str) -> None:
+        """Write the in-memory design to DEF and verilog"""
+        self.send(f"def_save -path {_tcl_word(output_def)}")
+        self.send(f"netlist_save -path {_tcl_word(output_verilog)} -exclude_cell_names {{}}")
+
+    def close(self) -> None:
+        """End the session, closing stdin lets `run_session.tcl` reach `flow_exit`"""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        self.loaded_def = None
+        try:
+            process.stdin.close()
+            for line in process.stdout:
+                self._session_sink.feed(line)
+            self._session_sink.close(rusage.wait(process, SESSION_STEP_NAME, self._start_time))
+        except OSError as e:
+            logging.warning("(ieda_session) error while closing: %s", e)
+            process.kill()
+            self._session_sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
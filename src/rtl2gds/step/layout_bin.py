@@ -0,0 +1,356 @@
+"""
+Compact binary layout export, an alternative to the layout JSON chunks
+
+The `data` items of a layout JSON are written as columns, one per item key, in
+little-endian arrays of the narrowest type holding them:
+- "int"/"float"/"bool": one number per item (ints mixed with floats read back as floats),
+- "str": an index into the string table of the part (shape types, layers, names),
+- "coords": the numbers of a list (`width` 1) or of a list of pairs (`width` 2),
+  with `offsets` into them, item `i` having `values[offsets[i]:offsets[i + 1]]`,
+- "json": any other value, its orjson text in the string table.
+A column has a `present` array (1/0 per item) if some items lack the key.
+
+The items are cut into parts of `DEFAULT_PART_ITEMS` items, one `.bin` file each,
+so a writer holds one part in memory and a viewer can fetch them one by one. The
+`-manifest.json` file holds the header of the layout JSON and the dtype, offset
+(8-byte aligned) and length of every array, so the `.bin` files are used as is
+through `mmap` or typed arrays, without parsing.
+
+Cost (`tests/bench_layout_bin.py`, 300k shapes): the parts are 2.6x smaller than the
+JSON chunks but only 1.3x once gzipped, and writing them along with the chunks takes
+about 2.5-3x the time of the chunks alone (json ~2 s, json + binary ~5.5-6.5 s). The
+writer groups the items by their keys as they come and builds the columns of a part
+with C-level passes, the rest is the Python objects of a part held until it is full.
+The gain is on the reading side: a part is mapped in milliseconds, not parsed.
+"""
+
+import array
+import mmap
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import accumulate, chain, repeat
+
+import orjson
+
+FORMAT = "rtl2gds-layout-bin"
+VERSION = 1
+DEFAULT_PART_ITEMS = 1 << 16
+
+_INT_TYPES = [("b", "<i1", 1 << 7), ("h", "<i2", 1 << 15), ("i", "<i4", 1 << 31)]
+_UINT_TYPES = [("B", "<u1", 1 << 8), ("H", "<u2", 1 << 16), ("I", "<u4", 1 << 32)]
+_TYPECODES = {
+    "<i1": "b",
+    "<i2": "h",
+    "<i4": "i",
+    "<i8": "q",
+    "<u1": "B",
+    "<u2": "H",
+    "<u4": "I",
+    "<u8": "Q",
+    "<f8": "d",
+}
+_KINDS = {bool: "bool", int: "int", float: "float", str: "str", list: "coords"}
+
+
+def _int_array(values: list[int], signed: bool = True) -> tuple[str, array.array]:
+    """`values` in the narrowest (dtype, array) holding them"""
+    low, high = (min(values), max(values)) if values else (0, 0)
+    for typecode, dtype, limit in _INT_TYPES if signed else _UINT_TYPES:
+        if (-limit if signed else 0) <= low and high < limit:
+            return dtype, array.array(typecode, values)
+    return ("<i8", array.array("q", values)) if signed else ("<u8", array.array("Q", values))
+
+
+def _column_kind(present: list[object]) -> str:
+    """Kind of a column from the types of its present values, "coords" checked later"""
+    types = set(map(type, present))
+    if types == {int, float}:
+        return "float"
+    if len(types) == 1:
+        return _KINDS.get(types.pop(), "json")
+    return "json"
+
+
+def _coords(present: list[list]) -> tuple[int, list[int], list[int | float]] | None:
+    """(width, offsets, numbers) of lists of numbers or of [x, y] pairs, None for other lists"""
+    elements = list(chain.from_iterable(present))
+    types = set(map(type, elements))
+    width = 2 if types == {list} else 1
+    if width == 2:
+        if set(map(len, elements)) != {2}:
+            return None
+        elements = list(chain.from_iterable(elements))
+        types = set(map(type, elements))
+    if not types <= {int, float}:
+        return None
+    return width, list(accumulate(map(len, present), initial=0)), elements
+
+
+class _PartWriter:
+    """Arrays of one `.bin` part, appended at 8-byte aligned offsets"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = 0
+        self._file = open(path, "wb")
+
+    def add(self, dtype: str, values: array.array) -> dict:
+        if sys.byteorder == "big":
+            values.byteswap()
+        padding = -self.size % 8
+        self._file.write(b"\0" * padding)
+        offset = self.size + padding
+        data = values.tobytes()
+        self._file.write(data)
+        self.size = offset + len(data)
+        return {"dtype": dtype, "offset": offset, "length": len(values)}
+
+    def close(self):
+        self._file.close()
+
+
+def _columns(groups: dict[tuple, tuple[list, list]]) -> dict[str, tuple[list, list]]:
+    """
+    Key -> (rows, values) of the items holding it, in row order, from the items grouped
+    by their keys: keys -> (rows, one list of values per key) of the items with these keys.
+    """
+    pieces = {}
+    for keys, (rows, values) in groups.items():
+        for key, column in zip(keys, values):
+            pieces.setdefault(key, []).append((rows, column))
+    columns = {}
+    for key, key_pieces in pieces.items():
+        if len(key_pieces) == 1:
+            columns[key] = key_pieces[0]
+            continue
+        # the rows of each group are sorted, merged back into item order
+        rows = list(chain.from_iterable(rows for rows, _ in key_pieces))
+        values = list(chain.from_iterable(values for _, values in key_pieces))
+        order = sorted(range(len(rows)), key=rows.__getitem__)
+        columns[key] = (list(map(rows.__getitem__, order)), list(map(values.__getitem__, order)))
+    return columns
+
+
+def _write_part(groups: dict[tuple, tuple[list, list]], num_items: int, path: str) -> dict:
+    """Write the columns of `num_items` grouped items (see `_columns`), returns the manifest part"""
+    strings = {}
+    part = _PartWriter(path)
+    manifest_columns = []
+    for key, (rows, present) in _columns(groups).items():
+        column = {"key": key}
+        if len(rows) < num_items:
+            flags = bytearray(num_items)
+            deque(map(flags.__setitem__, rows, repeat(1)), maxlen=0)
+            column["present"] = part.add("<u1", array.array("B", flags))
+        kind = _column_kind(present)
+        coords = _coords(present) if kind == "coords" else None
+        if kind == "coords" and coords is None:
+            kind = "json"
+        column["kind"] = kind
+        if kind in ("int", "bool"):
+            column["values"] = part.add(*_int_array(present))
+        elif kind == "float":
+            column["values"] = part.add("<f8", array.array("d", present))
+        elif kind in ("str", "json"):
+            if kind == "json":
+                present = [orjson.dumps(value).decode() for value in present]
+            for value in dict.fromkeys(present):
+                if value not in strings:
+                    strings[value] = len(strings)
+            column["values"] = part.add(*_int_array(list(map(strings.__getitem__, present)), False))
+        else:
+            width, offsets, numbers = coords
+            column["width"] = width
+            column["offsets"] = part.add(*_int_array(offsets, signed=False))
+            if float in set(map(type, numbers)):
+                column["values"] = part.add("<f8", array.array("d", numbers))
+            else:
+                column["values"] = part.add(*_int_array(numbers))
+        manifest_columns.append(column)
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    string_table = {
+        "offsets": part.add(*_int_array(offsets, signed=False)),
+        "data": part.add("<u1", array.array("B", b"".join(encoded))),
+    }
+    part.close()
+    return {
+        "file": os.path.basename(path),
+        "num_items": num_items,
+        "size": part.size,
+        "strings": string_table,
+        "columns": manifest_columns,
+    }
+
+
+class Writer:
+    """
+    Binary export of a stream of layout items, `{file_no_suffix}-bin-{index}.bin`
+    parts and a `{file_no_suffix}-manifest.json`.
+    """
+
+    def __init__(self, file_no_suffix: str, part_items: int = DEFAULT_PART_ITEMS):
+        self.file_no_suffix = file_no_suffix
+        self.part_items = part_items
+        self.parts = []
+        # items of the current part by their keys, turned into columns by `_write_part`
+        self._groups = {}
+        self._num_items = 0
+
+    def add(self, item: dict) -> None:
+        if not isinstance(item, dict):
+            raise TypeError(f"Layout items are objects, got {type(item).__name__}")
+        # a layout has a handful of item shapes, no per key work here
+        keys = tuple(item)
+        group = self._groups.get(keys)
+        if group is None:
+            group = self._groups[keys] = ([], [[] for _ in keys])
+        group[0].append(self._num_items)
+        deque(map(list.append, group[1], item.values()), maxlen=0)
+        self._num_items += 1
+        if self._num_items >= self.part_items:
+            self._flush()
+
+    def tee(self, items: Iterable[object]) -> Iterator[object]:
+        """`items`, each also added to the export"""
+        for item in items:
+            self.add(item)
+            yield item
+
+    def close(self, header: dict) -> list[str]:
+        """Write the last part and the manifest, returns the manifest then the part files"""
+        if self._num_items or not self.parts:
+            self._flush()
+        manifest_file = f"{self.file_no_suffix}-manifest.json"
+        manifest = {
+            "format": FORMAT,
+            "version": VERSION,
+            "header": header,
+            "num_items": sum(part["num_items"] for part in self.parts),
+            "parts": self.parts,
+        }
+        with open(manifest_file, "wb") as f:
+            f.write(orjson.dumps(manifest))
+        directory = os.path.dirname(manifest_file)
+        return [manifest_file] + [os.path.join(directory, part["file"]) for part in self.parts]
+
+    def _flush(self) -> None:
+        path = f"{self.file_no_suffix}-bin-{len(self.parts)}.bin"
+        self.parts.append(_write_part(self._groups, self._num_items, path))
+        self._groups = {}
+        self._num_items = 0
+
+
+class Part:
+    """One memory-mapped `.bin` part, its arrays are zero-copy memoryviews"""
+
+    def __init__(self, path: str, meta: dict):
+        self.meta = meta
+        self.num_items = meta["num_items"]
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if meta["size"] else b""
+        self._view = memoryview(self._mmap)
+        self.columns = {column["key"]: column for column in meta["columns"]}
+        self._strings = None
+
+    def array(self, desc: dict) -> memoryview | array.array:
+        """An array of the part, described by a manifest entry"""
+        typecode = _TYPECODES[desc["dtype"]]
+        size = array.array(typecode).itemsize
+        view = self._view[desc["offset"] : desc["offset"] + desc["length"] * size]
+        if sys.byteorder == "big" and size > 1:
+            values = array.array(typecode, view.tobytes())
+            values.byteswap()
+            return values
+        return view.cast(typecode)
+
+    def strings(self) -> list[str]:
+        if self._strings is None:
+            table = self.meta["strings"]
+            offsets = self.array(table["offsets"])
+            data = self.array(table["data"])
+            self._strings = [
+                bytes(data[offsets[i] : offsets[i + 1]]).decode("utf-8")
+                for i in range(len(offsets) - 1)
+            ]
+        return self._strings
+
+    def column(self, key: str) -> list[object]:
+        """The values of `key` in item order, `None` for the items without it"""
+        column = self.columns[key]
+        kind = column["kind"]
+        values = self.array(column["values"])
+        if kind in ("str", "json"):
+            strings = self.strings()
+            values = [strings[i] for i in values]
+            if kind == "json":
+                values = [orjson.loads(value) for value in values]
+        elif kind == "bool":
+            values = [bool(value) for value in values]
+        elif kind == "coords":
+            offsets = self.array(column["offsets"])
+            width = column["width"]
+            flat = values.tolist()
+            values = []
+            for start, end in zip(offsets[:-1], offsets[1:]):
+                numbers = flat[start * width : end * width]
+                values.append(numbers if width == 1 else [*map(list, zip(*[iter(numbers)] * 2))])
+        else:
+            values = values.tolist()
+        if "present" not in column:
+            return values
+        present_values = iter(values)
+        return [next(present_values) if flag else None for flag in self.array(column["present"])]
+
+    def items(self) -> list[dict]:
+        """The items of the part as they were in the layout JSON"""
+        items = [{} for _ in range(self.num_items)]
+        for key, column in self.columns.items():
+            present = self.array(column["present"]) if "present" in column else None
+            for i, value in enumerate(self.column(key)):
+                if present is None or present[i]:
+                    items[i][key] = value
+        return items
+
+    def close(self) -> None:
+        self._view.release()
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+
+
+class Reader:
+    """
+    Binary layout export, read through its manifest.
+
+    Raises:
+        ValueError: If the manifest is not of this format.
+    """
+
+    def __init__(self, manifest_file: str):
+        with open(manifest_file, "rb") as f:
+            self.manifest = orjson.loads(f.read())
+        if self.manifest.get("format") != FORMAT or self.manifest.get("version") != VERSION:
+            raise ValueError(f"{manifest_file} is not a {FORMAT} v{VERSION} manifest")
+        self.header = self.manifest["header"]
+        self.num_items = self.manifest["num_items"]
+        directory = os.path.dirname(manifest_file)
+        self.parts = [Part(os.path.join(directory, p["file"]), p) for p in self.manifest["parts"]]
+
+    def __iter__(self) -> Iterator[dict]:
+        for part in self.parts:
+            yield from part.items()
+
+    def close(self) -> None:
+        for part in self.parts:
+            part.close()
+
+    def __enter__(self) -> "Reader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
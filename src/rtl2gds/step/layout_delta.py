@@ -0,0 +1,176 @@
+"""
+Incremental layout JSON exports, a delta against the export of a previous step
+
+Most items of the layout do not change between consecutive P&R steps (e.g.
+legalization moves few instances), so instead of the layout JSON chunks a step
+can export the items that changed since the export of the previous step (the base):
+
+    {"data": [<items not in the base>], "removed": [<positions in the base>],
+     "base": <base export>, "base_index": {"digest": ..., "items": ...},
+     "index": {"digest": ..., "items": ...}, "header": {...}, "added": ...,
+     "format": ..., "version": ...}
+
+A viewer holding the items of the base drops the `removed` ones and appends the
+`data` items, the items of the new export are then in the same order as its index.
+A moved or changed item is removed and added again. `base_index` identifies the
+items the delta applies to: the blake2b (`index_digest`) of the index file of the
+base and its item count, a viewer holding other items (e.g. a stale base) fetches
+the full export instead. `index` is the same for the new export, the base of the
+next delta.
+
+Items are compared by the 8-byte blake2b digest of their orjson serialization, the
+bytes of the chunks (iEDA writes the members of an item in a fixed order). Every
+export writes the digests of its items, in the viewer's order, to
+`{file_no_suffix}-index.bin`, the base of the next delta. Every export also removes
+the index and delta left by an earlier export of the same file (`remove_outputs`).
+"""
+
+import hashlib
+import os
+from collections.abc import Iterable, Iterator
+
+import orjson
+
+FORMAT = "rtl2gds-layout-delta"
+VERSION = 1
+
+DIGEST_SIZE = 8
+_DATA_PREFIX = b'{"data":['
+_FLUSH_SIZE = 1 << 20
+
+
+def index_file(layout_json_file: str) -> str:
+    return f"{os.path.splitext(layout_json_file)[0]}-index.bin"
+
+
+def base_index(layout_json_file: str) -> str | None:
+    """The index of an earlier export of `layout_json_file`, None if there is none"""
+    path = index_file(layout_json_file)
+    return path if os.path.exists(path) else None
+
+
+def delta_file(layout_json_file: str) -> str:
+    return f"{os.path.splitext(layout_json_file)[0]}-delta.json"
+
+
+def remove_outputs(layout_json_file: str) -> None:
+    """Remove the index and delta of an earlier export of `layout_json_file`"""
+    for path in (index_file(layout_json_file), delta_file(layout_json_file)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def index_digest(data: bytes) -> dict:
+    """Identity of the content of an index file, see the module doc"""
+    return {
+        "digest": hashlib.blake2b(data, digest_size=16).hexdigest(),
+        "items": len(data) // DIGEST_SIZE,
+    }
+
+
+def read_index(path: str) -> list[bytes]:
+    """The item digests of an export"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return _split_index(data)
+
+
+def _split_index(data: bytes) -> list[bytes]:
+    return [data[i : i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+class Writer:
+    """
+    Index of a stream of layout items and, with a `base` index, their delta.
+
+    Args:
+        layout_json_file (str): The layout json being exported.
+        base (str): Index of the previous export, see `base_index`.
+    """
+
+    def __init__(self, layout_json_file: str, base: str | None = None):
+        self.file_no_suffix = os.path.splitext(layout_json_file)[0]
+        self.base = base
+        self.added = 0
+        self._digests = bytearray()  # of the items, or of the added ones with a base
+        self._delta = None
+        if base is not None:
+            with open(base, "rb") as f:
+                data = f.read()
+            self._base = _split_index(data)
+            self._base_index = index_digest(data)
+            # the first position of each digest, the next ones of repeated digests in
+            # `_repeats` (last first), repeats are matched in order
+            self._positions = dict(zip(reversed(self._base), range(len(self._base) - 1, -1, -1)))
+            self._repeats = {}
+            if len(self._positions) < len(self._base):
+                for position in range(len(self._base) - 1, -1, -1):
+                    item_digest = self._base[position]
+                    if self._positions[item_digest] != position:
+                        self._repeats.setdefault(item_digest, []).append(position)
+            self._delta = open(delta_file(layout_json_file), "wb")
+            self._buffer = bytearray(_DATA_PREFIX)
+
+    def add(self, item: object) -> None:
+        data = orjson.dumps(item)
+        item_digest = hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+        if self._delta is None:
+            self._digests += item_digest
+            return
+        if self._positions.pop(item_digest, None) is not None:
+            return
+        repeats = self._repeats.get(item_digest)
+        if repeats:
+            repeats.pop()
+            return
+        self._digests += item_digest
+        if self.added:
+            self._buffer += b","
+        self._buffer += data
+        self.added += 1
+        if len(self._buffer) >= _FLUSH_SIZE:
+            self._delta.write(self._buffer)
+            self._buffer = bytearray()
+
+    def tee(self, items: Iterable[object]) -> Iterator[object]:
+        """`items`, each also added to the index"""
+        for item in items:
+            self.add(item)
+            yield item
+
+    def close(self, header: dict) -> list[str]:
+        """Write the index and finish the delta, returns the delta (if any) then the index"""
+        index = index_file(self.file_no_suffix + ".json")
+        if self._delta is None:
+            with open(index, "wb") as f:
+                f.write(self._digests)
+            return [index]
+
+        removed = list(self._positions.values())
+        for positions in self._repeats.values():
+            removed.extend(positions)
+        removed.sort()
+        # the viewer's order: the base items left, then the added ones
+        kept = bytearray(b"\1") * len(self._base)
+        for position in removed:
+            kept[position] = 0
+        data = b"".join(d for d, keep in zip(self._base, kept) if keep) + self._digests
+        with open(index, "wb") as f:
+            f.write(data)
+
+        members = {
+            "removed": removed,
+            "base": os.path.basename(self.base).removesuffix("-index.bin") + ".json",
+            "base_index": self._base_index,
+            "index": index_digest(data),
+            "header": header,
+            "added": self.added,
+            "format": FORMAT,
+            "version": VERSION,
+        }
+        self._buffer += b"]"
+        for name, value in members.items():
+            self._buffer += b"," + orjson.dumps(name) + b":" + orjson.dumps(value)
+        self._delta.write(self._buffer + b"}")
+        self._delta.close()
+        return [self._delta.name, index]
@@ -16,7 +16,9 @@ from rtl2gds.global_configs import (
     R2G_TOOL_DIR,
     StepName,
 )
+from rtl2gds.step import ieda_config
 from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.utils import compression, rusage, stream
 
 
 def save_snapshot_image(gds_file: str, img_file: str, weight: int = 800, height: int = 800):
@@ -57,6 +59,7 @@ def ensure_parent_directory_exists(file_path: str) -> str:
 def run_ieda(
     input_def: str,
     gds_file: str,
+    ieda_overrides: dict | None = None,
 ):
     """
     Run the layout GDS dump step.
@@ -82,6 +85,7 @@ def run_ieda(
         "SDC_FILE": DEFAULT_SDC_FILE,
     }
     step_env.update(ENV_TOOLS_PATH)
+    step_env.update(ieda_config.step_env(result_dir, overrides=ieda_overrides))
 
     logging.info(
         "(step.%s) \n subprocess cmd: %s \n subprocess env: %s",
@@ -92,7 +96,12 @@ def run_ieda(
 
     # Run GDS dump command
     try:
-        ret_code = subprocess.call(step_cmd, env=step_env)
+        ret_code = rusage.call(
+            step_cmd,
+            step_name,
+            log_file=stream.step_log_file(result_dir, Path(gds_file).stem),
+            env=step_env,
+        )
         if ret_code != 0:
             raise subprocess.CalledProcessError(ret_code, step_cmd)
     except subprocess.CalledProcessError as e:
@@ -110,7 +119,10 @@ def run_magic(
     gds_file: str,
 ):
     """
-    Generates an abstract LEF file using Magic.
+    Dump the GDS of a DEF with Magic.
+
+    Raises:
+        subprocess.CalledProcessError: If the GDS dump command fails
     """
 
     result_dir = ensure_parent_directory_exists(gds_file)
@@ -148,24 +160,20 @@ def run_magic(
         str(step_env),
     )
 
-    try:
-        e = subprocess.run(
+    log_file = stream.step_log_file(result_dir, Path(gds_file).stem)
+    ret_code = rusage.call(
+        shell_cmd,
+        StepName.LAYOUT_GDS,
+        log_file=log_file,
+        stdin=subprocess.DEVNULL,
+        env=full_env,
+    )
+    if ret_code != 0:
+        raise subprocess.CalledProcessError(
+            ret_code,
             shell_cmd,
-            check=True,
-            # text=True,
-            # capture_output=True,
-            stdin=subprocess.DEVNULL,
-            env=full_env,
+            output=f"Magic GDS dump failed with return code {ret_code}, see {log_file}",
         )
-        if e.returncode != 0:
-            raise subprocess.CalledProcessError(e, shell_cmd)
-        # print("Magic stdout:", e.stdout)
-        # print("Magic stderr:", e.stderr)
-
-    except subprocess.CalledProcessError as e:
-        print(f"Command '{e.cmd}' failed with signal or non-zero exit code {e.returncode}.")
-        print("Magic stdout:", e.stdout)
-        print("Magic stderr:", e.stderr)
 
 
 def run(
@@ -175,18 +183,20 @@ def run(
     gds_file: str,
     snapshot_file: str | None = None,
     tool: str = "magic",
+    ieda_overrides: dict | None = None,
 ):
     """
     Run the layout GDS dump step.
 
     Args:
         top_name (str): Top module name
-        input_def (str): Input DEF file path
+        input_def (str): Input DEF file path, may be compressed (see `utils.compression`)
         die_area_bbox (str): Die area bounding box (for magic)
         gds_file (str): Output GDS file path
         result_dir (str): Result directory path
         tool (str): Tool to use for GDS dump. Default is "magic".
         snapshot_file (str | None, optional): Output snapshot image path. Defaults to None.
+        ieda_overrides (dict, optional): iEDA config overrides for the `ieda` tool.
 
     Returns:
         tuple: Metrics(ususally empty) and artifacts(design.gds, snapshot.png) from the GDS dump run.
@@ -194,14 +204,15 @@ def run(
     Raises:
         subprocess.CalledProcessError: If the GDS dump command fails
     """
-    if tool == "magic":
-        run_magic(top_name, input_def, die_area_bbox, gds_file)
-    elif tool == "ieda":
-        run_ieda(input_def, gds_file)
-    elif tool == "klayout":
-        raise NotImplementedError("KLayout GDS dump is not implemented yet.")
-    else:
-        raise ValueError(f"Unsupported GDS dump tool: {tool}")
+    with compression.plain_input(input_def) as plain_def:
+        if tool == "magic":
+            run_magic(top_name, plain_def, die_area_bbox, gds_file)
+        elif tool == "ieda":
+            run_ieda(plain_def, gds_file, ieda_overrides)
+        elif tool == "klayout":
+            raise NotImplementedError("KLayout GDS dump is not implemented yet.")
+        else:
+            raise ValueError(f"Unsupported GDS dump tool: {tool}")
 
     if snapshot_file:
         save_snapshot_image(gds_file, snapshot_file)
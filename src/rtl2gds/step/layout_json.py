@@ -5,188 +5,221 @@ use for rtl2gds cloud
 import logging
 import os
 import pathlib
-import re
 import subprocess
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Iterable, Iterator
 
 import orjson
 
 from rtl2gds.global_configs import DEFAULT_SDC_FILE, ENV_TOOLS_PATH, StepName
+from rtl2gds.step import ieda_config, layout_bin, layout_delta, layout_tiles
 from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.utils import compression, json_stream, rusage, stream, trace
 
 DEFAULT_MAX_FILE_SIZE = 19 * 1024 * 1024  # 19MB in bytes
+_CHUNK_PREFIX = b'{"data":['
+_CHUNK_SUFFIX = b"]}"
 
 
-def _save_chunk(data_chunk: list[object], file_no_suffix: str, index: int) -> str:
+def _save_chunk(data_chunk: bytes, file_no_suffix: str, index: int) -> str:
     """
-    Save a chunk of data to a JSON file.
+    Save a chunk of serialized items to a JSON file.
+
+    The items are framed as `{"data":[...]}`, byte for byte what
+    `orjson.dumps({"data": items})` writes, without encoding them again.
 
     Parameters:
-    data_chunk (list): The chunk of data to save.
+    data_chunk (bytes): The orjson serialized items of the chunk, comma separated.
     file_no_suffix (str): The base file name (without suffix).
     index (int): The index to append to the file name.
 
     Returns:
     str: The name of the created JSON file.
     """
-    chunk_data = {"data": data_chunk}
     file_name = f"{file_no_suffix}-{index}.json"
 
     with open(file_name, "wb") as file:
-        file.write(orjson.dumps(chunk_data))
+        file.write(_CHUNK_PREFIX)
+        file.write(data_chunk)
+        file.write(_CHUNK_SUFFIX)
     return file_name
 
 
-def _remove_bracket_trailing_commas(json_str: str) -> str:
-    """
-    Remove trailing commas before closing square or curly brackets in a JSON string.
-
-    Parameters:
-    json_str (str): The JSON string to process.
-
-    Returns:
-    str: The JSON string with trailing commas removed.
+def _split_data_into_chunks(data: Iterable[object], max_file_size: int) -> Iterator[bytearray]:
     """
-    return re.sub(r",\s*([\]}])", r"\1", json_str)
+    Split JSON data into smaller chunks of serialized items.
 
-
-def _read_and_validate_json(filename: str) -> dict:
-    """
-    Read and validate the JSON file.
+    Each item is serialized once, its size decides the chunk and its bytes are
+    appended to the chunk for `_save_chunk` (one buffer per chunk: orjson
+    over-allocates the bytes of small items).
 
     Parameters:
-    filename (str): The name of the JSON file to read.
-
-    Returns:
-    dict: The loaded JSON data.
-    """
-    with open(filename, "rb") as f:
-        data = _remove_bracket_trailing_commas(f.read().decode("utf-8"))
-        data = orjson.loads(data)
-
-    assert "data" in data, "Invalid data format: 'data' key missing"
-    assert isinstance(data["data"], list), "Invalid data format: not a list"
-    return data
-
-
-def _extract_header(data: dict) -> dict:
-    """
-    Extract header from the JSON data.
-
-    Parameters:
-    data (dict): The JSON data.
-
-    Returns:
-    dict: The header data.
-    """
-    return {key: value for key, value in data.items() if key != "data"}
-
-
-def _split_data_into_chunks(data: list[object], max_file_size: int) -> list[list[object]]:
-    """
-    Split JSON data into smaller chunks.
-
-    Parameters:
-    data (list): The list of data to split.
+    data (Iterable): The data items to split, consumed lazily.
     max_file_size (int): The maximum size of each chunk in bytes.
 
-    Returns:
-    list: A list of tuples containing the chunks and their indices.
+    Yields:
+    bytearray: The comma separated items of each chunk once it is full, one chunk is held
+        at a time.
     """
-    chunks = []
-    current_chunk = []
+    current_chunk = bytearray()
     current_size = 0
 
     for item in data:
         item_serialized = orjson.dumps(item)
         item_size = len(item_serialized)
         if current_size + item_size > max_file_size:
-            chunks.append(current_chunk)
-            current_chunk = []
+            yield current_chunk
+            current_chunk = bytearray()
             current_size = 0
-        current_chunk.append(item)
+        if current_chunk:
+            current_chunk += b","
+        current_chunk += item_serialized
         current_size += item_size
 
     if current_chunk:
-        chunks.append(current_chunk)
-
-    return chunks
-
-
-def _split_layout_json(filename: str, max_file_size=DEFAULT_MAX_FILE_SIZE) -> list[str]:
+        yield current_chunk
+
+
+def _split_layout_json(
+    filename: str,
+    max_file_size=DEFAULT_MAX_FILE_SIZE,
+    binary: bool = False,
+    tiles: layout_tiles.TilePolicy | None = None,
+    tile_bbox: tuple[float, float, float, float] | None = None,
+    delta: bool = False,
+    delta_base: str | None = None,
+) -> list[str]:
     """
     Split a Layout JSON file into smaller chunks and save them along with their headers.
 
-    This function reads a Layout JSON file, extracts the header and data parts,
-    and splits the data into multiple smaller chunks based on the maximum file size limit.
-    Each chunk along with its header is saved as a separate JSON file.
+    This function streams the `data` items of a Layout JSON file (see `utils.json_stream`)
+    and saves them into chunk files of at most `max_file_size` bytes as they come, so
+    memory stays bounded by one chunk whatever the layout size. The other members of the
+    file are saved as the header once the file has been read.
 
     Parameters:
     filename (str): The name of the Layout JSON file to be split.
-    max_file_size (int): The maximum size of each chunk in bytes (default: 1 MB).
+    max_file_size (int): The maximum size of each chunk in bytes (default: 19 MB).
+    binary (bool): Also export the items in the binary format of `step.layout_bin`,
+        in the same pass.
+    tiles (TilePolicy): Also export the items as tiles, see `step.layout_tiles`.
+    tile_bbox (tuple): The die covered by the tiles, in the units of the items.
+    delta (bool): Also write the index of the items, see `step.layout_delta`.
+    delta_base (str): The index of the previous export, write the delta against it
+        instead of the chunks.
 
     Returns:
-    list: A list of names of the created JSON files.
+    list: A list of names of the created JSON files, the header first, then the
+        chunks (or the delta), the manifest and parts of the binary export, the tile
+        index and tiles and the item index if any.
     """
+    file_no_suffix = os.path.splitext(filename)[0]
+    # an index left by an earlier export of this file must not become a delta base
+    layout_delta.remove_outputs(filename)
+    items = json_stream.ArrayStream(filename, key="data")
+    writers = []
+    if binary:
+        writers.append(layout_bin.Writer(file_no_suffix))
+    if tiles is not None:
+        writers.append(layout_tiles.Writer(file_no_suffix, tile_bbox, tiles))
+    if delta:
+        writers.append(layout_delta.Writer(filename, delta_base))
+    data = items
+    for writer in writers:
+        data = writer.tee(data)
+    chunk_names = []
     try:
-        data = _read_and_validate_json(filename)
-        header = _extract_header(data)
-        file_no_suffix = os.path.splitext(filename)[0]
+        if delta and delta_base is not None:
+            for _ in data:
+                pass
+        else:
+            for idx, chunk in enumerate(_split_data_into_chunks(data, max_file_size)):
+                chunk_names.append(_save_chunk(chunk, file_no_suffix, idx))
     except IOError as e:
         print(f"Error reading file {filename}: {e}")
         return []
+    assert items.found, "Invalid data format: 'data' key missing or not a list"
 
     header_name = f"{file_no_suffix}-header.json"
     with open(header_name, "wb") as file:
-        file.write(orjson.dumps(header))
-
-    chunks = _split_data_into_chunks(data["data"], max_file_size)
-
-    file_names = [header_name]
-    with ThreadPoolExecutor() as executor:
-        futures = [
-            executor.submit(_save_chunk, chunk, file_no_suffix, idx)
-            for idx, chunk in enumerate(chunks)
-        ]
-        for future in futures:
-            file_names.append(future.result())
+        file.write(orjson.dumps(items.header))
 
+    file_names = [header_name] + chunk_names
+    for writer in writers:
+        file_names.extend(writer.close(items.header))
     return file_names
 
 
-def run(input_def: str, result_dir: str, layout_json_file: str) -> list[str]:
+def run(
+    input_def: str,
+    result_dir: str,
+    layout_json_file: str,
+    ieda_overrides: dict | None = None,
+    binary: bool = False,
+    tiles: dict | bool | None = None,
+    die_bbox: str | None = None,
+    delta: bool = False,
+    delta_base: str | None = None,
+) -> list[str]:
     """
     in:
     (fix) IEDA_CONFIG_DIR, IEDA_TCL_SCRIPT_DIR, RESULT_DIR
-    (var) INPUT_DEF, LAYOUT_JSON_FILE
-    out: list of layout json files
+    (var) INPUT_DEF (may be compressed, see `utils.compression`), LAYOUT_JSON_FILE
+    (opt) tiles: a `layout_tiles.TilePolicy` config (True for the defaults),
+          die_bbox: in microns (`Chip.constrain.die_bbox`), needed by `tiles`
+          delta: index the items, delta_base: index of the previous export (`step.layout_delta`)
+    out: list of layout json files, followed by the binary export (`step.layout_bin`)
+    if `binary`, the tiled export (`step.layout_tiles`) if `tiles` and the index if `delta`,
+    the chunks being replaced by the delta against `delta_base` if any
 
     Raises:
         subprocess.CalledProcessError: If the GDS dump command fails
+        ValueError: If `tiles` is set without a valid `die_bbox`, or the DEF has no UNITS.
     """
     step_name = StepName.LAYOUT_JSON
     step_cmd = SHELL_CMD[step_name]
     assert pathlib.Path(input_def).exists()
-    step_env = {
-        "INPUT_DEF": input_def,
-        "RESULT_DIR": result_dir,
-        "LAYOUT_JSON_FILE": layout_json_file,
-        "SDC_FILE": DEFAULT_SDC_FILE,
-    }
-
-    logging.info(
-        "(step.%s) \n subprocess cmd: %s \n subprocess env: %s",
-        step_name,
-        str(step_cmd),
-        str(step_env),
-    )
-
-    step_env.update(ENV_TOOLS_PATH)
-    ret_code = subprocess.call(step_cmd, env=step_env)
-    if ret_code != 0:
-        raise subprocess.CalledProcessError(ret_code, step_cmd)
-
-    return _split_layout_json(layout_json_file)
+    with compression.plain_input(input_def) as plain_def:
+        step_env = {
+            "INPUT_DEF": plain_def,
+            "RESULT_DIR": result_dir,
+            "LAYOUT_JSON_FILE": layout_json_file,
+            "SDC_FILE": DEFAULT_SDC_FILE,
+        }
+
+        logging.info(
+            "(step.%s) \n subprocess cmd: %s \n subprocess env: %s",
+            step_name,
+            str(step_cmd),
+            str(step_env),
+        )
+
+        step_env.update(ENV_TOOLS_PATH)
+        step_env.update(ieda_config.step_env(result_dir, overrides=ieda_overrides))
+        ret_code = rusage.call(
+            step_cmd,
+            step_name,
+            log_file=stream.step_log_file(result_dir, pathlib.Path(layout_json_file).stem),
+            env=step_env,
+        )
+        if ret_code != 0:
+            raise subprocess.CalledProcessError(ret_code, step_cmd)
+
+        tiles = layout_tiles.TilePolicy.from_config(tiles)
+        tile_bbox = None
+        if tiles is not None:
+            # the layout json is in DEF database units
+            units = layout_tiles.def_units(plain_def)
+            tile_bbox = tuple(value * units for value in layout_tiles.parse_bbox(die_bbox or ""))
+
+    with trace.span("split_layout_json", trace.POST):
+        return _split_layout_json(
+            layout_json_file,
+            binary=binary,
+            tiles=tiles,
+            tile_bbox=tile_bbox,
+            delta=delta,
+            delta_base=delta_base,
+        )
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,240 @@
+"""
+Spatially tiled, multi-level-of-detail layout export for the cloud viewer
+
+The die is covered by a quadtree of square tiles: level 0 is one tile over the
+die, level `l` has 2^l x 2^l tiles. Every `data` item of the layout JSON goes to
+the coarsest level where it is at least `min_pixels` wide, a tile being drawn on
+`tile_pixels` pixels, and to the tiles of that level it overlaps (at most 4). Big
+shapes land on coarse levels, small ones on fine levels, the finest level taking
+everything smaller. With `coarse_types` set (e.g. the cell outlines), the items of
+other types (e.g. the routing) go to the finest level, or to the finest level whose
+tiles are as wide as them if they are wider (e.g. power stripes), so they are also
+written to at most 4 tiles. A viewer at zoom level `z` fetches the visible tiles of
+levels 0 to `z` only.
+
+The bounding box of an item is the one of the [x, y] pairs in its list values,
+items without any are put in the level 0 tile. Tiles are written like the layout
+JSON chunks (`{"data":[...]}`) to `{file_no_suffix}-tile-{level}-{x}-{y}.json`,
+indexed by `{file_no_suffix}-tiles.json`.
+"""
+
+import math
+import os
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+
+import orjson
+
+FORMAT = "rtl2gds-layout-tiles"
+VERSION = 1
+
+# same framing as the layout JSON chunks
+_TILE_PREFIX = b'{"data":['
+_TILE_SUFFIX = b"]}"
+# bytes buffered per tile before they are appended to its file
+_FLUSH_SIZE = 256 * 1024
+_RE_DEF_UNITS = re.compile(r"^\s*UNITS\s+DISTANCE\s+MICRONS\s+(\d+)")
+
+
+@dataclass
+class TilePolicy:
+    """
+    Quadtree of the tiled layout export.
+
+    Attributes:
+        levels (int): Number of levels, the finest one has 4^(levels - 1) tiles.
+        tile_pixels (int): Width of a tile on screen.
+        min_pixels (int): Items narrower than this many pixels of a level go to finer levels.
+        coarse_types (list[str]): Item `type`s placed by size, the other items go to the
+            finest level they fit in 2x2 tiles of. All items are placed by size if empty.
+    """
+
+    levels: int = 5
+    tile_pixels: int = 256
+    min_pixels: int = 8
+    coarse_types: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.levels < 1 or not 0 < self.min_pixels < self.tile_pixels:
+            raise ValueError(
+                f"Invalid tile policy {self}, expected levels >= 1, 0 < min_pixels < tile_pixels"
+            )
+
+    def to_config(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_config(cls, config: dict | bool | None) -> "TilePolicy | None":
+        """Policy stored in a chip config value, a dict like `to_config` or True for defaults"""
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        return cls(
+            **{key: value for key, value in config.items() if key in cls.__dataclass_fields__}
+        )
+
+
+def parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    """
+    "llx lly urx ury" (space or comma separated) as floats.
+
+    Raises:
+        ValueError: If it is not 4 numbers of a non-empty box.
+    """
+    values = tuple(float(value) for value in re.split(r"[\s,]+", bbox.strip()))
+    if len(values) != 4 or values[2] <= values[0] or values[3] <= values[1]:
+        raise ValueError(f"Invalid bounding box {bbox!r}")
+    return values
+
+
+def def_units(def_file: str) -> int:
+    """
+    Database units per micron of a DEF file, from its `UNITS DISTANCE MICRONS`.
+
+    Raises:
+        ValueError: If the DEF has no UNITS statement before its components.
+    """
+    with open(def_file, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _RE_DEF_UNITS.match(line)
+            if match:
+                return int(match.group(1))
+            if line.lstrip().startswith(("COMPONENTS", "END DESIGN")):
+                break
+    raise ValueError(f"No UNITS DISTANCE MICRONS in {def_file}")
+
+
+def _item_bbox(item: dict) -> tuple[float, float, float, float] | None:
+    xs, ys = [], []
+    for value in item.values():
+        if type(value) is list and value and type(value[0]) is list:
+            for point in value:
+                if len(point) == 2 and type(point) is list:
+                    xs.append(point[0])
+                    ys.append(point[1])
+    if not xs:
+        return None
+    try:
+        return min(xs), min(ys), max(xs), max(ys)
+    except TypeError:  # not numbers
+        return None
+
+
+class Writer:
+    """
+    Tiled export of a stream of layout items, see the module doc.
+
+    Args:
+        bbox (tuple): The die, in the units of the item coordinates.
+    """
+
+    def __init__(
+        self,
+        file_no_suffix: str,
+        bbox: tuple[float, float, float, float],
+        policy: TilePolicy | None = None,
+    ):
+        self.file_no_suffix = file_no_suffix
+        self.bbox = bbox
+        self.policy = policy or TilePolicy()
+        self._extent = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+        self._coarse_types = frozenset(self.policy.coarse_types)
+        self._tiles = {}  # (level, x, y) -> [items, bytes written]
+        self._buffers = {}  # (level, x, y) -> bytes not written yet
+
+    def level_of(self, size: float) -> int:
+        """The coarsest level a shape `size` wide is visible at"""
+        if size <= 0:
+            return self.policy.levels - 1
+        pixels = self.policy.tile_pixels / self.policy.min_pixels
+        level = math.ceil(math.log2(self._extent / (size * pixels)))
+        return min(max(level, 0), self.policy.levels - 1)
+
+    def fit_level(self, size: float) -> int:
+        """The finest level with tiles at least `size` wide, an item is then on 2x2 tiles"""
+        if size <= 0:
+            return self.policy.levels - 1
+        level = math.floor(math.log2(self._extent / size))
+        return min(max(level, 0), self.policy.levels - 1)
+
+    def tiles_of(self, item: dict) -> list[tuple[int, int, int]]:
+        bbox = _item_bbox(item)
+        if bbox is None:
+            return [(0, 0, 0)]
+        size = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+        if self._coarse_types and item.get("type") not in self._coarse_types:
+            level = self.fit_level(size)
+        else:
+            level = self.level_of(size)
+        count = 1 << level
+        tile_size = self._extent / count
+
+        def index(value: float, origin: float) -> int:
+            return min(max(int((value - origin) // tile_size), 0), count - 1)
+
+        x0, x1 = index(bbox[0], self.bbox[0]), index(bbox[2], self.bbox[0])
+        y0, y1 = index(bbox[1], self.bbox[1]), index(bbox[3], self.bbox[1])
+        return [(level, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def add(self, item: dict) -> None:
+        data = orjson.dumps(item)
+        for tile in self.tiles_of(item):
+            buffer = self._buffers.get(tile)
+            if buffer is None:
+                buffer = self._buffers[tile] = bytearray()
+            stats = self._tiles.setdefault(tile, [0, 0])
+            if stats[0]:
+                buffer += b","
+            buffer += data
+            stats[0] += 1
+            if len(buffer) >= _FLUSH_SIZE:
+                self._flush(tile)
+
+    def tee(self, items: Iterable[object]) -> Iterator[object]:
+        """`items`, each also added to the export"""
+        for item in items:
+            if isinstance(item, dict):
+                self.add(item)
+            yield item
+
+    def tile_file(self, tile: tuple[int, int, int]) -> str:
+        return "{}-tile-{}-{}-{}.json".format(self.file_no_suffix, *tile)
+
+    def close(self, header: dict) -> list[str]:
+        """Finish the tiles and write the index, returns the index then the tile files"""
+        for tile in self._tiles:
+            self._flush(tile, last=True)
+        index_file = f"{self.file_no_suffix}-tiles.json"
+        index = {
+            "format": FORMAT,
+            "version": VERSION,
+            "header": header,
+            "bbox": list(self.bbox),
+            "extent": self._extent,
+            "levels": self.policy.levels,
+            "tile_pixels": self.policy.tile_pixels,
+            "min_pixels": self.policy.min_pixels,
+            "tiles": {
+                "{}/{}/{}".format(*tile): {
+                    "file": os.path.basename(self.tile_file(tile)),
+                    "items": items,
+                    "size": size,
+                }
+                for tile, (items, size) in sorted(self._tiles.items())
+            },
+        }
+        with open(index_file, "wb") as f:
+            f.write(orjson.dumps(index))
+        return [index_file] + [self.tile_file(tile) for tile in sorted(self._tiles)]
+
+    def _flush(self, tile: tuple[int, int, int], last: bool = False) -> None:
+        stats = self._tiles[tile]
+        first = stats[1] == 0
+        with open(self.tile_file(tile), "wb" if first else "ab") as f:
+            if first:
+                stats[1] += f.write(_TILE_PREFIX)
+            stats[1] += f.write(self._buffers.pop(tile, b""))
+            if last:
+                stats[1] += f.write(_TILE_SUFFIX)
@@ -0,0 +1,77 @@
+"""
+Cell areas and the sequential (flip-flop/latch) cell set of liberty files
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+_RE_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+# one token per match: a cell header, a cell area, a sequential group, a string or a brace
+_RE_TOKEN = re.compile(
+    r'\bcell\s*\(\s*"?([^")\s]+)"?\s*\)'
+    r"|\barea\s*:\s*([-+\d.eE]+)"
+    r"|\b(ff|ff_bank|latch|latch_bank)\s*\("
+    r'|"[^"]*"'
+    r"|([{}])"
+)
+# yosys internal flip-flops/latches, left over when a design is not mapped to a liberty:
+# the gate level $_DFF*/$_SDFF*/$_ALDFF*/$_DLATCH*/$_SR_*/$_FF_ and the word level
+# $*dff*/$*latch*/$sr/$ff families
+_RE_YOSYS_SEQUENTIAL = re.compile(r"\$(_[A-Z]*(DFF|DLATCH)|_SR_|_FF_$|[a-z]*(dff|latch)|sr$|ff$)")
+
+
+@dataclass(frozen=True)
+class LibertyCells:
+    """Area of each cell of a liberty file, and the cells with a `ff`/`latch` group"""
+
+    areas: dict[str, float] = field(default_factory=dict)
+    sequential: frozenset[str] = frozenset()
+
+    def is_sequential(self, cell_type: str) -> bool:
+        return cell_type in self.sequential or bool(_RE_YOSYS_SEQUENTIAL.match(cell_type))
+
+
+@lru_cache(maxsize=8)
+def _read_cells(path: str, size: int, mtime_ns: int) -> LibertyCells:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = _RE_COMMENT.sub("", f.read())
+
+    areas = {}
+    sequential = set()
+    depth = 0
+    cell = None
+    cell_depth = None  # depth inside the group of `cell`
+    pending_cell = None
+    for match in _RE_TOKEN.finditer(text):
+        name, area, seq_group, brace = match.groups()
+        if brace == "{":
+            depth += 1
+            if pending_cell is not None:
+                cell, cell_depth, pending_cell = pending_cell, depth, None
+        elif brace == "}":
+            if depth == cell_depth:
+                cell = cell_depth = None
+            depth -= 1
+        elif name is not None:
+            pending_cell = name
+        elif cell is None:
+            continue
+        elif area is not None and depth == cell_depth:
+            areas[cell] = float(area)
+        elif seq_group is not None:
+            sequential.add(cell)
+    return LibertyCells(areas, frozenset(sequential))
+
+
+def read_cells(path: str) -> LibertyCells:
+    """
+    Read the cells of a liberty file, memoized on (path, size, mtime).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _read_cells(path, stat.st_size, stat.st_mtime_ns)
@@ -3,7 +3,9 @@ import os
 import subprocess
 
 from rtl2gds.global_configs import DEFAULT_SDC_FILE, ENV_TOOLS_PATH, StepName
+from rtl2gds.step import ieda_config
 from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.utils import compression, rusage, stream
 
 
 def run(
@@ -13,6 +15,7 @@ def run(
     clk_port_name: str,
     clk_freq_mhz: float,
     sta_report_dirname: str = "sta",
+    ieda_overrides: dict | None = None,
 ):
     assert os.path.exists(input_def)
 
@@ -37,8 +40,16 @@ def run(
     )
 
     shell_env.update(ENV_TOOLS_PATH)
+    shell_env.update(ieda_config.step_env(result_dir, overrides=ieda_overrides))
 
-    ret_code = subprocess.call(shell_cmd, env=shell_env)
+    with compression.plain_input(input_def) as plain_def:
+        shell_env["INPUT_DEF"] = plain_def
+        ret_code = rusage.call(
+            shell_cmd,
+            StepName.STA,
+            log_file=stream.step_log_file(result_dir, StepName.STA),
+            env=shell_env,
+        )
     if ret_code != 0:
         raise subprocess.CalledProcessError(ret_code, shell_cmd)
 
@@ -6,9 +6,12 @@ import json
 import logging
 import os
 import subprocess
+from contextlib import nullcontext
 
 from rtl2gds.global_configs import DEFAULT_SDC_FILE, ENV_TOOLS_PATH, StepName
-from rtl2gds.step import configs
+from rtl2gds.step import configs, ieda_config
+from rtl2gds.step.ieda_session import IEDASession
+from rtl2gds.utils import compression, progress, rusage, stream, trace
 
 
 class Step:
@@ -31,8 +34,25 @@ class Step:
         output_verilog: str,
         clk_port_name: str,
         clk_freq_mhz: float,
+        session: IEDASession | None = None,
+        save_def: bool = True,
+        num_threads: int | None = None,
+        ieda_overrides: dict | None = None,
+        compression_codec: str | None = None,
     ):
-        assert os.path.exists(input_def)
+        """
+        Run the step in its own iEDA process, or in `session` when given.
+
+        In a session the input DEF is only read if the session has no design loaded yet,
+        and the output DEF/verilog are only written if `save_def` is set.
+        The step reads the iEDA configs rendered with `ieda_overrides` and `num_threads`
+        (see `ieda_config`), which is also passed as `NUM_THREADS` when set.
+        With a `compression_codec` the output DEF/verilog artifacts are compressed files
+        (see `utils.compression`), a compressed input DEF is read transparently.
+        """
+        read_input = session is None or not session.loaded
+        if read_input:
+            assert os.path.exists(input_def)
 
         artifacts = {
             "def": output_def,
@@ -72,27 +92,45 @@ class Step:
             str(shell_env),
         )
 
-        shell_env.update(ENV_TOOLS_PATH)
-
-        from rtl2gds.utils.time import end_step_timer, start_step_timer
-
-        start_datetime, start_time, timer_step_name = start_step_timer(step_name=self.step_name)
-        try:
-            ret_code = subprocess.call(self.shell_cmd, env=shell_env)
-            if ret_code != 0:
-                raise subprocess.CalledProcessError(ret_code, self.shell_cmd)
-        except subprocess.CalledProcessError as e:
-            raise subprocess.CalledProcessError(
-                e.returncode,
-                e.cmd,
-                output=f"Step {self.step_name} failed with return code {e.returncode}",
-            ) from e
-
-        end_step_timer(
-            start_datetime=start_datetime,
-            start_time=start_time,
-            step_name=timer_step_name,
-        )
+        with (
+            trace.span(self.step_name, trace.STEP, tool=self.tool_name),
+            (
+                compression.plain_input(input_def) if read_input else nullcontext(input_def)
+            ) as tool_input_def,
+            compression.StagedOutputs(
+                {"def": artifacts["def"], "verilog": artifacts["verilog"]}, compression_codec
+            ) as staged,
+        ):
+            shell_env["INPUT_DEF"] = tool_input_def
+            shell_env["OUTPUT_DEF"] = staged.tool_path("def")
+            shell_env["OUTPUT_VERILOG"] = staged.tool_path("verilog")
+            try:
+                if session is not None:
+                    shell_env.update(ieda_config.step_env(result_dir, num_threads, ieda_overrides))
+                    session.run_step(self.step_name, tool_input_def, shell_env)
+                    if save_def:
+                        session.save_def(shell_env["OUTPUT_DEF"], shell_env["OUTPUT_VERILOG"])
+                    else:
+                        del artifacts["def"], artifacts["verilog"]
+                else:
+                    shell_env.update(ENV_TOOLS_PATH)
+                    shell_env.update(ieda_config.step_env(result_dir, num_threads, ieda_overrides))
+                    ret_code = rusage.call(
+                        self.shell_cmd,
+                        self.step_name,
+                        log_file=stream.step_log_file(result_dir, self.step_name),
+                        parsers=progress.parsers_for(self.tool_name),
+                        env=shell_env,
+                    )
+                    if ret_code != 0:
+                        raise subprocess.CalledProcessError(ret_code, self.shell_cmd)
+            except subprocess.CalledProcessError as e:
+                raise subprocess.CalledProcessError(
+                    e.returncode,
+                    e.cmd,
+                    output=f"Step {self.step_name} failed with return code {e.returncode}",
+                ) from e
+            artifacts.update(staged.commit())
 
         # iterate through artifacts and check if they exist
         for key, value in artifacts.items():
@@ -114,6 +152,8 @@ class Step:
                 "cell_area": float(summary["Instances"]["total"]["area"]),
                 "num_instances": int(summary["Design Statis"]["num_instances"]),
             }
+        if staged.stats.files:
+            metrics["intermediate_compression"] = staged.stats.to_metrics()
 
         return metrics, artifacts
 
@@ -0,0 +1,161 @@
+"""
+Parallel, cached SystemVerilog to Verilog conversion with sv2v
+
+Each `.sv` file is converted by its own sv2v process, up to one per available
+core at the same time (the threads of the pool only wait for their process).
+Outputs are cached by a digest of the file content, the include dirs'
+content, the defines, the top module and the sv2v binary, so unchanged files
+are copied from the cache instead of converted again.
+Failed conversions are collected and reported together by `Sv2vError`.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from rtl2gds.global_configs import DEFAULT_CACHE_DIR, ENV_TOOLS_PATH
+from rtl2gds.utils import trace
+from rtl2gds.utils.hashing import file_digest, tool_fingerprint, tree_digest, value_digest
+from rtl2gds.utils.threads import available_cpus
+
+# below the cache root, `DEFAULT_CACHE_DIR` or the one of the step cache
+CACHE_NAME = "sv2v"
+SV2V_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, CACHE_NAME)
+SV2V_CACHE_VERSION = 1
+# lines of sv2v output kept per failed file
+_ERROR_LINES = 20
+
+
+class Sv2vError(RuntimeError):
+    """sv2v failed for some files, `failures` maps each of them to its error output"""
+
+    def __init__(self, failures: dict[str, str]):
+        self.failures = failures
+        details = "\n".join(f"{path}:\n{error}" for path, error in failures.items())
+        super().__init__(f"sv2v failed for {len(failures)} file(s):\n{details}")
+
+
+def command(
+    input_sv: str,
+    output_v: str,
+    top: str | None = None,
+    incdir: list[str] | None = None,
+    define: list[str] | None = None,
+) -> list[str]:
+    """sv2v command line converting `input_sv` into `output_v`"""
+    cmd = ["sv2v", input_sv, "-w", output_v]
+    for path in incdir or []:
+        cmd.extend(["-I", path])
+    for value in define or []:
+        # NAME or NAME=VALUE
+        cmd.extend(["-D", value])
+    if top:
+        cmd.extend(["--top", top])
+    return cmd
+
+
+def cache_key(
+    input_sv: str,
+    top: str | None = None,
+    incdir: list[str] | None = None,
+    define: list[str] | None = None,
+) -> str:
+    """Digest of everything the conversion of `input_sv` depends on"""
+    return value_digest(
+        {
+            "version": SV2V_CACHE_VERSION,
+            "tool": tool_fingerprint("sv2v", ENV_TOOLS_PATH.get("PATH")),
+            "source": file_digest(input_sv),
+            "top": top,
+            "incdir": [
+                tree_digest(path) if os.path.exists(path) else path for path in incdir or []
+            ],
+            "define": list(define or []),
+        }
+    )
+
+
+def _convert(
+    input_sv: str,
+    output_v: str,
+    top: str | None,
+    incdir: list[str] | None,
+    define: list[str] | None,
+    cache_dir: str,
+) -> tuple[bool, str | None]:
+    """Convert one file. Returns (restored from the cache, error output or None)"""
+    key = cache_key(input_sv, top, incdir, define)
+    cached_v = f"{cache_dir}/{key[:2]}/{key}.v"
+    if os.path.exists(cached_v):
+        shutil.copyfile(cached_v, output_v)
+        return True, None
+
+    try:
+        result = subprocess.run(
+            command(input_sv, output_v, top, incdir, define),
+            capture_output=True,
+            text=True,
+            env=ENV_TOOLS_PATH,
+        )
+    except OSError as e:
+        return False, str(e)
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout).strip().splitlines()
+        return False, "\n".join(output[-_ERROR_LINES:]) or f"exit code {result.returncode}"
+
+    os.makedirs(os.path.dirname(cached_v), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cached_v))
+    os.close(fd)
+    shutil.copyfile(output_v, tmp_path)
+    os.replace(tmp_path, cached_v)
+    return False, None
+
+
+def convert_files(
+    sources: dict[str, str],
+    top: str | None = None,
+    incdir: list[str] | None = None,
+    define: list[str] | None = None,
+    cache_dir: str | None = None,
+    max_workers: int | None = None,
+) -> None:
+    """
+    Convert SystemVerilog files to Verilog, in parallel and through the cache.
+
+    Args:
+        sources (dict): Input `.sv` file to its output `.v` file.
+        top (str, optional): Top module, passed as `--top`.
+        incdir (list[str], optional): Include directories.
+        define (list[str], optional): Defines, `NAME` or `NAME=VALUE`.
+        cache_dir (str, optional): Conversion cache, `SV2V_CACHE_DIR` by default.
+        max_workers (int, optional): sv2v processes at the same time, all available
+            cores by default.
+
+    Raises:
+        Sv2vError: If any conversion failed, with the error of every failed file.
+    """
+    cache_dir = cache_dir or SV2V_CACHE_DIR
+    max_workers = max_workers or available_cpus()
+    with trace.span("sv2v", trace.SUBPROCESS, files=len(sources)) as span:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                input_sv: executor.submit(
+                    _convert, input_sv, output_v, top, incdir, define, cache_dir
+                )
+                for input_sv, output_v in sources.items()
+            }
+            results = {input_sv: future.result() for input_sv, future in futures.items()}
+        span.args["cached"] = sum(cached for cached, _ in results.values())
+
+    failures = {path: error for path, (_, error) in results.items() if error is not None}
+    logging.info(
+        "(sv2v) %d files, %d from the cache, %d failed",
+        len(sources),
+        span.args["cached"],
+        len(failures),
+    )
+    if failures:
+        raise Sv2vError(failures)
@@ -0,0 +1,301 @@
+"""
+Incremental, per-module synthesis of hierarchical designs
+
+The RTL is split into synthesis units: every module that is only instantiated with
+its default parameters is a unit of its own, modules instantiated with parameter
+overrides are synthesized (and flattened) inside the unit of their parent. Each
+unit runs `yosys_synthesis.tcl` with its sub-units as blackboxes, and its mapped
+netlist and stat are cached by a digest of:
+- the RTL of its modules and the preprocessor context (text outside the modules,
+  included files),
+- the digests of its sub-units, whose ports it instantiates,
+- the clock period, the liberty files and the yosys scripts (ABC script included),
+- the yosys binary.
+`yosys_stitch.tcl` then joins the netlists of cached and fresh units into the flat
+netlist and reports of the top, so an edit re-synthesizes the changed modules and
+the units above them only.
+"""
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from rtl2gds.global_configs import DEFAULT_CACHE_DIR, ENV_TOOLS_PATH, R2G_TOOL_DIR, StepName
+from rtl2gds.step.configs import SHELL_CMD, YOSYS_STITCH_CMD
+from rtl2gds.utils import rusage, stream, trace
+from rtl2gds.utils.hashing import file_digest, tool_fingerprint, tree_digest, value_digest
+from rtl2gds.utils.threads import available_cpus
+
+# below the cache root, `DEFAULT_CACHE_DIR` or the one of the step cache
+CACHE_NAME = "synth_modules"
+MODULE_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, CACHE_NAME)
+MODULE_CACHE_VERSION = 1
+YOSYS_DIR = f"{R2G_TOOL_DIR}/yosys"
+
+_RE_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_RE_MODULE = re.compile(
+    r"^[ \t]*(?:module|macromodule)\s+([A-Za-z_][\w$]*)(.*?)^[ \t]*endmodule\b", re.S | re.M
+)
+# `name #(` or `name inst (` / `name inst [`
+_RE_INSTANCE = re.compile(r"\b([A-Za-z_][\w$]*)\s*(?:(#)|(?=[A-Za-z_][\w$]*\s*[\[(]))")
+_RE_INCLUDE = re.compile(r'`include\s+"([^"]+)"')
+
+
+@dataclass
+class Module:
+    """
+    A module of the RTL.
+
+    Attributes:
+        children (dict): Instantiated module name to whether some instance overrides
+            its parameters (`#(...)` or `defparam`).
+    """
+
+    name: str
+    file: str
+    text: str
+    children: dict[str, bool] = field(default_factory=dict)
+
+
+@dataclass
+class Unit:
+    """Modules synthesized in one yosys run, `blackboxes` are the sub-units they instantiate"""
+
+    name: str
+    modules: list[str]
+    blackboxes: list[str]
+    key: str = ""
+
+
+def scan_modules(rtl_files: list[str]) -> tuple[dict[str, Module], str]:
+    """
+    Find the modules of `rtl_files` and the modules each of them instantiates.
+
+    Returns:
+        tuple: Module name to `Module`, and a digest of the preprocessor context (the
+            text outside the modules of every file and the files they include).
+    """
+    modules = {}
+    context = []
+    for path in rtl_files:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = _RE_COMMENT.sub("", f.read())
+        for match in _RE_MODULE.finditer(text):
+            modules[match.group(1)] = Module(match.group(1), path, match.group(0))
+        outside = _RE_MODULE.sub("", text)
+        context.append(" ".join(outside.split()))
+        for include in _RE_INCLUDE.findall(text):
+            include_file = os.path.join(os.path.dirname(path), include)
+            context.append(file_digest(include_file) if os.path.isfile(include_file) else include)
+
+    for module in modules.values():
+        body = module.text[len("module") :]
+        for match in _RE_INSTANCE.finditer(body):
+            name = match.group(1)
+            if name in modules and name != module.name:
+                parameterized = match.group(2) is not None or "defparam" in body
+                module.children[name] = module.children.get(name, False) or parameterized
+    return modules, value_digest(context)
+
+
+def plan_units(modules: dict[str, Module], top_name: str) -> dict[str, Unit]:
+    """
+    Split the hierarchy below `top_name` into synthesis units, children before parents.
+
+    Raises:
+        KeyError: If `top_name` is not one of `modules`.
+    """
+    # modules below the top, and whether any of their instances is parameterized
+    parameterized = {top_name: False}
+    pending = [top_name]
+    while pending:
+        module = modules[pending.pop()]
+        for child, with_params in module.children.items():
+            if child not in parameterized:
+                pending.append(child)
+            parameterized[child] = parameterized.get(child, False) or with_params
+
+    units = {}
+
+    def visit(name: str) -> None:
+        if name in units:
+            return
+        members, blackboxes = [], set()
+        pending = [name]
+        while pending:
+            member = pending.pop()
+            if member in members:
+                continue
+            members.append(member)
+            for child in modules[member].children:
+                if parameterized[child]:
+                    pending.append(child)
+                else:
+                    blackboxes.add(child)
+        for child in sorted(blackboxes):
+            visit(child)
+        units[name] = Unit(name, sorted(members), sorted(blackboxes))
+
+    visit(top_name)
+    return units
+
+
+def unit_keys(
+    modules: dict[str, Module],
+    units: dict[str, Unit],
+    context_digest: str,
+    clk_freq_mhz: str,
+) -> None:
+    """Set the cache key of every unit, `units` ordered children before parents"""
+    setup = value_digest(
+        {
+            "version": MODULE_CACHE_VERSION,
+            "context": context_digest,
+            "clk_freq_mhz": str(clk_freq_mhz),
+            "scripts": tree_digest(YOSYS_DIR) if os.path.isdir(YOSYS_DIR) else None,
+            "liberty": [
+                file_digest(path)
+                for path in [ENV_TOOLS_PATH.get("LIBERTY_FILE")]
+                if path and os.path.isfile(path)
+            ],
+            "foundry": ENV_TOOLS_PATH.get("FOUNDRY_DIR"),
+            "yosys": tool_fingerprint("yosys", ENV_TOOLS_PATH.get("PATH")),
+        }
+    )
+    for unit in units.values():
+        unit.key = value_digest(
+            {
+                "setup": setup,
+                "top": unit.name,
+                "modules": [modules[name].text for name in unit.modules],
+                "blackboxes": {name: units[name].key for name in unit.blackboxes},
+            }
+        )
+
+
+def _synthesize_unit(
+    unit: Unit,
+    rtl_files: list[str],
+    unit_dir: str,
+    clk_freq_mhz: str,
+    cache_dir: str,
+) -> tuple[bool, str]:
+    """Netlist of one unit, from the cache or synthesized. Returns (cached, netlist)"""
+    netlist_file = f"{unit_dir}/{unit.name}.v"
+    stat_json = f"{unit_dir}/{unit.name}_stat.json"
+    entry = f"{cache_dir}/{unit.key[:2]}/{unit.key}"
+    if os.path.exists(f"{entry}/netlist.v"):
+        shutil.copyfile(f"{entry}/netlist.v", netlist_file)
+        shutil.copyfile(f"{entry}/stat.json", stat_json)
+        return True, netlist_file
+
+    step_env = {
+        "TOP_NAME": unit.name,
+        "RTL_FILE": " \n ".join(rtl_files),
+        "NETLIST_FILE": netlist_file,
+        "SYNTH_STAT_JSON": stat_json,
+        "SYNTH_CHECK_TXT": f"{unit_dir}/{unit.name}_check.txt",
+        "CLK_FREQ_MHZ": str(clk_freq_mhz),
+        "RESULT_DIR": unit_dir,
+        "BLACKBOX_MODULES": " ".join(unit.blackboxes),
+        "KEEP_PORTS": "1",
+    }
+    step_env.update(ENV_TOOLS_PATH)
+    step_cmd = SHELL_CMD[StepName.SYNTHESIS]
+    ret_code = rusage.call(
+        step_cmd,
+        StepName.SYNTHESIS,
+        log_file=f"{unit_dir}/{unit.name}.log",
+        env=step_env,
+    )
+    if ret_code != 0:
+        raise subprocess.CalledProcessError(ret_code, step_cmd)
+
+    # each unit is published whole, a concurrent run reads either nothing or both files
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp_entry = tempfile.mkdtemp(dir=os.path.dirname(entry))
+    shutil.copyfile(netlist_file, f"{tmp_entry}/netlist.v")
+    shutil.copyfile(stat_json, f"{tmp_entry}/stat.json")
+    try:
+        os.rename(tmp_entry, entry)
+    except OSError:
+        # stored by a concurrent run meanwhile
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+    return False, netlist_file
+
+
+def run(
+    top_name: str,
+    rtl_files: list[str],
+    netlist_file: str,
+    synth_stat_json: str,
+    synth_check_txt: str,
+    clk_freq_mhz: str,
+    result_dir: str,
+    cache_dir: str | None = None,
+    max_workers: int | None = None,
+) -> dict | None:
+    """
+    Synthesize `top_name` module by module and stitch the netlists, see the module doc.
+
+    The units are independent (sub-units are blackboxes), so the uncached ones are
+    synthesized in parallel.
+
+    Returns:
+        dict | None: Number of units and of units restored from the cache, or None if
+            the hierarchy could not be found in the RTL (the caller synthesizes flat).
+
+    Raises:
+        subprocess.CalledProcessError: If a yosys run fails.
+    """
+    modules, context_digest = scan_modules(rtl_files)
+    if top_name not in modules:
+        logging.warning("(synth_modules) top module %s not found in the RTL", top_name)
+        return None
+    units = plan_units(modules, top_name)
+    unit_keys(modules, units, context_digest, clk_freq_mhz)
+
+    cache_dir = cache_dir or MODULE_CACHE_DIR
+    unit_dir = f"{result_dir}/synth_modules"
+    os.makedirs(unit_dir, exist_ok=True)
+    with trace.span("synth_modules", trace.SUBPROCESS, units=len(units)) as span:
+        with ThreadPoolExecutor(max_workers=max_workers or available_cpus()) as executor:
+            futures = [
+                executor.submit(
+                    _synthesize_unit, unit, rtl_files, unit_dir, clk_freq_mhz, cache_dir
+                )
+                for unit in units.values()
+            ]
+            results = [future.result() for future in futures]
+        span.args["cached"] = sum(cached for cached, _ in results)
+    logging.info(
+        "(synth_modules) %d modules in %d units, %d from the cache",
+        len(modules),
+        len(units),
+        span.args["cached"],
+    )
+
+    step_env = {
+        "TOP_NAME": top_name,
+        "RTL_FILE": " \n ".join(netlist for _, netlist in results),
+        "NETLIST_FILE": netlist_file,
+        "SYNTH_STAT_JSON": synth_stat_json,
+        "SYNTH_CHECK_TXT": synth_check_txt,
+        "CLK_FREQ_MHZ": str(clk_freq_mhz),
+        "RESULT_DIR": result_dir,
+    }
+    step_env.update(ENV_TOOLS_PATH)
+    ret_code = rusage.call(
+        YOSYS_STITCH_CMD,
+        StepName.SYNTHESIS,
+        log_file=stream.step_log_file(result_dir, StepName.SYNTHESIS),
+        env=step_env,
+    )
+    if ret_code != 0:
+        raise subprocess.CalledProcessError(ret_code, YOSYS_STITCH_CMD)
+    return {"units": len(units), "cached": span.args["cached"]}
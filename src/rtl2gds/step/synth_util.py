@@ -37,30 +37,230 @@ class HierarchyNode:
         }
 
 
+# Regex patterns pre-compiled for efficiency, each one only tried on the lines that
+# pass a cheap prefix/character check it implies
+# Match key-value lines, allowing floats and optional percentage (lines with ":")
+_RE_KV_LINE = re.compile(r"^\s*(.*?):\s+([\d.]+)\s*(\(.*\))?$")
+_RE_PERCENT = re.compile(r"\(([\d.]+)%\)")
+# Match area lines (handles optional quotes and 'top module')
+_RE_AREA_LINE = re.compile(r"^\s*Chip area for (?:module|top module)\s+'?([^']*)'?:\s+([\d.]+)")
+# Match sequential area lines, only right after an area line
+_RE_SEQ_AREA_LINE = re.compile(
+    r"^\s*of which used for sequential elements:\s+([\d.]+)\s+\(([\d.]+)%\)"
+)
+# Match ignored "Area unknown" lines
+_RE_AREA_UNKNOWN = re.compile(r"^\s*Area for cell type .* is unknown!")
+# Match cell count lines (handles complex names with $, \, ', = etc.), lines without ":"
+_RE_CELL_LINE = re.compile(r"^\s+([$a-zA-Z0-9_\\~.\'=\\]+)\s+(\d+)$")
+# Match hierarchy lines (handles complex names)
+_RE_HIERARCHY_LINE = re.compile(r"^(\s*)([$a-zA-Z0-9_\\~.\'=\\]+)\s+(\d+)$")
+# Cell lines need significant indentation (heuristic: at least 5 spaces)
+_CELL_INDENT = " " * 5
+
+_MODE_START = "start"
+_MODE_MODULE = "module_stats"
+_MODE_HIERARCHY = "hierarchy_tree"
+_MODE_SUMMARY = "hierarchy_summary"
+
+
+def _sanitize_name(name):
+    """Removes potentially problematic characters like leading/trailing quotes or backslashes."""
+    name = name.strip()
+    # Remove leading/trailing backslash common in some tools
+    if name.startswith("\\"):
+        name = name[1:]
+    # Remove leading/trailing single quotes (often seen in area lines)
+    name = name.strip("'")
+    # Note: Internal backslashes within names like $paramod\dff are kept.
+    return name
+
+
+def _parse_kv_line(line, stats_dict):
+    """Parses a key-value line like 'Number of wires: 123'."""
+    match = _RE_KV_LINE.match(line)
+    if match:
+        key = match.group(1).strip().lower().replace(" ", "_").replace("\\", "")
+        value_str = match.group(2).strip()
+        try:
+            # Try converting to int, then float if it fails
+            try:
+                value = int(value_str)
+            except ValueError:
+                value = float(value_str)
+            stats_dict[key] = value
+            # Check for percentage in parenthesis (like sequential area)
+            if match.group(3):
+                percent_match = _RE_PERCENT.search(match.group(3))
+                if percent_match:
+                    stats_dict[key + "_percent"] = float(percent_match.group(1))
+            return True
+        except ValueError:
+            print(f"Warning: Could not parse value '{value_str}' for key '{key}' in line: {line}")
+    return False
+
+
+def _cell_name(name):
+    """Sanitized cell name, most names need nothing done."""
+    if name[0] == "\\" or name[0] == "'" or name[-1] == "'":
+        return _sanitize_name(name)
+    return name
+
+
+def _parse_area_line(line, stats_dict):
+    """Parses the 'Chip area for module...' line."""
+    match = _RE_AREA_LINE.match(line)
+    if match:
+        try:
+            stats_dict["chip_area"] = float(match.group(2))
+            return True
+        except ValueError:
+            print(f"Warning: Could not parse area value '{match.group(2)}' in line: {line}")
+    return False
+
+
+def _parse_sequential_area_line(line, stats_dict):
+    """Parses the 'of which used for sequential elements...' line."""
+    match = _RE_SEQ_AREA_LINE.match(line)
+    if match:
+        try:
+            stats_dict["sequential_area"] = float(match.group(1))
+            stats_dict["sequential_area_percent"] = float(match.group(2))
+            return True
+        except ValueError:
+            print(f"Warning: Could not parse sequential area values in line: {line}")
+    return False
+
+
+class SynthStatStream:
+    """
+    Single-pass reader of a synthesis statistics file (synth_stat.txt).
+
+    Iterating yields `(module_name, stats)` as soon as a module section ends, so the
+    statistics of huge flattened reports need not be kept all at once. Every line is
+    classified once, by its prefix and indentation, and handed to at most one regex.
+    `hierarchy_root` and `total_stats` are filled in as the iteration gets to them.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.hierarchy_root = None
+        self.total_stats = {}
+
+    def __iter__(self):
+        module_name = None
+        module_stats = None
+        mode = _MODE_START
+        indent_stack = []  # Stores (indentation_level, node) pairs for hierarchy
+        # stats the line right after an area line adds the sequential area to
+        seq_area_stats = None
+
+        with open(self.file_path, "r") as f:
+            for line in f:
+                line = line.rstrip()
+
+                if seq_area_stats is not None:
+                    stats, seq_area_stats = seq_area_stats, None
+                    if _parse_sequential_area_line(line, stats):
+                        continue
+
+                # Skip blank lines
+                if not line:
+                    continue
+
+                # --- Mode Switching: module headers like === module_name === ---
+                if len(line) >= 8 and line.startswith("=== ") and line.endswith(" ==="):
+                    if module_stats is not None:
+                        yield module_name, module_stats
+                    name = _sanitize_name(line[4:-4])
+                    if name == "design hierarchy":
+                        mode = _MODE_HIERARCHY
+                        module_name = None
+                        module_stats = None
+                        indent_stack = []  # Reset hierarchy stack
+                    else:
+                        mode = _MODE_MODULE
+                        module_name = name
+                        module_stats = {"name": name}
+                    continue
+
+                if mode == _MODE_MODULE:
+                    # the bulk of a report: cell lines, the only ones without ":"
+                    if ":" not in line:
+                        if line.startswith(_CELL_INDENT):
+                            match = _RE_CELL_LINE.match(line)
+                            if match:
+                                name, count = match.groups()
+                                cells = module_stats.get("cells")
+                                if cells is None:
+                                    cells = module_stats["cells"] = {}
+                                cells[_cell_name(name)] = int(count)
+                        continue
+                    stripped = line.lstrip()
+                    if stripped.startswith("Area for cell type ") and _RE_AREA_UNKNOWN.match(line):
+                        continue  # Ignore these specific warning lines
+                    if stripped.startswith("Chip area for ") and _parse_area_line(
+                        line, module_stats
+                    ):
+                        seq_area_stats = module_stats
+                        continue
+                    _parse_kv_line(line, module_stats)
+                    continue
+
+                if mode == _MODE_HIERARCHY:
+                    match = _RE_HIERARCHY_LINE.match(line)
+                    if match:
+                        indent = len(match.group(1))
+                        # Create node (name sanitized inside constructor)
+                        new_node = HierarchyNode(match.group(2), int(match.group(3)))
+                        # Adjust stack based on indentation
+                        while indent_stack and indent <= indent_stack[-1][0]:
+                            indent_stack.pop()
+                        if not indent_stack:
+                            self.hierarchy_root = new_node
+                        else:
+                            indent_stack[-1][1].add_child(new_node)
+                        indent_stack.append((indent, new_node))
+                        continue
+                    # If line doesn't match hierarchy format, assume it's the start
+                    # of the hierarchy summary statistics section, parsed below
+                    mode = _MODE_SUMMARY
+                    self.total_stats = {}
+
+                if mode == _MODE_SUMMARY:
+                    # Parse remaining lines as key-value or cell counts for total stats
+                    if ":" not in line:
+                        if line.startswith(_CELL_INDENT):
+                            match = _RE_CELL_LINE.match(line)
+                            if match:
+                                cells = self.total_stats.setdefault("cells", {})
+                                cells[_cell_name(match.group(1))] = int(match.group(2))
+                        continue
+                    temp_stats = {}
+                    if _parse_kv_line(line, temp_stats):
+                        self.total_stats.update(temp_stats)
+                        continue
+                    if line.lstrip().startswith("Chip area for ") and _parse_area_line(
+                        line, temp_stats
+                    ):
+                        self.total_stats.update(temp_stats)
+                        seq_area_stats = self.total_stats
+
+        if module_stats is not None:  # The very last module's stats
+            yield module_name, module_stats
+
+
+def iter_module_stats(file_path):
+    """Yields `(module_name, stats)` of each module of a synth_stat.txt, see `SynthStatStream`."""
+    yield from SynthStatStream(file_path)
+
+
 class SynthStatParser:
     """
     Parses a logic synthesis statistics file (synth_stat.txt)
     to extract module statistics and design hierarchy. Handles complex module names.
+    The file is read in one pass by `SynthStatStream`.
     """
 
-    # Regex patterns pre-compiled for efficiency
-    # Match module headers like === module_name ===
-    _RE_MODULE_HEADER = re.compile(r"^=== (.*) ===$")
-    # Match key-value lines, allowing floats and optional percentage
-    _RE_KV_LINE = re.compile(r"^\s*(.*?):\s+([\d.]+)\s*(\(.*\))?$")
-    # Match cell count lines (handles complex names with $, \, ', = etc.)
-    _RE_CELL_LINE = re.compile(r"^\s+([$a-zA-Z0-9_\\~.\'=\\]+)\s+(\d+)$")
-    # Match area lines (handles optional quotes and 'top module')
-    _RE_AREA_LINE = re.compile(r"^\s*Chip area for (?:module|top module)\s+'?([^']*)'?:\s+([\d.]+)")
-    # Match sequential area lines
-    _RE_SEQ_AREA_LINE = re.compile(
-        r"^\s*of which used for sequential elements:\s+([\d.]+)\s+\(([\d.]+)%\)"
-    )
-    # Match hierarchy lines (handles complex names)
-    _RE_HIERARCHY_LINE = re.compile(r"^(\s*)([$a-zA-Z0-9_\\~.\'=\\]+)\s+(\d+)$")
-    # Match ignored "Area unknown" lines
-    _RE_AREA_UNKNOWN = re.compile(r"^\s*Area for cell type .* is unknown!")
-
     def __init__(self, file_path):
         self.file_path = file_path
         self.module_stats = {}
@@ -70,276 +270,25 @@ class SynthStatParser:
 
     def _sanitize_name(self, name):
         """Removes potentially problematic characters like leading/trailing quotes or backslashes."""
-        name = name.strip()
-        # Remove leading/trailing backslash common in some tools
-        if name.startswith("\\"):
-            name = name[1:]
-        # Remove leading/trailing single quotes (often seen in area lines)
-        name = name.strip("'")
-        # Note: Internal backslashes within names like $paramod\dff are kept.
-        return name
-
-    def _parse_kv_line(self, line, stats_dict):
-        """Parses a key-value line like 'Number of wires: 123'."""
-        match = self._RE_KV_LINE.match(line)
-        if match:
-            key = match.group(1).strip().lower().replace(" ", "_").replace("\\", "")
-            value_str = match.group(2).strip()
-            try:
-                # Try converting to int, then float if it fails
-                try:
-                    value = int(value_str)
-                except ValueError:
-                    value = float(value_str)
-                stats_dict[key] = value
-                # Check for percentage in parenthesis (like sequential area)
-                if match.group(3):
-                    percent_match = re.search(r"\(([\d.]+)%\)", match.group(3))
-                    if percent_match:
-                        stats_dict[key + "_percent"] = float(percent_match.group(1))
-                return True
-            except ValueError:
-                print(
-                    f"Warning: Could not parse value '{value_str}' for key '{key}' in line: {line}"
-                )
-        return False
-
-    def _parse_cell_line(self, line, stats_dict):
-        """Parses an indented cell line like '  sky130_...  123'."""
-        # Cell lines must start with significant indentation
-        if not line.startswith(" " * 5):  # Heuristic: require at least 5 spaces
-            return False
-        match = self._RE_CELL_LINE.match(line)
-        if match:
-            cell_name = self._sanitize_name(match.group(1))  # Sanitize here
-            count = int(match.group(2))
-            if "cells" not in stats_dict:
-                stats_dict["cells"] = {}
-            stats_dict["cells"][cell_name] = count
-            return True
-        # else:
-        #    if line.strip() and line[0].isspace(): # Debugging unmatched indented lines
-        #        print(f"Debug: Did not match cell line regex: '{line}'")
-        return False
-
-    def _parse_area_line(self, line, stats_dict):
-        """Parses the 'Chip area for module...' line."""
-        match = self._RE_AREA_LINE.match(line)
-        if match:
-            # module_name_in_line = self._sanitize_name(match.group(1)) # Sanitize
-            # We don't strictly need the name here as we get it from the header,
-            # but could be used for verification if needed.
-            try:
-                stats_dict["chip_area"] = float(match.group(2))
-                return True
-            except ValueError:
-                print(f"Warning: Could not parse area value '{match.group(2)}' in line: {line}")
-        return False
-
-    def _parse_sequential_area_line(self, line, stats_dict):
-        """Parses the 'of which used for sequential elements...' line."""
-        match = self._RE_SEQ_AREA_LINE.match(line)
-        if match:
-            try:
-                stats_dict["sequential_area"] = float(match.group(1))
-                stats_dict["sequential_area_percent"] = float(match.group(2))
-                return True
-            except ValueError:
-                print(f"Warning: Could not parse sequential area values in line: {line}")
-        return False
-
-    def _parse_hierarchy_line(self, line):
-        """Parses a line from the design hierarchy section."""
-        match = self._RE_HIERARCHY_LINE.match(line)
-        if match:
-            indentation = len(match.group(1))
-            # Name is sanitized when creating the HierarchyNode object
-            module_name = match.group(2).strip()  # Keep original for Node creation
-            count = int(match.group(3))
-            return indentation, module_name, count
-        return None, None, None
+        return _sanitize_name(name)
 
     def _parse(self):
         """Main parsing logic."""
-        current_module_name_sanitized = None
-        current_stats = None
-        mode = "start"  # Modes: start, module_stats, hierarchy_tree, hierarchy_summary
-        indent_stack = []  # Stores (indentation_level, node) pairs for hierarchy
-        pending_line = None  # Holds the next line if not processed after area line
-
+        stream = SynthStatStream(self.file_path)
         try:
-            with open(self.file_path, "r") as f:
-                # Use an iterator for easier handling of lookahead/pending lines
-                line_iter = iter(f)
-
-                while True:
-                    # --- Get the next line to process ---
-                    if pending_line is not None:
-                        line = pending_line.rstrip()
-                        pending_line = None  # Consume the pending line
-                    else:
-                        try:
-                            line = next(line_iter).rstrip()
-                        except StopIteration:
-                            break  # End of file
-
-                    # print(f"Debug - Mode: {mode}, Line: '{line}'") # Debug print
-
-                    # --- Mode Switching ---
-                    module_header_match = self._RE_MODULE_HEADER.match(line)
-                    if module_header_match:
-                        raw_module_name = module_header_match.group(1).strip()
-                        sanitized_name = self._sanitize_name(raw_module_name)
-
-                        if sanitized_name == "design hierarchy":
-                            mode = "hierarchy_tree"
-                            if current_stats:  # Save last module before hierarchy
-                                self.module_stats[current_module_name_sanitized] = current_stats
-                            current_module_name_sanitized = None
-                            current_stats = None
-                            indent_stack = []  # Reset hierarchy stack
-                            # print(f"Debug - Switched to mode: {mode}") # Debug print
-                        else:
-                            mode = "module_stats"
-                            if current_stats:  # Save previous module's stats
-                                self.module_stats[current_module_name_sanitized] = current_stats
-                            current_module_name_sanitized = sanitized_name
-                            current_stats = {"name": current_module_name_sanitized}
-                            # print(f"Debug - Parsing module: {current_module_name_sanitized}") # Debug print
-                        continue  # Move to next line after header
-
-                    # Skip blank lines
-                    if not line.strip():
-                        continue
-
-                    # --- Parsing based on Mode ---
-                    if mode == "module_stats":
-                        if current_stats is None:
-                            continue  # Should not happen
-
-                        # Check for specific lines first
-                        if self._RE_AREA_UNKNOWN.match(line):
-                            # print(f"Debug - Ignoring unknown area line: {line}") # Debug print
-                            continue  # Ignore these specific warning lines
-
-                        if self._parse_area_line(line, current_stats):
-                            # Check immediately for sequential area on the *next* line
-                            try:
-                                next_line_content = next(line_iter)
-                                # Temporarily strip for matching, but keep original if needed elsewhere
-                                if not self._parse_sequential_area_line(
-                                    next_line_content.rstrip(), current_stats
-                                ):
-                                    # If it wasn't sequential area, save it for the next iteration
-                                    pending_line = next_line_content
-                            except StopIteration:
-                                pass  # End of file after area line
-                            continue  # Area line (and maybe seq area) processed
-
-                        if self._parse_kv_line(line, current_stats):
-                            continue  # Key-value line processed
-
-                        if self._parse_cell_line(line, current_stats):
-                            continue  # Cell line processed
-
-                        # If none of the above matched, it might be noise or unexpected format
-                        # print(f"Warning: Unparsed line in module_stats: '{line}'")
-
-                    elif mode == "hierarchy_tree":
-                        indent, raw_name, count = self._parse_hierarchy_line(line)
-                        if indent is not None:
-                            # Create node (name sanitized inside constructor)
-                            new_node = HierarchyNode(raw_name, count)
-                            # print(f"Debug - Hierarchy node: indent={indent}, name='{new_node.name}', count={count}") # Debug print
-
-                            # Adjust stack based on indentation
-                            while indent_stack and indent <= indent_stack[-1][0]:
-                                indent_stack.pop()
-
-                            if not indent_stack:
-                                # This is the root node
-                                self.hierarchy_root = new_node
-                            else:
-                                # Add as child to the node currently at the top of the stack
-                                parent_node = indent_stack[-1][1]
-                                parent_node.add_child(new_node)
-
-                            # Push the new node and its indentation level onto the stack
-                            indent_stack.append((indent, new_node))
-                        else:
-                            # If line doesn't match hierarchy format, assume it's the start
-                            # of the hierarchy summary statistics section
-                            mode = "hierarchy_summary"
-                            self.total_stats = {}
-                            # print(f"Debug - Switched to mode: {mode}") # Debug print
-                            # Re-process the current line in the new mode
-                            # Use a temporary dict for parsing attempts
-                            temp_stats = {}
-                            if self._parse_kv_line(line, temp_stats):
-                                self.total_stats.update(temp_stats)
-                                continue
-                            if self._parse_cell_line(line, temp_stats):
-                                # Handle merging cell dicts
-                                if "cells" not in self.total_stats:
-                                    self.total_stats["cells"] = {}
-                                self.total_stats["cells"].update(temp_stats["cells"])
-                                continue
-                            if self._parse_area_line(line, temp_stats):
-                                self.total_stats.update(temp_stats)
-                                # Check immediately for sequential area on the *next* line
-                                try:
-                                    next_line_content = next(line_iter)
-                                    if not self._parse_sequential_area_line(
-                                        next_line_content.rstrip(), self.total_stats
-                                    ):
-                                        pending_line = next_line_content
-                                except StopIteration:
-                                    pass
-                                continue
-                            # else: print(f"Warning: Unparsed line at start of hierarchy_summary: '{line}'")
-
-                    elif mode == "hierarchy_summary":
-                        # Parse remaining lines as key-value or cell counts for total stats
-                        # Use a temporary dict for parsing attempts
-                        temp_stats = {}
-                        if self._parse_kv_line(line, temp_stats):
-                            self.total_stats.update(temp_stats)
-                            continue
-                        if self._parse_cell_line(line, temp_stats):
-                            # Handle merging cell dicts
-                            if "cells" not in self.total_stats:
-                                self.total_stats["cells"] = {}
-                            self.total_stats["cells"].update(temp_stats["cells"])
-                            continue
-                        if self._parse_area_line(line, temp_stats):
-                            self.total_stats.update(temp_stats)
-                            # Check immediately for sequential area on the *next* line
-                            try:
-                                next_line_content = next(line_iter)
-                                if not self._parse_sequential_area_line(
-                                    next_line_content.rstrip(), self.total_stats
-                                ):
-                                    pending_line = next_line_content
-                            except StopIteration:
-                                pass
-                            continue
-                        # else: print(f"Warning: Unparsed line in hierarchy_summary: '{line}'")
-
-                # End of loop
-                if current_stats:  # Save the very last module's stats
-                    self.module_stats[current_module_name_sanitized] = current_stats
-                # print("Debug - Reached end of file processing.") # Debug print
-
+            for module_name, stats in stream:
+                self.module_stats[module_name] = stats
         except FileNotFoundError:
             print(f"Error: File not found at {self.file_path}")
             self.module_stats = {}
-            self.hierarchy_root = None
-            self.total_stats = {}
+            return
         except Exception as e:
             print(f"An unexpected error occurred during parsing: {e}")
             import traceback
 
             traceback.print_exc()
+        self.hierarchy_root = stream.hierarchy_root
+        self.total_stats = stream.total_stats
 
     def get_module_stats(self, module_name=None):
         """Returns statistics for a specific module or all modules."""
@@ -2,15 +2,18 @@
 Synthesis step implementation using yosys
 """
 
-import json
 import logging
 import math
 import os
 import subprocess
 import tempfile
 
+import orjson
+
 from rtl2gds.global_configs import ENV_TOOLS_PATH, StepName
+from rtl2gds.step import abc_portfolio, liberty, sv2v, synth_modules
 from rtl2gds.step.configs import SHELL_CMD
+from rtl2gds.utils import progress, rusage, stream, trace
 
 MAX_CELL_AREA = 1_000_000
 
@@ -115,21 +118,7 @@ def convert_sv2v(input_sv, output_v, top=None, write=None, incdir=None, define=N
         bool: True if conversion was successful, False otherwise.
     """
 
-    # import shutil; shutil.which("sv2v")
-    sv2v_executable = "sv2v"
-    if not sv2v_executable:
-        print("Error: sv2v is not installed or not in PATH.")
-        return False
-
-    cmd = [sv2v_executable, input_sv, "-w", output_v]  # Basic sv2v command
-    if incdir:
-        for incdir in incdir:
-            cmd.extend(["-I", incdir])
-    if define:
-        for define in define:
-            cmd.extend(["-D", f"{define}"])  # Assumes define is in NAME=VALUE format
-    if top:
-        cmd.extend(["--top", top])
+    cmd = sv2v.command(input_sv, output_v, top=top, incdir=incdir, define=define)
     if write:
         cmd.extend(["-w", write])
 
@@ -143,65 +132,97 @@ def convert_sv2v(input_sv, output_v, top=None, write=None, incdir=None, define=N
         return False
 
 
-def parse_synth_stat(synth_stat_json: str):
-    """Extract top module area and name from yosys report and simplify cell names"""
-    stats = {
-        "num_cells": 0,
-        "cell_area": 0.0,
-        "sequential_ratio": 0.0,
-        "cell_types": {},
-    }
-    # cell_prefix = "sg13g2_"
-    # cell_prefix_match_pattern = f"     {cell_prefix}"
+def parse_synth_stat(synth_stat_json: str, liberty_file: str | None = None) -> dict:
+    """
+    Summarize the yosys `stat -json` report of a synthesized design.
 
-    with open(
-        synth_stat_json,
-        "r",
-        encoding="utf-8",
-    ) as f:
-        summary = json.load(f)
-        print(summary)
-        stats["num_cells"] = int(summary["design"]["num_cells"])
-        stats["cell_area"] = float(summary["design"]["area"])
+    Args:
+        synth_stat_json (str): The JSON report.
+        liberty_file (str, optional): Liberty of the mapped cells, its `ff`/`latch` cells
+            are the sequential ones. Without it only yosys internal flip-flops are.
 
-    return stats
+    Returns:
+        dict: `num_cells`, `cell_area`, `num_sequential_cells`, `sequential_area`,
+            `sequential_ratio` (share of the cell area), `cell_types` (cell type to its
+            count in the design) and `module_cells` (module to its number of cells).
+    """
+    with open(synth_stat_json, "rb") as f:
+        summary = orjson.loads(f.read())
+    design = summary["design"]
+    cells = liberty.LibertyCells()
+    if liberty_file and os.path.exists(liberty_file):
+        cells = liberty.read_cells(liberty_file)
+
+    cell_types = {
+        name.removeprefix("\\"): int(count)
+        for name, count in design.get("num_cells_by_type", {}).items()
+    }
+    sequential = {name: count for name, count in cell_types.items() if cells.is_sequential(name)}
+    sequential_area = sum(count * cells.areas.get(name, 0.0) for name, count in sequential.items())
+    cell_area = float(design["area"])
+    return {
+        "num_cells": int(design["num_cells"]),
+        "cell_area": cell_area,
+        "num_sequential_cells": sum(sequential.values()),
+        "sequential_area": sequential_area,
+        "sequential_ratio": sequential_area / cell_area if cell_area else 0.0,
+        "cell_types": cell_types,
+        "module_cells": {
+            name.removeprefix("\\"): int(module.get("num_cells", 0))
+            for name, module in summary.get("modules", {}).items()
+        },
+    }
 
 
-def _convert_sv_to_v(rtl_file: str | list[str], result_dir: str, top_name: str) -> str | list[str]:
+def _convert_sv_to_v(
+    rtl_file: str | list[str], result_dir: str, top_name: str, cache_dir: str | None = None
+) -> str | list[str]:
     """Convert SystemVerilog files to Verilog format if necessary.
 
+    The files are converted in parallel and through the sv2v cache, see `step.sv2v`.
+
     Args:
         rtl_file: Path(s) to the input RTL file(s)
         result_dir: Directory to store converted Verilog files
         top_name: Name of the top-level module
+        cache_dir: Root of the conversion cache, see `run`
 
     Returns:
         Path(s) to the converted Verilog file(s)
 
     Raises:
-        RuntimeError: If SystemVerilog conversion fails
+        Sv2vError: If SystemVerilog conversion fails, for all the failed files at once
     """
-    if isinstance(rtl_file, str) and rtl_file.endswith(".sv"):
-        if not os.path.exists(rtl_file):
-            raise FileNotFoundError(f"RTL file {rtl_file} not found")
-        converted_v_file = f"{result_dir}/{os.path.basename(rtl_file).replace('.sv', '.v')}"
-        if not convert_sv2v(rtl_file, converted_v_file, top=top_name):
-            raise RuntimeError(f"Failed to convert SystemVerilog file {rtl_file} to Verilog")
-        return converted_v_file
-    elif isinstance(rtl_file, list) and any(file.endswith(".sv") for file in rtl_file):
-        converted_v_files = []
-        for file in rtl_file:
-            if not os.path.exists(file):
-                raise FileNotFoundError(f"RTL file {file} not found")
-            if file.endswith(".sv"):
-                converted_v_file = f"{result_dir}/{os.path.basename(file).replace('.sv', '.v')}"
-                if not convert_sv2v(file, converted_v_file, top=top_name):
-                    raise RuntimeError(f"Failed to convert SystemVerilog file {file} to Verilog")
-                converted_v_files.append(converted_v_file)
-            else:
-                converted_v_files.append(file)
-        return converted_v_files
-    return rtl_file
+    rtl_files = [rtl_file] if isinstance(rtl_file, str) else rtl_file
+    if not any(file.endswith(".sv") for file in rtl_files):
+        return rtl_file
+
+    converted_files = []
+    sources = {}
+    outputs = set()
+    for file in rtl_files:
+        if not os.path.exists(file):
+            raise FileNotFoundError(f"RTL file {file} not found")
+        if not file.endswith(".sv"):
+            converted_files.append(file)
+            continue
+        stem = os.path.basename(file)[: -len(".sv")]
+        converted_v_file = f"{result_dir}/{stem}.v"
+        # same file name in different directories, the suffixed name may be taken too
+        suffix = len(sources)
+        while converted_v_file in outputs:
+            converted_v_file = f"{result_dir}/{stem}_{suffix}.v"
+            suffix += 1
+        sources[file] = converted_v_file
+        outputs.add(converted_v_file)
+        converted_files.append(converted_v_file)
+
+    sv2v.convert_files(
+        sources,
+        top=top_name,
+        cache_dir=os.path.join(cache_dir, sv2v.CACHE_NAME) if cache_dir else None,
+    )
+    return converted_files[0] if isinstance(rtl_file, str) else converted_files
 
 
 def _setup_step_env(
@@ -277,6 +298,9 @@ def run(
     die_bbox: str | None = None,
     core_bbox: str | None = None,
     core_util: float | None = None,
+    hierarchical: bool = False,
+    portfolio: dict | list | None = None,
+    cache_dir: str | None = None,
 ):
     """Run synthesis step using Yosys.
 
@@ -289,6 +313,14 @@ def run(
         die_bbox (str, optional): Die area coordinates. Defaults to None
         core_bbox (str, optional): Core area coordinates. Defaults to None
         core_util (float, optional): Core utilization percentage. Defaults to None
+        hierarchical (bool, optional): Synthesize each module on its own through the
+            module cache and stitch the netlists, see `step.synth_modules`. Defaults to False
+        portfolio (dict | list, optional): ABC recipes to map the design with in parallel,
+            the best result is kept, see `step.abc_portfolio.AbcPortfolio`. Not used in
+            hierarchical mode. Defaults to None
+        cache_dir (str, optional): Root of the sv2v and module caches, which go to its
+            `sv2v` and `synth_modules` subdirectories (e.g. the step cache dir).
+            Defaults to `DEFAULT_CACHE_DIR`
 
     Returns:
         dict: Dictionary containing synthesis results including:
@@ -297,7 +329,10 @@ def run(
             - CORE_UTIL: Core utilization percentage
             - NUM_CELLS: Total number of cells
             - CELL_AREA: Total cell area
+            - NUM_SEQUENTIAL_CELLS: Number of flip-flops and latches
+            - SEQUENTIAL_RATIO: Share of the cell area used by sequential cells
             - CELL_TYPES: Dictionary of cell types and their counts
+            - MODULE_CELLS: Dictionary of modules and their number of cells
 
     Raises:
         subprocess.CalledProcessError: If synthesis fails
@@ -307,7 +342,7 @@ def run(
     # Convert SystemVerilog files if necessary and also check RTL file existence
     result_dir = os.path.abspath(result_dir)
     netlist_file = os.path.abspath(netlist_file)
-    rtl_file = _convert_sv_to_v(rtl_file, result_dir, top_name)
+    rtl_file = _convert_sv_to_v(rtl_file, result_dir, top_name, cache_dir)
 
     # flatten rtl_file if it is a list (pass ENV var to yosys.tcl)
     if isinstance(rtl_file, list):
@@ -325,6 +360,30 @@ def run(
         "netlist": netlist_file,
     }
 
+    module_stats = None
+    if hierarchical:
+        with trace.span(StepName.SYNTHESIS, trace.STEP, tool="yosys", hierarchical=True):
+            module_stats = synth_modules.run(
+                top_name,
+                [f.strip() for f in rtl_file.split("\n") if f.strip()],
+                netlist_file,
+                artifacts["synth_stat_json"],
+                artifacts["synth_check_txt"],
+                clk_freq_mhz,
+                result_dir,
+                cache_dir=os.path.join(cache_dir, synth_modules.CACHE_NAME) if cache_dir else None,
+            )
+
+    portfolio = abc_portfolio.AbcPortfolio.from_config(portfolio)
+    portfolio_stats = None
+    if portfolio is not None and module_stats is not None:
+        logging.warning("(step.%s) ABC portfolio not used in hierarchical mode", StepName.SYNTHESIS)
+    elif portfolio is not None:
+        with trace.span(StepName.SYNTHESIS, trace.STEP, tool="yosys", portfolio=portfolio.recipes):
+            portfolio_stats = abc_portfolio.run(
+                portfolio, top_name, rtl_file, artifacts, clk_freq_mhz, result_dir
+            )
+
     # Setup environment variables
     step_env = _setup_step_env(
         top_name,
@@ -344,16 +403,25 @@ def run(
         step_env,
     )
 
-    ret_code = subprocess.call(step_cmd, env=step_env)
-    if ret_code != 0:
-        raise subprocess.CalledProcessError(ret_code, step_cmd)
+    if module_stats is None and portfolio_stats is None:
+        with trace.span(StepName.SYNTHESIS, trace.STEP, tool="yosys"):
+            ret_code = rusage.call(
+                step_cmd,
+                StepName.SYNTHESIS,
+                log_file=stream.step_log_file(result_dir, StepName.SYNTHESIS),
+                parsers=progress.parsers_for("yosys"),
+                env=step_env,
+            )
+        if ret_code != 0:
+            raise subprocess.CalledProcessError(ret_code, step_cmd)
 
     # collect results
     synth_stat = artifacts["synth_stat_json"]
     assert os.path.exists(synth_stat), "Synthesis statistic file not found"
     assert os.path.exists(netlist_file), "Netlist file not found"
 
-    stats = parse_synth_stat(synth_stat)
+    with trace.span("parse_synth_stat", trace.POST):
+        stats = parse_synth_stat(synth_stat, ENV_TOOLS_PATH.get("LIBERTY_FILE"))
     cell_area = stats["cell_area"]
     assert 0 < cell_area
     assert (
@@ -369,7 +437,15 @@ def run(
         "core_util": core_util,
         "num_cells": stats["num_cells"],
         "cell_area": cell_area,
+        "num_sequential_cells": stats["num_sequential_cells"],
+        "sequential_ratio": stats["sequential_ratio"],
+        "cell_types": stats["cell_types"],
+        "module_cells": stats["module_cells"],
     }
+    if module_stats is not None:
+        metrics["synth_modules"] = module_stats
+    if portfolio_stats is not None:
+        metrics["abc_portfolio"] = portfolio_stats
 
     return metrics, artifacts
 
@@ -4,7 +4,15 @@ __all__ = [
     # Classes
     "MDLogger",
     "time",
+    "hashing",
     "json_helper",
+    "json_stream",
     "md_logger",
     "process",
+    "progress",
+    "rusage",
+    "stream",
+    "threads",
+    "trace",
+    "watchdog",
 ]
@@ -0,0 +1,229 @@
+"""
+Compressed DEF/verilog intermediates between the P&R steps
+
+Each P&R step writes the full DEF and verilog of the design, read back by the
+next step. With a codec set (`Keyword.INTERMEDIATE_COMPRESSION`), the tools
+write them to a local scratch dir (`StagedOutputs`) and only the compressed
+files land in the result dir, e.g. `<top>_place.def.zst`. A tool reading a
+compressed input gets a decompressed temp copy (`plain_input`).
+
+gzip uses the standard library, zstd the `zstd` command line tool. Both are
+deterministic, so the compressed files can key the step cache and the
+checkpoint checksums like plain ones.
+"""
+
+import gzip
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+from . import trace
+
+# codec -> file suffix
+CODECS = {"gzip": ".gz", "zstd": ".zst"}
+# favour speed, the files are rewritten by every step
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+_COPY_BUFFER = 1 << 20
+
+# per-step compression stats of this process, like `rusage.resource_data`
+compression_data = {"steps": {}}
+_compression_data_lock = threading.Lock()
+
+
+@dataclass
+class CompressionStats:
+    """Sizes and time of the files compressed by a step"""
+
+    codec: str = ""
+    files: int = 0
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """raw / compressed size, 0 if nothing was compressed"""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    def add(self, other: "CompressionStats") -> None:
+        self.codec = self.codec or other.codec
+        self.files += other.files
+        self.raw_bytes += other.raw_bytes
+        self.compressed_bytes += other.compressed_bytes
+        self.seconds += other.seconds
+
+    def to_metrics(self) -> dict:
+        return dict(asdict(self), ratio=round(self.ratio, 3))
+
+    @classmethod
+    def from_metrics(cls, metrics: dict) -> "CompressionStats":
+        return cls(**{key: value for key, value in metrics.items() if key != "ratio"})
+
+
+def check_codec(codec: str | None) -> str | None:
+    """`codec` if it is usable here (None disables compression), raise ValueError otherwise"""
+    if codec is None:
+        return None
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec {codec}, expected one of {list(CODECS)}")
+    if codec == "zstd" and shutil.which("zstd") is None:
+        raise ValueError("Compression codec zstd needs the zstd command line tool")
+    return codec
+
+
+def codec_of(path: str) -> str | None:
+    """Codec of a file, from its suffix, None for a plain file"""
+    for codec, suffix in CODECS.items():
+        if path.endswith(suffix):
+            return codec
+    return None
+
+
+def _zstd(args: list[str]) -> None:
+    ret_code = subprocess.call(["zstd", "-q", "-f", *args], stdin=subprocess.DEVNULL)
+    if ret_code != 0:
+        raise subprocess.CalledProcessError(ret_code, ["zstd", *args])
+
+
+def compress_file(src: str, dest: str, codec: str, level: int | None = None) -> CompressionStats:
+    """
+    Compress `src` into `dest`, replacing `dest` atomically.
+
+    Returns:
+        CompressionStats: Sizes and time of this file.
+    """
+    level = level or DEFAULT_LEVELS[codec]
+    start = time.perf_counter()
+    tmp = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if codec == "gzip":
+            with open(src, "rb") as f_in, open(tmp, "wb") as f_raw:
+                # mtime=0: the same content always gives the same bytes
+                with gzip.GzipFile(
+                    filename="", mode="wb", compresslevel=level, fileobj=f_raw, mtime=0
+                ) as f_out:
+                    shutil.copyfileobj(f_in, f_out, _COPY_BUFFER)
+        else:
+            _zstd([f"-{level}", "-T0", src, "-o", tmp])
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return CompressionStats(
+        codec=codec,
+        files=1,
+        raw_bytes=os.path.getsize(src),
+        compressed_bytes=os.path.getsize(dest),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def decompress_file(src: str, dest: str) -> None:
+    """Decompress `src`, a file with a codec suffix, into `dest`"""
+    codec = codec_of(src)
+    if codec == "gzip":
+        with gzip.open(src, "rb") as f_in, open(dest, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, _COPY_BUFFER)
+    elif codec == "zstd":
+        _zstd(["-d", src, "-o", dest])
+    else:
+        raise ValueError(f"{src} has no known compression suffix {list(CODECS.values())}")
+
+
+@contextmanager
+def plain_input(path: str):
+    """
+    Path of `path` for a tool that cannot read compressed files: `path` itself, or
+    a decompressed copy in a local temp dir, removed on exit.
+    """
+    codec = codec_of(path)
+    if codec is None:
+        yield path
+        return
+
+    tmp_dir = tempfile.mkdtemp(prefix="rtl2gds_")
+    try:
+        plain = os.path.join(tmp_dir, os.path.basename(path)[: -len(CODECS[codec])])
+        start = time.perf_counter()
+        decompress_file(path, plain)
+        logging.debug("(compression) %s decompressed in %.2fs", path, time.perf_counter() - start)
+        yield plain
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class StagedOutputs:
+    """
+    Output files of a tool, written uncompressed to a local scratch dir and
+    compressed into their final location by `commit`. Without a codec the tool
+    writes the final files directly.
+
+    Args:
+        outputs (dict): Artifact key to final (uncompressed) path.
+        codec (str, optional): One of `CODECS`, None to disable compression.
+    """
+
+    def __init__(self, outputs: dict[str, str], codec: str | None = None):
+        self.outputs = outputs
+        self.codec = codec
+        self.stats = CompressionStats(codec=codec or "")
+        self._scratch_dir = None
+
+    def __enter__(self) -> "StagedOutputs":
+        if self.codec is not None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="rtl2gds_")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._scratch_dir is not None:
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            self._scratch_dir = None
+
+    def tool_path(self, key: str) -> str:
+        """Where the tool writes the output `key`"""
+        if self._scratch_dir is None:
+            return self.outputs[key]
+        return os.path.join(self._scratch_dir, os.path.basename(self.outputs[key]))
+
+    def commit(self) -> dict[str, str]:
+        """
+        Compress the outputs the tool wrote next to their final path.
+
+        Returns:
+            dict: Artifact key to the compressed file, for the outputs that exist.
+        """
+        if self._scratch_dir is None:
+            return {}
+        committed = {}
+        for key, path in self.outputs.items():
+            staged = self.tool_path(key)
+            if not os.path.exists(staged):
+                continue
+            dest = path + CODECS[self.codec]
+            self.stats.add(compress_file(staged, dest, self.codec))
+            os.remove(staged)
+            committed[key] = dest
+        if committed:
+            trace.annotate(compression=self.stats.to_metrics())
+        return committed
+
+
+def record(step_name: str, stats: dict) -> None:
+    """Account the `CompressionStats.to_metrics` of a step run"""
+    with _compression_data_lock:
+        total = CompressionStats.from_metrics(compression_data["steps"].get(step_name, {}))
+        total.add(CompressionStats.from_metrics(stats))
+        compression_data["steps"][step_name] = total.to_metrics()
+
+
+def reset_compression_data() -> None:
+    """Forget the stats recorded so far, for a process that runs several flows"""
+    with _compression_data_lock:
+        compression_data["steps"] = {}
@@ -0,0 +1,94 @@
+"""
+content digests for files, directory trees and json-like values
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+
+_BLOCK_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=1024)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """
+    Compute the sha256 digest of a file.
+
+    Digests are memoized on (path, size, mtime), so hashing the same
+    multi-hundred-MB DEF for several consumers in one process is free.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file content.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+def tree_digest(path: str) -> str:
+    """
+    Compute a digest over a file or every file under a directory.
+
+    Relative file names are part of the digest, so renames are detected.
+
+    Args:
+        path (str): Path to a file or directory.
+
+    Returns:
+        str: Hex digest of the tree, or of the file if `path` is a file.
+    """
+    if os.path.isfile(path):
+        return file_digest(path)
+
+    sha = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            sha.update(os.path.relpath(file_path, path).encode("utf-8"))
+            sha.update(b"\0")
+            sha.update(file_digest(file_path).encode("ascii"))
+    return sha.hexdigest()
+
+
+def value_digest(value: object) -> str:
+    """
+    Compute a digest of a json-serializable value, independent of dict ordering.
+
+    Args:
+        value (object): Value to hash, non-json types are hashed by `str()`.
+
+    Returns:
+        str: Hex digest of the canonical json encoding.
+    """
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def tool_fingerprint(tool: str, search_path: str | None = None) -> str:
+    """
+    Identify a tool binary by its resolved path, size and modification time.
+
+    Much cheaper than spawning `<tool> -version`, and it changes whenever the binary is rebuilt.
+    """
+    tool_path = shutil.which(tool, path=search_path)
+    if tool_path is None:
+        return f"{tool}:missing"
+    stat = os.stat(tool_path)
+    return f"{tool_path}:{stat.st_size}:{stat.st_mtime_ns}"
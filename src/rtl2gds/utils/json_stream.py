@@ -0,0 +1,183 @@
+"""
+Incremental reader of the array member of a large JSON object file
+
+iEDA writes layout JSON files of several GB: a small header object around one
+`data` array holding every shape of the design. `ArrayStream` walks the top level
+object in fixed size text blocks and yields the items of the array in file order,
+so only the current block and its items are held in memory, never the whole
+document. The complete items of a block are parsed at once by orjson.
+
+Like `json.loads` after `re.sub(r",\\s*([\\]}])", r"\\1", text)`, the trailing
+commas iEDA leaves before closing brackets are accepted: they are dropped block
+by block, the unfinished ",<spaces>" end of a block is carried to the next one.
+"""
+
+import json
+import re
+from collections.abc import Iterator
+
+import orjson
+
+DEFAULT_BLOCK_SIZE = 1 << 20  # characters read at a time
+
+# ",<spaces>" before a closing bracket, removed with the spaces like the `re.sub` above
+_RE_TRAILING_COMMA = re.compile(r",\s*(?=[\]}])")
+_RE_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# what may follow a number cut by the end of a block, e.g. "0." or "1e"
+_RE_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+def _reject_constant(name: str):
+    raise ValueError(f"Invalid JSON constant {name}")
+
+
+class ArrayStream:
+    """
+    Items of the array member `key` of the JSON object in `path`, in file order.
+
+    The other members of the object are collected in `header` while iterating,
+    it is complete once the iteration is exhausted.
+
+    Raises (while iterating):
+        ValueError: If the file is not a JSON object, `json.JSONDecodeError` for invalid values.
+    """
+
+    def __init__(self, path: str, key: str = "data", block_size: int = DEFAULT_BLOCK_SIZE):
+        self.path = path
+        self.key = key
+        self.block_size = block_size
+        self.header = {}
+        self.found = False  # whether `key` is a member holding an array
+        # NaN/Infinity are not JSON, rejected like orjson does
+        self._decoder = json.JSONDecoder(parse_constant=_reject_constant)
+        self._file = None
+        self._buf = ""
+        self._pos = 0
+        self._tail = ""
+        self._eof = False
+        self._batching = True
+
+    def __iter__(self) -> Iterator[object]:
+        with open(self.path, "r", encoding="utf-8", newline="") as self._file:
+            self._expect("{")
+            if self._peek() == "}":
+                self._pos += 1
+            else:
+                yield from self._members()
+            if self._peek():
+                self._error("Extra data after the JSON object")
+
+    def _members(self) -> Iterator[object]:
+        while True:
+            if self._peek() != '"':
+                self._error("Expecting a member name")
+            name = self._value()
+            self._expect(":")
+            if name == self.key and self._peek() == "[":
+                self.found = True
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    yield from self._items()
+            else:
+                self.header[name] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def _items(self) -> Iterator[object]:
+        while True:
+            batch = self._batch() if self._batching else None
+            if batch is None:
+                yield self._value()
+            else:
+                yield from batch
+            if self._expect(",]") == "]":
+                return
+
+    def _batch(self) -> list[object] | None:
+        """
+        The items of the buffer up to the last "}," at once, parsed by orjson.
+
+        "[" + text + "]" only parses if the text ends at an item boundary, a "}," closing
+        a nested object or inside a string fails and the items are decoded one by one
+        until the buffer is refilled.
+        """
+        end = self._buf.rfind("}", self._pos)
+        for _ in range(4):
+            if end < 0:
+                return None
+            after = _RE_WHITESPACE.match(self._buf, end + 1).end()
+            if after < len(self._buf) and self._buf[after] == ",":
+                break
+            end = self._buf.rfind("}", self._pos, end)
+        else:
+            return None
+        try:
+            items = orjson.loads("[" + self._buf[self._pos : end + 1] + "]")
+        except orjson.JSONDecodeError:
+            self._batching = False
+            return None
+        self._pos = end + 1
+        return items
+
+    def _fill(self, size: int) -> bool:
+        """Append the next `size` characters to the buffer, False at the end of the file"""
+        block = self._file.read(size)
+        text = self._tail + block
+        self._tail = ""
+        if block:
+            # ",<spaces>" at the end may be a trailing comma, decided by the next block
+            stripped = text.rstrip()
+            if stripped.endswith(","):
+                self._tail = text[len(stripped) - 1 :]
+                text = stripped[:-1]
+        else:
+            self._eof = True
+        self._batching = True
+        self._buf = self._buf[self._pos :] + _RE_TRAILING_COMMA.sub("", text)
+        self._pos = 0
+        return bool(block)
+
+    def _peek(self) -> str:
+        """Next non-whitespace character, "" at the end of the file"""
+        while True:
+            self._pos = _RE_WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return ""
+            self._fill(self.block_size)
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            self._error(f"Expecting one of {chars!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> object:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # an unfinished value, read at least as much again to stay linear
+                self._fill(max(self.block_size, len(self._buf) - self._pos))
+                continue
+            # a number or literal at the end of the buffer may go on in the next block,
+            # a number is also cut before a "." or an exponent ("0." decodes as 0)
+            if not self._eof and (
+                end == len(self._buf)
+                or type(value) in (int, float)
+                and _RE_NUMBER_TAIL.match(self._buf, end).end() == len(self._buf)
+            ):
+                self._fill(self.block_size)
+                continue
+            self._pos = end
+            return value
+
+    def _error(self, message: str):
+        raise ValueError(f"{message} in {self.path} near {self._buf[self._pos:self._pos + 40]!r}")
@@ -0,0 +1,176 @@
+"""
+Live progress of the tool subprocesses
+
+Line parsers look at the tool output as it streams by (see `utils.stream`) and
+turn the lines they recognise into `ProgressEvent`s: placement iterations with
+overflow/HPWL, routing stages, yosys passes. Listeners registered with
+`add_listener` get every event, so a CLI or a front-end can show progress and an
+ETA without tailing log files.
+
+Listeners are called from the threads reading the tool output: keep them quick
+and thread-safe.
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+# event kinds
+START = "start"
+END = "end"
+ITERATION = "iteration"
+STAGE = "stage"
+PASS = "pass"
+
+
+@dataclass
+class ProgressEvent:
+    """Something a running step reported"""
+
+    step_name: str
+    kind: str
+    # kind specific values, e.g. {"iteration": 120, "overflow": 0.31, "hpwl": 1.2e7}
+    values: dict = field(default_factory=dict)
+    # completed share of the step when it can be told from the output, else None
+    fraction: float | None = None
+    # remaining seconds extrapolated from `fraction` and the time since the step started
+    eta_seconds: float | None = None
+    timestamp: float = field(default_factory=time.time)
+
+
+Listener = Callable[[ProgressEvent], None]
+
+_listeners: list[Listener] = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener: Listener) -> None:
+    """Call `listener` with every progress event of this process"""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Listener) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def emit(event: ProgressEvent) -> None:
+    """Hand `event` to the listeners, a failing listener does not stop the tool"""
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning("(progress) listener %r failed: %s", listener, e)
+
+
+class LineParser:
+    """Turn one line of tool output into a progress event, or None"""
+
+    def parse(self, step_name: str, line: str) -> ProgressEvent | None:
+        raise NotImplementedError
+
+
+_NUMBER = r"([-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)"
+
+
+class PlacementParser(LineParser):
+    """
+    iEDA-iPL global placement iterations, e.g.
+    `[NesterovSolve] Iteration: 120 | Overflow: 0.3172 | HPWL: 1.2345e+07`.
+
+    The fraction assumes overflow goes down from 1 to `target_overflow`.
+    """
+
+    _iteration = re.compile(r"\biter(?:ation)?\b\s*[:=]?\s*(\d+)", re.IGNORECASE)
+    _overflow = re.compile(r"\boverflow\b\s*[:=]?\s*" + _NUMBER, re.IGNORECASE)
+    _hpwl = re.compile(r"\bhpwl\b\s*[:=]?\s*" + _NUMBER, re.IGNORECASE)
+
+    def __init__(self, target_overflow: float = 0.1):
+        self.target_overflow = target_overflow
+
+    def parse(self, step_name: str, line: str) -> ProgressEvent | None:
+        iteration = self._iteration.search(line)
+        overflow = self._overflow.search(line)
+        if not (iteration and overflow):
+            return None
+        values = {"iteration": int(iteration.group(1)), "overflow": float(overflow.group(1))}
+        hpwl = self._hpwl.search(line)
+        if hpwl:
+            values["hpwl"] = float(hpwl.group(1))
+        done = (1.0 - values["overflow"]) / (1.0 - self.target_overflow)
+        return ProgressEvent(step_name, ITERATION, values, fraction=min(max(done, 0.0), 1.0))
+
+
+class RoutingParser(LineParser):
+    """iEDA-iRT stages, reported once when the module first shows up in the log"""
+
+    STAGES = (
+        "PinAccessor",
+        "SupplyAnalyzer",
+        "TopologyGenerator",
+        "LayerAssigner",
+        "SpaceRouter",
+        "TrackAssigner",
+        "DetailedRouter",
+        "ViolationReporter",
+    )
+    _stage = re.compile(r"\b(" + "|".join(STAGES) + r")\b")
+
+    def __init__(self):
+        self._seen: set[str] = set()
+
+    def parse(self, step_name: str, line: str) -> ProgressEvent | None:
+        match = self._stage.search(line)
+        if not match or match.group(1) in self._seen:
+            return None
+        stage = match.group(1)
+        self._seen.add(stage)
+        index = self.STAGES.index(stage)
+        return ProgressEvent(
+            step_name, STAGE, {"stage": stage, "index": index}, fraction=index / len(self.STAGES)
+        )
+
+
+class YosysParser(LineParser):
+    """Top-level yosys passes, e.g. `4. Executing SYNTH pass.`"""
+
+    _pass = re.compile(r"^(\d+)\.\s+Executing\s+(.+?)(?:\s+pass)?(?:\s*\(.*\))?\.?\s*$")
+
+    def parse(self, step_name: str, line: str) -> ProgressEvent | None:
+        match = self._pass.match(line)
+        if not match:
+            return None
+        return ProgressEvent(
+            step_name, PASS, {"index": int(match.group(1)), "pass": match.group(2)}
+        )
+
+
+def parsers_for(tool_name: str) -> list[LineParser]:
+    """Fresh parsers for the output of `tool_name` (e.g. `iEDA-iPL`, `yosys`)"""
+    if tool_name == "yosys":
+        return [YosysParser()]
+    if tool_name == "iEDA-iPL":
+        return [PlacementParser()]
+    if tool_name == "iEDA-iRT":
+        return [RoutingParser()]
+    if tool_name == "iEDA":
+        # a persistent session runs every P&R tool
+        return [PlacementParser(), RoutingParser()]
+    return []
+
+
+def log_listener(event: ProgressEvent) -> None:
+    """Listener logging the events, used by the CLI `--progress` option"""
+    values = ", ".join(f"{key}={value}" for key, value in event.values.items())
+    if event.fraction is not None:
+        values += f" ({event.fraction:.0%})"
+    if event.eta_seconds is not None:
+        values += f", eta {event.eta_seconds:.0f}s"
+    logging.info("(progress) %s %s %s", event.step_name, event.kind, values)
@@ -0,0 +1,228 @@
+"""
+Resource usage of the tool subprocesses, aggregated per step
+
+`call` is a drop-in for `subprocess.call` that reaps the child with `os.wait4`
+to get its rusage (CPU time, peak RSS, context switches, including the
+descendants it waited for) and samples `/proc/<pid>/io` while it runs.
+"""
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from . import progress, stream, trace, watchdog
+from .json_helper import dump_json
+
+# seconds between two reads of /proc/<pid>/io
+IO_SAMPLE_INTERVAL = 0.5
+
+# Save all step resource usage in a global dictionary, per process like the trace spans
+resource_data = {"steps": {}}
+_resource_data_lock = threading.Lock()
+
+
+@dataclass
+class ResourceUsage:
+    """Resource usage of one or more processes"""
+
+    user_cpu_seconds: float = 0.0
+    sys_cpu_seconds: float = 0.0
+    # peak resident set of the largest single process, in KiB
+    max_rss_kb: int = 0
+    # storage I/O, sampled: the last interval before exit is missed
+    read_bytes: int = 0
+    write_bytes: int = 0
+    voluntary_ctx_switches: int = 0
+    involuntary_ctx_switches: int = 0
+    wall_seconds: float = 0.0
+    processes: int = 0
+
+    def add(self, other: "ResourceUsage") -> None:
+        """Accumulate `other`, processes of a step run one after another"""
+        self.user_cpu_seconds += other.user_cpu_seconds
+        self.sys_cpu_seconds += other.sys_cpu_seconds
+        self.max_rss_kb = max(self.max_rss_kb, other.max_rss_kb)
+        self.read_bytes += other.read_bytes
+        self.write_bytes += other.write_bytes
+        self.voluntary_ctx_switches += other.voluntary_ctx_switches
+        self.involuntary_ctx_switches += other.involuntary_ctx_switches
+        self.wall_seconds += other.wall_seconds
+        self.processes += other.processes
+
+
+def _read_proc_io(pid: int) -> dict[str, int] | None:
+    """read_bytes/write_bytes of a running process, None if not readable"""
+    try:
+        with open(f"/proc/{pid}/io", "r", encoding="utf-8") as f:
+            counters = dict(line.split(":", 1) for line in f if ":" in line)
+        return {key: int(counters[key]) for key in ("read_bytes", "write_bytes")}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _record(step_name: str, usage: ResourceUsage) -> None:
+    with _resource_data_lock:
+        step_usage = resource_data["steps"].setdefault(step_name, asdict(ResourceUsage()))
+        total = ResourceUsage(**step_usage)
+        total.add(usage)
+        resource_data["steps"][step_name] = asdict(total)
+
+
+def wait(
+    process: subprocess.Popen,
+    step_name: str,
+    start_time: float,
+    io_counters: dict | None = None,
+) -> int:
+    """
+    Reap `process` with `os.wait4` and record its resource usage under `step_name`.
+
+    Args:
+        process (subprocess.Popen): A started process nobody waited for yet.
+        step_name (str): Step to account the usage to.
+        start_time (float): `time.perf_counter()` when the process was started.
+        io_counters (dict, optional): Last sampled read_bytes/write_bytes.
+
+    Returns:
+        int: The return code, also set on `process`.
+    """
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    io_counters = io_counters or {}
+    usage = ResourceUsage(
+        user_cpu_seconds=rusage.ru_utime,
+        sys_cpu_seconds=rusage.ru_stime,
+        max_rss_kb=rusage.ru_maxrss,
+        read_bytes=io_counters.get("read_bytes", 0),
+        write_bytes=io_counters.get("write_bytes", 0),
+        voluntary_ctx_switches=rusage.ru_nvcsw,
+        involuntary_ctx_switches=rusage.ru_nivcsw,
+        wall_seconds=time.perf_counter() - start_time,
+        processes=1,
+    )
+    _record(step_name, usage)
+    trace.annotate(returncode=process.returncode, **asdict(usage))
+    logging.debug("(rusage) %s: %s", step_name, usage)
+    return process.returncode
+
+
+def call(
+    cmd: list,
+    step_name: str,
+    log_file: str | None = None,
+    parsers: list[progress.LineParser] | None = None,
+    **popen_kwargs,
+) -> int:
+    """
+    Run `cmd` like `subprocess.call` and record its resource usage under `step_name`.
+
+    Args:
+        log_file (str, optional): Stream stdout and stderr into this file (and the
+            console), see `utils.stream`. The tail of the output is logged on failure.
+        parsers (list[LineParser], optional): Progress parsers run on the streamed output.
+
+    A watchdog policy made active with `watchdog.policy_scope` bounds the run.
+
+    Returns:
+        int: The return code.
+
+    Raises:
+        watchdog.WatchdogError: If the watchdog stopped the run.
+    """
+    with trace.span(os.path.basename(str(cmd[0])), trace.SUBPROCESS, step=step_name, cmd=cmd):
+        if log_file is None and not parsers:
+            return _call(cmd, step_name, **popen_kwargs)
+
+        sink = stream.LineSink(step_name, log_file, parsers).open(cmd)
+        ret_code = None
+        try:
+            ret_code = _call(cmd, step_name, sink=sink, **popen_kwargs)
+        finally:
+            sink.close(ret_code)
+        if ret_code != 0:
+            logging.error(
+                "(%s) %s exited with %d, last output (full log: %s):\n%s",
+                step_name,
+                os.path.basename(str(cmd[0])),
+                ret_code,
+                log_file,
+                sink.tail(),
+            )
+        return ret_code
+
+
+def _call(cmd: list, step_name: str, sink: stream.LineSink | None = None, **popen_kwargs) -> int:
+    start_time = time.perf_counter()
+    if sink is not None:
+        popen_kwargs.update(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    policy = watchdog.active_policy()
+    watched = policy is not None and (policy.timeout_for(step_name) or policy.stall_seconds)
+    if watched:
+        # own process group, the watchdog stops the tool with all its children
+        popen_kwargs["start_new_session"] = True
+    process = subprocess.Popen(cmd, **popen_kwargs)
+    capture = stream.StreamCapture(process, sink) if sink is not None else None
+    dog = None
+    if watched:
+        last_output = sink.last_output if sink is not None else None
+        dog = watchdog.Watchdog(process, step_name, policy, last_output=last_output).start()
+    io_counters = {}
+    stop = threading.Event()
+
+    def sample_io():
+        while True:
+            counters = _read_proc_io(process.pid)
+            if counters:
+                io_counters.update(counters)
+            if stop.wait(IO_SAMPLE_INTERVAL):
+                return
+
+    sampler = threading.Thread(target=sample_io, daemon=True)
+    sampler.start()
+    try:
+        ret_code = wait(process, step_name, start_time, io_counters)
+    except BaseException:
+        # interrupted while waiting, do not leave the tool running
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        stop.set()
+        sampler.join()
+        if dog is not None:
+            dog.stop()
+        if capture is not None:
+            capture.join()
+
+    if dog is not None and dog.reason:
+        raise watchdog.WatchdogError(step_name, dog.reason, cmd)
+    return ret_code
+
+
+def reset_resource_data():
+    """Forget the usage recorded so far, for a process that runs several flows"""
+    with _resource_data_lock:
+        resource_data["steps"] = {}
+
+
+def save_resource_data(result_dir: str, chip_name: str) -> str:
+    """
+    Save the resource usage data to a JSON file.
+
+    Args:
+        result_dir (str): Directory to save the JSON file.
+        chip_name (str): Name of the chip.
+
+    Returns:
+        str: Path to the saved JSON file.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_file = os.path.join(result_dir, f"evaluation/{chip_name}_resource_usage_{timestamp}.json")
+    os.makedirs(os.path.dirname(json_file), exist_ok=True)
+    with _resource_data_lock:
+        return dump_json(json_file=json_file, data=resource_data)
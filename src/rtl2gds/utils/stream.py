@@ -0,0 +1,138 @@
+"""
+Streaming capture of tool output
+
+The stdout and stderr of a tool are read concurrently, line by line, and
+- appended to the step's log file (`<result_dir>/log/<step>.log`),
+- echoed to the console, as when the tool inherited it,
+- kept in a bounded ring buffer, the tail shown when the tool fails,
+- fed to the progress parsers of `utils.progress`.
+
+Memory stays bounded whatever the tool prints: lines are cut at `MAX_LINE_BYTES`
+and only the last `TAIL_LINES` lines are kept.
+"""
+
+import collections
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from . import progress
+
+TAIL_LINES = 200
+MAX_LINE_BYTES = 64 * 1024
+
+# lines of parallel steps are interleaved, never mixed within a line
+_console_lock = threading.Lock()
+
+
+def step_log_file(result_dir: str, name: str) -> str:
+    """Log file of a step, `name` tells apart the side branches running the same step"""
+    return os.path.join(result_dir, "log", f"{name}.log")
+
+
+class LineSink:
+    """
+    Where the lines of one step go.
+
+    Args:
+        step_name (str): Step the progress events are reported for.
+        log_file (str, optional): Appended to, a header marks each command.
+        parsers (list[LineParser], optional): Progress parsers, see `progress.parsers_for`.
+        echo (bool): Also write the lines to this process' stdout.
+        tail_lines (int): Lines kept for `tail`.
+    """
+
+    def __init__(
+        self,
+        step_name: str,
+        log_file: str | None = None,
+        parsers: list[progress.LineParser] | None = None,
+        echo: bool = True,
+        tail_lines: int = TAIL_LINES,
+    ):
+        self.step_name = step_name
+        self.log_file = log_file
+        self.parsers = list(parsers or [])
+        self.echo = echo
+        self._tail = collections.deque(maxlen=tail_lines)
+        self._lock = threading.Lock()
+        self._log = None
+        self._start_time = time.perf_counter()
+        self._last_output = self._start_time
+
+    def last_output(self) -> float:
+        """`time.perf_counter()` of the last line, or of `open` if there was none yet"""
+        return self._last_output
+
+    def open(self, cmd: list | None = None) -> "LineSink":
+        """Open the log file and report the start of the step"""
+        if self.log_file:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_file)), exist_ok=True)
+            self._log = open(self.log_file, "a", encoding="utf-8")
+            self._log.write(f"# {datetime.now().isoformat()} {cmd or ''}\n")
+        self._start_time = self._last_output = time.perf_counter()
+        progress.emit(progress.ProgressEvent(self.step_name, progress.START, {"cmd": cmd}))
+        return self
+
+    def feed(self, line: str) -> None:
+        """Handle one line of output, with or without its newline"""
+        if not line.endswith("\n"):
+            line += "\n"
+        self._last_output = time.perf_counter()
+        with self._lock:
+            self._tail.append(line)
+            if self._log:
+                self._log.write(line)
+            events = [parser.parse(self.step_name, line.rstrip("\n")) for parser in self.parsers]
+        if self.echo:
+            with _console_lock:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+        for event in events:
+            if event is None:
+                continue
+            if event.fraction:
+                elapsed = time.perf_counter() - self._start_time
+                event.eta_seconds = elapsed * (1.0 - event.fraction) / event.fraction
+            progress.emit(event)
+
+    def tail(self) -> str:
+        """The last lines of output"""
+        with self._lock:
+            return "".join(self._tail)
+
+    def close(self, returncode: int | None = None) -> None:
+        """Close the log file and report the end of the step"""
+        with self._lock:
+            if self._log:
+                self._log.close()
+                self._log = None
+        progress.emit(
+            progress.ProgressEvent(self.step_name, progress.END, {"returncode": returncode})
+        )
+
+
+class StreamCapture:
+    """Read the stdout and stderr pipes of a started process into a `LineSink`"""
+
+    def __init__(self, process: subprocess.Popen, sink: LineSink):
+        self.sink = sink
+        pipes = [pipe for pipe in (process.stdout, process.stderr) if pipe is not None]
+        self._threads = [
+            threading.Thread(target=self._pump, args=(pipe,), daemon=True) for pipe in pipes
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _pump(self, pipe) -> None:
+        with pipe:
+            for raw in iter(lambda: pipe.readline(MAX_LINE_BYTES), b""):
+                self.sink.feed(raw.decode("utf-8", errors="replace"))
+
+    def join(self) -> None:
+        """Wait until both pipes are drained, i.e. the process and its children closed them"""
+        for thread in self._threads:
+            thread.join()
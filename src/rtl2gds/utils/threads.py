@@ -0,0 +1,82 @@
+"""
+Thread budget of the tool steps
+
+The cores a flow may use are those of its cgroup and CPU affinity, not the
+host's: in a container limited to 8 CPUs `os.cpu_count()` still reports the
+whole machine. `ThreadBudget` splits them per step, sweeps divide them between
+the flows running at the same time.
+"""
+
+import os
+from dataclasses import asdict, dataclass, field
+
+
+def _cgroup_cpu_limit() -> float | None:
+    """CPU quota of this process' cgroup (v2 or v1), None if unlimited or unknown"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r", encoding="utf-8") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r", encoding="utf-8") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Cores this process may use: affinity mask, bounded by the cgroup quota, at least 1"""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, int(limit))
+    return max(1, cpus)
+
+
+@dataclass
+class ThreadBudget:
+    """
+    Threads each step may use.
+
+    Attributes:
+        default (int): Threads of the steps without an entry in `steps`.
+        steps (dict): Per-step thread counts, e.g. `{"routing": 32}`.
+    """
+
+    default: int = field(default_factory=available_cpus)
+    steps: dict[str, int] = field(default_factory=dict)
+
+    def for_step(self, step_name: str) -> int:
+        return max(1, int(self.steps.get(step_name, self.default)))
+
+    def to_config(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_config(cls, config: dict | int | None) -> "ThreadBudget":
+        """
+        Budget stored in a chip config value: a dict like `to_config`, a plain thread
+        count, or None for all the available cores.
+        """
+        if not config:
+            return cls()
+        if isinstance(config, int):
+            return cls(default=config)
+        return cls(**{key: value for key, value in config.items() if key in ("default", "steps")})
+
+
+def thread_env(num_threads: int) -> dict[str, str]:
+    """Environment variables telling a tool how many threads to use"""
+    return {"NUM_THREADS": str(num_threads), "OMP_NUM_THREADS": str(num_threads)}
@@ -4,70 +4,14 @@ import os
 from datetime import datetime
 from typing import Callable
 
+from . import compression
 from .json_helper import dump_json, load_json
-
-# Save all step timing data in a global dictionary
-time_data = {
-    "steps": {},
-    "summary": {"total_time": 0, "start_time": "", "end_time": ""},
-}
-
-
-def start_step_timer(step_name: str):
-    """
-    Start a timer for a specific step and return the start time and datetime.
-    Args:
-        step_name (str): Name of the step to start timing for.
-    Returns:
-        tuple: A tuple containing the start datetime, start time, and step name.
-    Raises:
-        ValueError: If step_name is not provided.
-    """
-    import time
-
-    if step_name is None or step_name == "":
-        raise ValueError("step_name must be provided and cannot be empty")
-
-    start_time = time.perf_counter()
-    start_datetime = datetime.now().isoformat()
-
-    return start_datetime, start_time, step_name
-
-
-def end_step_timer(start_datetime: str, start_time: float, step_name: str):
-    """
-    End the timer for a specific step and record the elapsed time.
-    Args:
-        start_datetime (str): Start datetime of the step.
-        start_time (float): Start time in seconds.
-        step_name (str): Name of the step to end timing for.
-    Raises:
-        ValueError: If step_name is not provided.
-    """
-    import time
-
-    end_time = time.perf_counter()
-    end_datetime = datetime.now().isoformat()
-    elapsed = end_time - start_time
-
-    # Record the timing data
-    time_data["steps"][step_name] = {
-        "start_time": start_datetime,
-        "end_time": end_datetime,
-        "elapsed_seconds": elapsed,
-    }
-
-    # If it's the first step, record the total start time
-    if not time_data["summary"]["start_time"]:
-        time_data["summary"]["start_time"] = start_datetime
-    # Update the total time
-    time_data["summary"]["end_time"] = end_datetime
-    time_data["summary"]["total_time"] += elapsed
+from .trace import tracer
 
 
 def save_execute_time_data(result_dir: str, chip_name: str) -> str:
     """
-    Save the execution time data to a JSON file.
+    Save the execution time of the steps traced so far (see `trace.STEP` spans) to a JSON file.
     Args:
         result_dir (str): Directory to save the JSON file.
         chip_name (str): Name of the chip.
@@ -77,20 +21,22 @@ def save_execute_time_data(result_dir: str, chip_name: str) -> str:
     os.makedirs(result_dir, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     json_file = os.path.join(result_dir, f"evaluation/{chip_name}_execution_time_{timestamp}.json")
-    dump_json(json_file=json_file, data=time_data)
+    os.makedirs(os.path.dirname(json_file), exist_ok=True)
+    dump_json(json_file=json_file, data=tracer.step_times())
     return json_file
 
 
 from rtl2gds.chip import Chip
 
 
-def save_merged_metrics(chip: Chip, execute_time_json: str):
+def save_merged_metrics(chip: Chip, execute_time_json: str, resource_json: str | None = None):
     """
     Merge and save the metrics from different steps into a single JSON file.
 
     Args:
         chip: Chip object containing the design and metrics information.
         execute_time_json: Path to the JSON file containing execution time data.
+        resource_json: Path to the JSON file containing per-step resource usage, optional.
 
     Returns:
         str: Saved path of the merged metrics JSON file.
@@ -140,6 +86,17 @@ def save_merged_metrics(chip: Chip, execute_time_json: str):
         if step_name in timing_data:
             merged_data["steps"][step_name]["timing"] = timing_data.get(step_name, {})
 
+    # Merge resource usage, some steps (GDS dump, iEDA session) are not timed
+    if resource_json:
+        logging.info(f"Merge metrics {resource_json}")
+        resource_data = load_json(resource_json)
+        for step_name, step_resources in resource_data.get("steps", {}).items():
+            merged_data["steps"].setdefault(step_name, {})["resources"] = step_resources
+
+    # size and time of the compressed intermediates, see `utils.compression`
+    for step_name, step_compression in compression.compression_data["steps"].items():
+        merged_data["steps"].setdefault(step_name, {})["compression"] = step_compression
+
     dump_json(merged_report_path, merged_data)
 
     logging.info(f"Merged metrics saved to: {merged_report_path}")
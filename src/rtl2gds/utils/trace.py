@@ -0,0 +1,236 @@
+"""
+Nested tracing spans with Chrome trace-event export
+
+Spans nest flow -> step -> subprocess -> post-processing. Each span records the
+process and thread it ran in, so spans from scheduler threads and sweep worker
+processes end up on their own tracks. The exported JSON opens in Perfetto
+(https://ui.perfetto.dev) or chrome://tracing.
+
+Usage:
+    with trace.span("placement", trace.STEP, tool="iEDA-iPL") as s:
+        ...
+        s.args["num_instances"] = 1234
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .json_helper import dump_json, load_json
+
+# span categories
+FLOW = "flow"
+NODE = "node"
+STEP = "step"
+SUBPROCESS = "subprocess"
+POST = "post"
+
+
+@dataclass
+class Span:
+    """A timed, possibly nested, piece of work"""
+
+    name: str
+    category: str
+    args: dict = field(default_factory=dict)
+    parent: "Span | None" = None
+    pid: int = 0
+    tid: int = 0
+    thread_name: str = ""
+    # wall clock start for cross-process alignment, perf counter for the duration
+    start_wall_ns: int = 0
+    start_ns: int = 0
+    end_ns: int = 0
+    start_datetime: str = ""
+    end_datetime: str = ""
+    _token: contextvars.Token | None = field(default=None, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        """Elapsed seconds, 0 while the span is open"""
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns else 0.0
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "rtl2gds_current_span", default=None
+)
+
+
+class Tracer:
+    """
+    Collects the finished spans of this process.
+
+    Thread-safe. Threads started with a copy of the caller's context
+    (`contextvars.copy_context().run`) keep the caller's span as parent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+
+    def reset(self) -> None:
+        """Forget the spans recorded so far, for a process that runs several flows"""
+        with self._lock:
+            self.spans = []
+
+    def begin(self, name: str, category: str, **args) -> Span:
+        """Open a span, the current span of this context becomes its parent"""
+        thread = threading.current_thread()
+        span = Span(
+            name=name,
+            category=category,
+            args=args,
+            parent=_current_span.get(),
+            pid=os.getpid(),
+            tid=threading.get_native_id(),
+            thread_name=thread.name,
+            start_wall_ns=time.time_ns(),
+            start_ns=time.perf_counter_ns(),
+            start_datetime=datetime.now().isoformat(),
+        )
+        span._token = _current_span.set(span)
+        return span
+
+    def end(self, span: Span) -> Span:
+        """Close a span opened by `begin` in the same context"""
+        span.end_ns = time.perf_counter_ns()
+        span.end_datetime = datetime.now().isoformat()
+        _current_span.reset(span._token)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, category: str = POST, **args):
+        """Context manager around `begin`/`end`, an exception is recorded in the span args"""
+        span = self.begin(name, category, **args)
+        try:
+            yield span
+        except BaseException as e:
+            span.args["error"] = repr(e)
+            raise
+        finally:
+            self.end(span)
+
+    def step_times(self) -> dict:
+        """
+        Execution time report of the `STEP` spans.
+
+        Returns:
+            dict: `{"steps": {name: {start_time, end_time, elapsed_seconds}}, "summary": {...}}`.
+            A step that ran more than once gets its later runs as `<name>#2`, `<name>#3`...
+        """
+        with self._lock:
+            steps = sorted(
+                (span for span in self.spans if span.category == STEP),
+                key=lambda span: span.start_ns,
+            )
+        report = {"steps": {}, "summary": {"total_time": 0, "start_time": "", "end_time": ""}}
+        for span in steps:
+            name = span.name
+            run = 1
+            while name in report["steps"]:
+                run += 1
+                name = f"{span.name}#{run}"
+            report["steps"][name] = {
+                "start_time": span.start_datetime,
+                "end_time": span.end_datetime,
+                "elapsed_seconds": span.elapsed,
+            }
+            report["summary"]["total_time"] += span.elapsed
+        if steps:
+            report["summary"]["start_time"] = steps[0].start_datetime
+            report["summary"]["end_time"] = max(steps, key=lambda span: span.end_ns).end_datetime
+        return report
+
+    def to_chrome_trace(self) -> dict:
+        """Spans as Chrome trace-event complete ("X") events, with thread name metadata"""
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        threads = {}
+        for span in spans:
+            args = {key: _jsonable(value) for key, value in span.args.items()}
+            if span.parent is not None:
+                args["parent"] = span.parent.name
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start_wall_ns / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": span.pid,
+                    "tid": span.tid,
+                    "args": args,
+                }
+            )
+            threads[(span.pid, span.tid)] = span.thread_name
+        for (pid, tid), thread_name in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, json_file: str) -> str:
+        """Save `to_chrome_trace` to a JSON file and return its path"""
+        os.makedirs(os.path.dirname(os.path.abspath(json_file)), exist_ok=True)
+        return dump_json(json_file=json_file, data=self.to_chrome_trace())
+
+
+def annotate(**args) -> None:
+    """Add args to the innermost open span of this context, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.args.update(args)
+
+
+def _jsonable(value: object) -> object:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return str(value)
+
+
+def merge_chrome_traces(trace_files: list[str], json_file: str, labels: list[str] | None = None):
+    """
+    Merge the Chrome traces of several processes (e.g. sweep points) into one file.
+
+    Args:
+        trace_files (list[str]): Traces saved by `Tracer.save_chrome_trace`.
+        json_file (str): Merged trace.
+        labels (list[str], optional): Process name shown for each trace, the file names
+            by default.
+
+    Returns:
+        str: Path to the merged trace.
+    """
+    events = []
+    for index, trace_file in enumerate(trace_files):
+        # pool workers run several traces in one process, give each trace its own track
+        pid = index + 1
+        for event in load_json(trace_file)["traceEvents"]:
+            event["pid"] = pid
+            events.append(event)
+        label = labels[index] if labels else os.path.basename(trace_file)
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}})
+    os.makedirs(os.path.dirname(os.path.abspath(json_file)), exist_ok=True)
+    return dump_json(json_file=json_file, data={"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+# process-wide tracer
+tracer = Tracer()
+span = tracer.span
@@ -0,0 +1,191 @@
+"""
+Watchdog for the tool subprocesses
+
+A stuck tool (e.g. a routing run that neither finishes nor prints anything)
+would hold its worker forever. A `WatchdogPolicy` bounds each step by
+- a wall-clock timeout, per step or by default,
+- stall detection: no output and no CPU time gained for `stall_seconds`.
+The tool's process group is then sent SIGTERM and, after `term_grace_seconds`,
+SIGKILL, and `rusage.call` raises `WatchdogError`. `StepWrapper` retries such
+steps up to `retries` times.
+
+The policy is stored under `Keyword.WATCHDOG` in the chip config, so every
+checkpoint YAML records the policy its run was made with. The step wrapper makes
+it the active policy of the step (`policy_scope`), `rusage.call` picks it up.
+"""
+
+import contextvars
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+# seconds between two checks of a watched process
+POLL_SECONDS = 5.0
+
+
+@dataclass
+class WatchdogPolicy:
+    """
+    Limits of the steps of a flow, 0 disables a limit.
+
+    Attributes:
+        timeout_seconds (float): Wall-clock limit of a tool run.
+        step_timeout_seconds (dict): Per-step overrides of `timeout_seconds`.
+        stall_seconds (float): Stop a tool silent and idle for this long.
+        term_grace_seconds (float): Time between SIGTERM and SIGKILL.
+        retries (int): Extra attempts of a step stopped by the watchdog.
+    """
+
+    timeout_seconds: float = 0
+    step_timeout_seconds: dict[str, float] = field(default_factory=dict)
+    stall_seconds: float = 0
+    term_grace_seconds: float = 30
+    retries: int = 0
+
+    def timeout_for(self, step_name: str) -> float:
+        return self.step_timeout_seconds.get(step_name, self.timeout_seconds)
+
+    def to_config(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_config(cls, config: dict | None) -> "WatchdogPolicy | None":
+        """Policy stored in a chip config value, None if there is none"""
+        if not config:
+            return None
+        known = {key: value for key, value in config.items() if key in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+class WatchdogError(subprocess.SubprocessError):
+    """A tool run was stopped by the watchdog"""
+
+    def __init__(self, step_name: str, reason: str, cmd: list):
+        super().__init__(step_name, reason, cmd)
+        self.step_name = step_name
+        self.reason = reason
+        self.cmd = cmd
+
+    def __str__(self) -> str:
+        return f"{self.step_name} stopped by the watchdog: {self.reason}"
+
+
+_active_policy: contextvars.ContextVar[WatchdogPolicy | None] = contextvars.ContextVar(
+    "rtl2gds_watchdog_policy", default=None
+)
+
+
+@contextmanager
+def policy_scope(policy: WatchdogPolicy | None):
+    """Make `policy` the one applied to the tool runs of this context"""
+    token = _active_policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _active_policy.reset(token)
+
+
+def active_policy() -> WatchdogPolicy | None:
+    return _active_policy.get()
+
+
+def _cpu_seconds(pid: int) -> float | None:
+    """utime + stime of a process and its reaped children, None if it exited"""
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as f:
+            # the command name may contain spaces, the fields after it do not
+            fields = f.read().rsplit(")", 1)[1].split()
+        if fields[0] in ("Z", "X"):
+            return None
+        return sum(int(value) for value in fields[11:15]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class Watchdog:
+    """
+    Watch one process, started with `start_new_session=True` so that its whole
+    process group can be signalled.
+
+    Args:
+        last_output (callable, optional): `time.perf_counter()` of the last output
+            line, stall detection only looks at CPU time without it.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        step_name: str,
+        policy: WatchdogPolicy,
+        last_output=None,
+        poll_seconds: float | None = None,
+    ):
+        self.process = process
+        self.step_name = step_name
+        self.policy = policy
+        self.last_output = last_output
+        self.poll_seconds = poll_seconds or POLL_SECONDS
+        self.reason: str | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self) -> "Watchdog":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching, once the process was reaped"""
+        self._stop.set()
+        self._thread.join()
+
+    def _watch(self) -> None:
+        start = time.perf_counter()
+        timeout = self.policy.timeout_for(self.step_name)
+        last_cpu = _cpu_seconds(self.process.pid)
+        last_activity = start
+        while not self._stop.wait(self.poll_seconds):
+            now = time.perf_counter()
+            cpu = _cpu_seconds(self.process.pid)
+            if cpu is None:
+                # exited, waiting to be reaped
+                return
+            if cpu != last_cpu:
+                last_cpu = cpu
+                last_activity = now
+            if self.last_output is not None:
+                last_activity = max(last_activity, self.last_output())
+
+            if timeout and now - start > timeout:
+                self._terminate(f"timeout after {timeout:g} seconds")
+                return
+            if self.policy.stall_seconds and now - last_activity > self.policy.stall_seconds:
+                self._terminate(
+                    f"no output and no CPU progress for {self.policy.stall_seconds:g} seconds"
+                )
+                return
+
+    def _signal(self, sig: int) -> None:
+        try:
+            os.killpg(self.process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _terminate(self, reason: str) -> None:
+        """SIGTERM the process group, SIGKILL it if it is still there after the grace time"""
+        self.reason = reason
+        logging.warning("(watchdog) %s: %s, terminating", self.step_name, reason)
+        self._signal(signal.SIGTERM)
+        deadline = time.perf_counter() + self.policy.term_grace_seconds
+        while time.perf_counter() < deadline:
+            if (
+                self._stop.wait(min(self.poll_seconds, 1.0))
+                or _cpu_seconds(self.process.pid) is None
+            ):
+                return
+        logging.warning("(watchdog) %s: still running, killing", self.step_name)
+        self._signal(signal.SIGKILL)
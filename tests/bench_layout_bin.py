@@ -0,0 +1,123 @@
+"""
+Benchmark of the binary layout export (`step.layout_bin`) against the layout JSON chunks
+
+usage: python tests/bench_layout_bin.py [--shapes N]
+
+Compares the size of both exports, raw and gzipped (as served over HTTP), and the
+time to parse them: `orjson.loads` of every chunk, against mapping every column
+of the binary export (what a viewer does with typed arrays) and, for reference,
+decoding them all to Python lists. The items of both are checked to be identical.
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+import time
+
+import orjson
+from bench_layout_json import write_layout
+
+from rtl2gds.step import layout_bin, layout_json
+
+
+def _sizes(files: list[str]) -> tuple[float, float]:
+    raw = packed = 0
+    for name in files:
+        with open(name, "rb") as f:
+            data = f.read()
+        raw += len(data)
+        packed += len(gzip.compress(data, compresslevel=6))
+    return raw / 1e6, packed / 1e6
+
+
+def _timed(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _parse_json(files: list[str]) -> list[dict]:
+    items = []
+    for name in files:
+        with open(name, "rb") as f:
+            items.extend(orjson.loads(f.read())["data"])
+    return items
+
+
+def _map_bin(manifest: str) -> int:
+    """Views of every array of the export, the number of values mapped"""
+    count = 0
+    with layout_bin.Reader(manifest) as reader:
+        for part in reader.parts:
+            for column in part.columns.values():
+                for name in ("present", "offsets", "values"):
+                    if name in column:
+                        view = part.array(column[name])
+                        count += len(view)
+                        view.release()
+    return count
+
+
+def _decode_bin(manifest: str) -> int:
+    count = 0
+    with layout_bin.Reader(manifest) as reader:
+        for part in reader.parts:
+            for key in part.columns:
+                count += len(part.column(key))
+    return count
+
+
+def _write_bin(file_no_suffix: str, items: list[dict]) -> list[str]:
+    writer = layout_bin.Writer(file_no_suffix)
+    for item in items:
+        writer.add(item)
+    return writer.close({})
+
+
+def _read_bin(manifest: str) -> list[dict]:
+    with layout_bin.Reader(manifest) as reader:
+        return list(reader)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument("--shapes", type=int, default=300_000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        layout_file = f"{tmp}/layout.json"
+        write_layout(layout_file, args.shapes)
+        print(f"layout: {args.shapes} shapes, {os.path.getsize(layout_file) / 1e6:.1f} MB")
+
+        json_seconds, files = _timed(lambda: layout_json._split_layout_json(layout_file), 1)
+        both_seconds, files = _timed(
+            lambda: layout_json._split_layout_json(layout_file, binary=True), 1
+        )
+        manifest = next(name for name in files if name.endswith("-manifest.json"))
+        json_files = files[1 : files.index(manifest)]
+        bin_files = files[files.index(manifest) :]
+        print(f"export:   json {json_seconds:.2f} s, json + binary {both_seconds:.2f} s")
+
+        json_raw, json_gz = _sizes(json_files)
+        bin_raw, bin_gz = _sizes(bin_files)
+        print(f"json:     {json_raw:.1f} MB, gzip {json_gz:.1f} MB ({len(json_files)} chunks)")
+        print(f"binary:   {bin_raw:.1f} MB, gzip {bin_gz:.1f} MB ({len(bin_files) - 1} parts)")
+        print(f"size:     {json_raw / bin_raw:.1f}x smaller, gzip {json_gz / bin_gz:.1f}x smaller")
+
+        parse_seconds, json_items = _timed(lambda: _parse_json(json_files), args.repeat)
+        map_seconds, _ = _timed(lambda: _map_bin(manifest), args.repeat)
+        decode_seconds, _ = _timed(lambda: _decode_bin(manifest), args.repeat)
+        print(f"parse:    json {parse_seconds * 1e3:.1f} ms, binary map {map_seconds * 1e3:.1f} ms")
+        print(f"          binary decode to lists {decode_seconds * 1e3:.1f} ms")
+        write_seconds, _ = _timed(lambda: _write_bin(f"{tmp}/again", json_items), args.repeat)
+        print(f"write:    binary alone, from parsed items {write_seconds:.2f} s")
+        assert _read_bin(manifest) == json_items, "binary items differ from the json chunks"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark of `layout_json._split_layout_json` on large synthetic layout JSON files
+
+usage: python tests/bench_layout_json.py [--shapes N] [--baseline FILE]
+
+Every splitter runs in its own process to measure its peak RSS. `--baseline`
+takes another layout_json.py (e.g. `git show <rev>:src/rtl2gds/step/layout_json.py`)
+to compare with, the files written by both are checked to be identical.
+"""
+
+import argparse
+import filecmp
+import importlib.util
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def write_layout(path: str, num_shapes: int, seed: int = 0) -> None:
+    """
+    An iEDA style layout JSON of `num_shapes` instances and wires, with trailing commas.
+
+    Instances sit on rows of sites, wires are short Manhattan paths like routed nets.
+    """
+    rng = random.Random(seed)
+    layers = [f"Metal{i}" for i in range(1, 6)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n  "path": "/tmp/bench.def",\n  "unit": 2000,\n  "data": [\n')
+        for i in range(num_shapes):
+            if i % 3 == 0:
+                x, y = rng.randrange(0, 2000) * 480, rng.randrange(0, 250) * 3780
+                f.write(
+                    f'    {{"type": "instance", "name": "u_cell_{i}", "master": '
+                    f'"sg13g2_inv_{rng.choice([1, 2, 4])}", "layer": "Metal1", '
+                    f'"xy": [[{x}, {y}], [{x + 480 * rng.randint(2, 12)}, {y + 3780}],],}},\n'
+                )
+            else:
+                x, y = rng.randrange(0, 10**6, 5), rng.randrange(0, 10**6, 5)
+                points = [f"[{x}, {y}]"]
+                for segment in range(rng.randint(1, 5)):
+                    step = rng.randrange(-20000, 20000, 5)
+                    if segment % 2:
+                        y += step
+                    else:
+                        x += step
+                    points.append(f"[{x}, {y}]")
+                f.write(
+                    f'    {{"type": "wire", "net": "n_{i // 7}", "layer": "{rng.choice(layers)}", '
+                    f'"width": {rng.choice([160, 200, 400])}, "path": [{", ".join(points)},],}},\n'
+                )
+        f.write('  ],\n  "top": {"name": "bench", "bbox": [0, 0, 1000000, 1000000,],},\n}\n')
+
+
+def _load(path: str):
+    spec = importlib.util.spec_from_file_location("bench_layout_json_module", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _child(module_path: str, layout_file: str, max_file_size: int) -> None:
+    module = _load(module_path)
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    files = module._split_layout_json(layout_file, max_file_size)
+    seconds = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "seconds": seconds,
+                "peak_kb": peak_rss,
+                "added_kb": peak_rss - start_rss,
+                "files": files,
+            }
+        )
+    )
+
+
+def _run(module_path: str, layout_file: str, max_file_size: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", module_path, layout_file, str(max_file_size)],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def _report(name: str, result: dict, size_mb: float) -> None:
+    print(
+        f"{name:<9} {result['seconds']:.3f} s, {size_mb / result['seconds']:.1f} MB/s, "
+        f"peak RSS {result['peak_kb'] / 1024:.0f} MB (+{result['added_kb'] / 1024:.0f} MB), "
+        f"{len(result['files'])} files"
+    )
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        return _child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument("--shapes", type=int, default=1_000_000)
+    arg_parser.add_argument("--max_file_size", type=int, default=19 * 1024 * 1024)
+    arg_parser.add_argument("--baseline", type=str, default=None)
+    args = arg_parser.parse_args()
+
+    from rtl2gds.step import layout_json
+
+    with tempfile.TemporaryDirectory() as tmp:
+        layout_file = f"{tmp}/new/layout.json"
+        os.makedirs(os.path.dirname(layout_file))
+        write_layout(layout_file, args.shapes)
+        size_mb = os.path.getsize(layout_file) / 1e6
+        print(f"layout: {args.shapes} shapes, {size_mb:.1f} MB")
+
+        result = _run(layout_json.__file__, layout_file, args.max_file_size)
+        _report("splitter", result, size_mb)
+
+        if args.baseline:
+            base_file = f"{tmp}/baseline/layout.json"
+            os.makedirs(os.path.dirname(base_file))
+            os.link(layout_file, base_file)
+            base_result = _run(args.baseline, base_file, args.max_file_size)
+            _report("baseline", base_result, size_mb)
+            print(f"speedup:  {base_result['seconds'] / result['seconds']:.2f}x")
+            names = [os.path.basename(name) for name in result["files"]]
+            assert names == [os.path.basename(name) for name in base_result["files"]]
+            _, mismatch, errors = filecmp.cmpfiles(f"{tmp}/new", f"{tmp}/baseline", names, False)
+            assert not mismatch and not errors, f"files differ from the baseline: {mismatch}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark of `SynthStatParser` on large synthetic yosys stat reports
+
+usage: python tests/bench_synth_stat.py [--modules N] [--cells N] [--baseline FILE]
+
+`--baseline` takes another synth_util.py (e.g. `git show <rev>:src/rtl2gds/step/synth_util.py`)
+to compare with, the results of both parsers are checked to be identical.
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import tempfile
+import time
+
+from rtl2gds.step import synth_util
+
+
+def write_report(path: str, num_modules: int, num_cell_types: int, seed: int = 0) -> None:
+    """A yosys `stat` report of `num_modules` modules over `num_cell_types` cell types"""
+    rng = random.Random(seed)
+    cell_types = [f"sg13g2_cell{i}_{rng.choice([1, 2, 4])}" for i in range(num_cell_types)]
+    modules = [f"$paramod\\block{i}\\WIDTH=s32'{i:032b}" for i in range(num_modules)]
+    with open(path, "w", encoding="utf-8") as f:
+
+        def write_stats(cells: dict, area_line: str) -> None:
+            f.write(f"   Number of wires:              {rng.randint(10, 9999):>6}\n")
+            f.write(f"   Number of wire bits:          {rng.randint(10, 9999):>6}\n")
+            f.write(f"   Number of public wires:       {rng.randint(1, 99):>6}\n")
+            f.write(f"   Number of public wire bits:   {rng.randint(1, 999):>6}\n")
+            f.write("   Number of memories:                0\n")
+            f.write("   Number of memory bits:             0\n")
+            f.write("   Number of processes:               0\n")
+            f.write(f"   Number of cells:              {sum(cells.values()):>6}\n")
+            for cell, count in cells.items():
+                f.write(f"     {cell:<30} {count:>6}\n")
+            f.write("\n")
+            f.write(f"   {area_line}: {rng.uniform(100, 1e5):.6f}\n")
+            f.write(
+                "     of which used for sequential elements: "
+                f"{rng.uniform(0, 100):.6f} ({rng.uniform(0, 50):.2f}%)\n\n"
+            )
+
+        total = {}
+        for module in modules:
+            f.write(f"=== {module} ===\n\n")
+            cells = {
+                cell: rng.randint(1, 500) for cell in rng.sample(cell_types, k=num_cell_types // 2)
+            }
+            for cell, count in cells.items():
+                total[cell] = total.get(cell, 0) + count
+            write_stats(cells, f"Chip area for module '\\{module}'")
+
+        f.write("=== design hierarchy ===\n\n")
+        f.write("   top      1\n")
+        for module in modules:
+            f.write(f"     {module}      {rng.randint(1, 8)}\n")
+        f.write("\n")
+        write_stats(total, "Chip area for top module '\\top'")
+
+
+def _load(path: str):
+    spec = importlib.util.spec_from_file_location("baseline_synth_util", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _result(parser) -> tuple:
+    return (parser.module_stats, parser.hierarchy_to_dict(), parser.total_stats)
+
+
+def _time(parser_class, path: str, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser = parser_class(path)
+        best = min(best, time.perf_counter() - start)
+    return best, parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    arg_parser.add_argument("--modules", type=int, default=2000)
+    arg_parser.add_argument("--cells", type=int, default=200)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--baseline", type=str, default=None)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/synth_stat.txt"
+        write_report(path, args.modules, args.cells)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"report: {args.modules} modules, {args.cells} cell types, {size_mb:.1f} MB")
+
+        seconds, parser = _time(synth_util.SynthStatParser, path, args.repeat)
+        print(f"SynthStatParser: {seconds:.3f} s, {size_mb / seconds:.1f} MB/s")
+
+        if args.baseline:
+            base_seconds, base_parser = _time(
+                _load(args.baseline).SynthStatParser, path, args.repeat
+            )
+            print(f"baseline:        {base_seconds:.3f} s, {size_mb / base_seconds:.1f} MB/s")
+            print(f"speedup:         {base_seconds / seconds:.2f}x")
+            assert _result(base_parser) == _result(parser), "results differ from the baseline"
+
+
+if __name__ == "__main__":
+    main()
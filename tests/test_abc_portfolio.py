@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+
+from rtl2gds.step import abc_portfolio
+from rtl2gds.step.abc_portfolio import Candidate
+
+STIME = (
+    'WireLoad = "none"  Gates =    812 ( 11.2 %)   Cap =  2.1 ff (  4.0 %)   '
+    "Area =   9342.21 ( 91.3 %)   Delay =  {delay} ps  ( 14.1 %)\n"
+)
+
+
+class TestAbcPortfolio(unittest.TestCase):
+    def test_parse_delay(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".log") as f:
+            f.write(STIME.format(delay="2410.50") + "resizing cells...\n")
+            f.write(STIME.format(delay="1987.25"))
+            f.flush()
+            self.assertEqual(abc_portfolio.parse_delay(f.name), 1987.25)
+
+    def test_select(self):
+        candidates = [
+            Candidate("balanced", "", ret_code=0, area=1000.0, delay_ps=4000.0),
+            Candidate("area", "", ret_code=0, area=800.0, delay_ps=6000.0),
+            Candidate("delay", "", ret_code=0, area=1200.0, delay_ps=3000.0),
+            Candidate("broken", "", ret_code=1),
+        ]
+        self.assertEqual(abc_portfolio.select(candidates, "area", "100").recipe, "area")
+        # 100 MHz: every candidate meets 10 ns, the smallest wins
+        self.assertEqual(abc_portfolio.select(candidates, "delay", "100").recipe, "area")
+        # 200 MHz: 5 ns met by two of them
+        self.assertEqual(abc_portfolio.select(candidates, "delay", "200").recipe, "balanced")
+        # 500 MHz: met by none, the fastest wins
+        self.assertEqual(abc_portfolio.select(candidates, "delay", "500").recipe, "delay")
+
+        with self.assertRaises(ValueError):
+            abc_portfolio.select(candidates[3:], "area", "100")
+
+    def test_config(self):
+        portfolio = abc_portfolio.AbcPortfolio(recipes=["area", "delay"], objective="delay")
+        self.assertEqual(abc_portfolio.AbcPortfolio.from_config(portfolio.to_config()), portfolio)
+        self.assertEqual(abc_portfolio.AbcPortfolio.from_config(["area"]).recipes, ["area"])
+        self.assertIsNone(abc_portfolio.AbcPortfolio.from_config(None))
+        with self.assertRaises(ValueError):
+            abc_portfolio.AbcPortfolio(recipes=["fastest"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from rtl2gds import Chip, StepName
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow import checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        result_dir = f"{self.tmp.name}/gcd_results"
+        self.chip = Chip(
+            config_dict={
+                "top_name": "gcd",
+                "rtl_file": f"{self.tmp.name}/gcd.v",
+                "netlist_file": f"{result_dir}/gcd_netlist.v",
+                "result_dir": result_dir,
+                "clk_port_name": "clk",
+                "clk_freq_mhz": 200,
+                "core_util": 0.5,
+            }
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _finish_synthesis(self) -> str:
+        with open(self.chip.path_setting.netlist_file, "w", encoding="utf-8") as f:
+            f.write("module gcd(); endmodule\n")
+        self.chip.finished_step = StepName.SYNTHESIS
+        self.chip.expected_step = StepName.FLOORPLAN
+        self.chip.update2config()
+        return str(self.chip.dump_config_yaml())
+
+    def test_resume_from_latest_checkpoint(self):
+        checkpoint_yaml = self._finish_synthesis()
+        self.assertEqual(
+            str(checkpoint.find_latest_checkpoint(self.chip.config_yaml)), checkpoint_yaml
+        )
+
+        resumed = Chip(config_yaml=self.chip.config_yaml)
+        self.assertEqual(resumed.finished_step, StepName.INIT)
+        self.assertEqual(str(checkpoint.resume(resumed)), checkpoint_yaml)
+        self.assertEqual(resumed.finished_step, StepName.SYNTHESIS)
+        self.assertEqual(resumed.expected_step, StepName.FLOORPLAN)
+        # later checkpoints are still named after the original config
+        self.assertEqual(resumed.config_yaml, self.chip.config_yaml)
+
+    def test_resume_keeps_run_options(self):
+        self.chip.config[Keyword.THREADS] = {"default": 64}
+        self._finish_synthesis()
+
+        resumed = Chip(config_yaml=self.chip.config_yaml)
+        # options of the resuming command line
+        resumed.config[Keyword.THREADS] = {"default": 8}
+        resumed.config[Keyword.WATCHDOG] = {"timeout_seconds": 600}
+        checkpoint.resume(resumed)
+        self.assertEqual(resumed.finished_step, StepName.SYNTHESIS)
+        self.assertEqual(resumed.config[Keyword.FINISHED_STEP], StepName.SYNTHESIS)
+        self.assertEqual(resumed.config[Keyword.THREADS], {"default": 8})
+        self.assertEqual(resumed.config[Keyword.WATCHDOG], {"timeout_seconds": 600})
+
+    def test_modified_artifact_invalidates_checkpoint(self):
+        self._finish_synthesis()
+        with open(self.chip.path_setting.netlist_file, "a", encoding="utf-8") as f:
+            f.write("// truncated by a crash\n")
+        self.assertIsNone(checkpoint.find_latest_checkpoint(self.chip.config_yaml))
+
+    def test_missing_artifact_invalidates_checkpoint(self):
+        self._finish_synthesis()
+        os.remove(self.chip.path_setting.netlist_file)
+        self.assertIsNone(checkpoint.find_latest_checkpoint(self.chip.config_yaml))
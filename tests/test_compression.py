@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from rtl2gds.utils import compression
+
+DEF_TEXT = "".join(f"- inst_{i} sg13g2_inv_1 + PLACED ( {i} 0 ) N ;\n" for i in range(5000))
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def _round_trip(self, codec: str):
+        final_def = f"{self.tmp}/gcd_place.def"
+        with compression.StagedOutputs({"def": final_def, "verilog": "unused.v"}, codec) as staged:
+            tool_def = staged.tool_path("def")
+            self.assertNotEqual(os.path.dirname(tool_def), self.tmp)
+            with open(tool_def, "w", encoding="utf-8") as f:
+                f.write(DEF_TEXT)
+            committed = staged.commit()
+
+        self.assertEqual(committed, {"def": final_def + compression.CODECS[codec]})
+        self.assertFalse(os.path.exists(final_def))
+        self.assertEqual(staged.stats.files, 1)
+        self.assertEqual(staged.stats.raw_bytes, len(DEF_TEXT))
+        self.assertGreater(staged.stats.ratio, 5)
+
+        with compression.plain_input(committed["def"]) as plain_def:
+            self.assertTrue(plain_def.endswith("gcd_place.def"))
+            with open(plain_def, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), DEF_TEXT)
+        self.assertFalse(os.path.exists(plain_def))
+        return committed["def"]
+
+    def test_gzip(self):
+        compressed = self._round_trip("gzip")
+        with open(compressed, "rb") as f:
+            first = f.read()
+        # no timestamp in the header, the cache keys stay stable
+        self._round_trip("gzip")
+        with open(compressed, "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    @unittest.skipIf(shutil.which("zstd") is None, "zstd not installed")
+    def test_zstd(self):
+        self._round_trip("zstd")
+
+    def test_plain_passthrough(self):
+        with compression.StagedOutputs({"def": f"{self.tmp}/a.def"}) as staged:
+            self.assertEqual(staged.tool_path("def"), f"{self.tmp}/a.def")
+            self.assertEqual(staged.commit(), {})
+        with compression.plain_input(f"{self.tmp}/a.def") as plain_def:
+            self.assertEqual(plain_def, f"{self.tmp}/a.def")
+
+    def test_record(self):
+        compression.reset_compression_data()
+        stats = compression.CompressionStats("gzip", 1, 100, 10, 0.5).to_metrics()
+        compression.record("place", stats)
+        compression.record("place", stats)
+        self.assertEqual(compression.compression_data["steps"]["place"]["raw_bytes"], 200)
+        self.assertEqual(compression.compression_data["steps"]["place"]["ratio"], 10.0)
+        compression.reset_compression_data()
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            compression.check_codec("lz4")
+
+
+if __name__ == "__main__":
+    unittest.main()
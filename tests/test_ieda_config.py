@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from rtl2gds.step import ieda_config
+
+
+def _load(config_dir: str, name: str) -> dict:
+    with open(f"{config_dir}/{name}", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestIEDAConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_threads_and_config_paths(self):
+        env = ieda_config.step_env(self.tmp.name, 3)
+        config_dir = env["IEDA_CONFIG_DIR"]
+        self.assertEqual(env["NUM_THREADS"], "3")
+        self.assertTrue(config_dir.startswith(f"{self.tmp.name}/config/"))
+        self.assertEqual(_load(config_dir, "pl_default_config.json")["PL"]["num_threads"], 3)
+        flow_config = _load(config_dir, "flow_config.json")
+        self.assertEqual(
+            flow_config["ConfigPath"]["ipl_path"], f"{config_dir}/pl_default_config.json"
+        )
+        self.assertFalse([name for name in os.listdir(config_dir) if name.endswith(".tmp")])
+
+    def test_overrides_are_hash_addressed(self):
+        overrides = {"pl_default_config.json": {"PL": {"is_timing_effort": 1}}}
+        plain = ieda_config.render_config_dir(self.tmp.name)
+        tuned = ieda_config.render_config_dir(self.tmp.name, overrides)
+        self.assertNotEqual(plain, tuned)
+        self.assertEqual(ieda_config.render_config_dir(self.tmp.name, overrides), tuned)
+
+        pl_config = _load(tuned, "pl_default_config.json")["PL"]
+        self.assertEqual(pl_config["is_timing_effort"], 1)
+        # untouched values and the templates are kept
+        self.assertEqual(pl_config["num_threads"], 16)
+        self.assertEqual(_load(plain, "pl_default_config.json")["PL"]["is_timing_effort"], 0)
+
+    def test_unknown_file(self):
+        with self.assertRaises(ValueError):
+            ieda_config.render({"no_such_config.json": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import tempfile
+import unittest
+
+import orjson
+
+from rtl2gds.step import layout_bin, layout_delta, layout_json, layout_tiles
+from rtl2gds.utils import json_stream
+
+# iEDA style: trailing commas, header members around `data`, brackets in strings
+LAYOUT = """{
+    "path": "/tmp/gcd_route.def",
+    "unit": 2000,
+    "data": [
+        {"type": "instance", "name": "u_0[3]", "xy": [[0, 0], [1200, 3780],], "layer": "M1",},
+        {"type": "net", "name": "a,b", "wire": [[1.5, -2e3], [true, null],],},
+        {"type": "via", "cut": {"layer": "Via1", "size": [190, 190]}, "xy": [0, 0]},
+        {"type": "text", "name": "esc \\" ] }", "note": "\\u00e9\\\\"},
+        12345678901234,
+    ],
+    "top": {"name": "gcd", "bbox": [0, 0, 40000, 40000,],},
+}
+"""
+
+
+def _expected(text: str) -> dict:
+    return json.loads(re.sub(r",\s*([\]}])", r"\1", text))
+
+
+class TestLayoutJson(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.layout_file = f"{self.tmp.name}/gcd_route.json"
+        with open(self.layout_file, "w", encoding="utf-8") as f:
+            f.write(LAYOUT)
+
+    def test_array_stream(self):
+        expected = _expected(LAYOUT)
+        for block_size in (1, 2, 7, 64, json_stream.DEFAULT_BLOCK_SIZE):
+            items = json_stream.ArrayStream(self.layout_file, block_size=block_size)
+            self.assertEqual(list(items), expected["data"], block_size)
+            self.assertEqual(items.header, {k: v for k, v in expected.items() if k != "data"})
+            self.assertTrue(items.found)
+
+    def test_array_stream_numbers(self):
+        # numbers cut by a block end after their ".", "e" or exponent sign
+        text = '{"scale": 0.25, "data": [{"a": 1}, 3.5e3, -2E-1, 10, 0.5], "unit": 1e+2}'
+        with open(self.layout_file, "w", encoding="utf-8") as f:
+            f.write(text)
+        expected = json.loads(text)
+        for block_size in range(1, len(text) + 1):
+            items = json_stream.ArrayStream(self.layout_file, block_size=block_size)
+            self.assertEqual(list(items), expected["data"], block_size)
+            self.assertEqual(items.header, {"scale": 0.25, "unit": 100.0}, block_size)
+
+    def test_invalid(self):
+        for text in ('{"data": [1, 2', '{"data": [1] "unit": 1}', '{"data": [NaN]}', "[1]"):
+            with open(self.layout_file, "w", encoding="utf-8") as f:
+                f.write(text)
+            with self.assertRaises(ValueError, msg=text):
+                list(json_stream.ArrayStream(self.layout_file, block_size=4))
+
+    def test_split(self):
+        files = layout_json._split_layout_json(self.layout_file, max_file_size=160)
+        base = os.path.splitext(self.layout_file)[0]
+        self.assertEqual(files, [f"{base}-header.json", f"{base}-0.json", f"{base}-1.json"])
+
+        expected = _expected(LAYOUT)
+        with open(files[0], "rb") as f:
+            self.assertEqual(json.load(f), {k: v for k, v in expected.items() if k != "data"})
+        chunks = []
+        for name in files[1:]:
+            self.assertLessEqual(os.path.getsize(name), 160 + len('{"data":[]}'))
+            with open(name, "rb") as f:
+                chunks.append(json.load(f)["data"])
+            # byte compatible with the front-end's chunks
+            with open(name, "rb") as f:
+                self.assertEqual(f.read(), orjson.dumps({"data": chunks[-1]}))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 3])
+        self.assertEqual(sum(chunks, []), expected["data"])
+
+    def test_binary(self):
+        items = [
+            {"type": "instance", "name": "u_é", "xy": [[0, 0], [1200, 3780]], "layer": 1},
+            {"type": "wire", "path": [[-5, 2**40], [3, 4], [5, 6]], "width": 0.14},
+            {"type": "via", "cut": {"layer": "Via1"}, "xy": [], "fixed": True, "width": 2},
+            {"type": "text", "bbox": [0, 0, 1.5, 2], "layer": 300, "fixed": False},
+        ]
+        with open(self.layout_file, "wb") as f:
+            f.write(orjson.dumps({"unit": 2000, "data": items}))
+        files = layout_json._split_layout_json(self.layout_file, binary=True)
+        base = os.path.splitext(self.layout_file)[0]
+        self.assertEqual(files[2:], [f"{base}-manifest.json", f"{base}-bin-0.bin"])
+
+        writer = layout_bin.Writer(f"{self.tmp.name}/parts", part_items=3)
+        for item in items:
+            writer.add(item)
+        self.assertEqual(len(writer.close({"unit": 2000})), 3)
+
+        manifests = {files[2]: ["<i2"], f"{self.tmp.name}/parts-manifest.json": ["<i1", "<i2"]}
+        for manifest, layer_dtypes in manifests.items():
+            with layout_bin.Reader(manifest) as reader:
+                self.assertEqual(reader.header, {"unit": 2000})
+                self.assertEqual(list(reader), items)
+                self.assertEqual(
+                    [part.columns["layer"]["values"]["dtype"] for part in reader.parts],
+                    layer_dtypes,
+                )
+                part = reader.parts[0]
+                self.assertEqual(part.column("type")[:2], ["instance", "wire"])
+                self.assertEqual(part.columns["xy"]["width"], 2)
+                self.assertEqual(part.column("width")[:3], [None, 0.14, 2])
+
+    def test_tiles(self):
+        big = {"type": "instance", "xy": [[0, 0], [600, 600]]}
+        medium = {"type": "instance", "xy": [[100, 100], [230, 230]]}
+        crossing = {"type": "wire", "path": [[450, 100], [600, 100], [600, 240]]}
+        small = {"type": "wire", "path": [[900, 900], [910, 900]]}
+        outside = {"type": "wire", "path": [[-50, 1200], [-40, 1210]]}
+        text = {"type": "text", "name": "gcd"}
+        items = [big, medium, crossing, small, outside, text]
+        with open(self.layout_file, "wb") as f:
+            f.write(orjson.dumps({"unit": 2000, "data": items}))
+
+        policy = layout_tiles.TilePolicy.from_config(
+            {"levels": 3, "tile_pixels": 4, "min_pixels": 1}
+        )
+        files = layout_json._split_layout_json(
+            self.layout_file, tiles=policy, tile_bbox=(0, 0, 1000, 1000)
+        )
+        with open(files[2], "rb") as f:
+            index = orjson.loads(f.read())
+        self.assertEqual(index["header"], {"unit": 2000})
+        expected = {
+            "0/0/0": [big, text],
+            "1/0/0": [medium, crossing],
+            "1/1/0": [crossing],
+            "2/0/3": [outside],
+            "2/3/3": [small],
+        }
+        self.assertEqual(list(index["tiles"]), list(expected))
+        for key, tile in index["tiles"].items():
+            name = f"{self.tmp.name}/{tile['file']}"
+            self.assertIn(name, files)
+            self.assertEqual(os.path.getsize(name), tile["size"])
+            with open(name, "rb") as f:
+                self.assertEqual(f.read(), orjson.dumps({"data": expected[key]}))
+
+        # only the instances by size, the routing at the finest level
+        policy.coarse_types = ["instance"]
+        writer = layout_tiles.Writer(f"{self.tmp.name}/typed", (0, 0, 1000, 1000), policy)
+        self.assertEqual(writer.tiles_of(medium), [(1, 0, 0)])
+        self.assertEqual(writer.tiles_of(crossing), [(2, 1, 0), (2, 2, 0)])
+        # wires wider than the finest tiles go to a level they fit in 2x2 tiles of
+        stripe = {"type": "wire", "path": [[0, 500], [1000, 500]]}
+        strap = {"type": "wire", "path": [[100, 400], [100, 700]]}
+        self.assertEqual(writer.tiles_of(stripe), [(0, 0, 0)])
+        self.assertEqual(writer.tiles_of(strap), [(1, 0, 0), (1, 0, 1)])
+        for item in (big, medium, crossing, small, outside, stripe, strap):
+            self.assertLessEqual(len(writer.tiles_of(item)), 4)
+
+    def test_delta(self):
+        moved = {"type": "instance", "name": "u_0", "xy": [[0, 0], [10, 10]]}
+        kept = {"type": "instance", "name": "u_1", "xy": [[20, 0], [30, 10]]}
+        gone = {"type": "wire", "path": [[0, 5], [20, 5]]}
+        via = {"type": "via", "xy": [0, 0]}
+        base_items = [moved, kept, gone, via, via, via]
+        with open(self.layout_file, "wb") as f:
+            f.write(orjson.dumps({"unit": 2000, "data": base_items}))
+        files = layout_json._split_layout_json(self.layout_file, delta=True)
+        base = os.path.splitext(self.layout_file)[0]
+        self.assertEqual(files, [f"{base}-header.json", f"{base}-0.json", f"{base}-index.bin"])
+        base_index = layout_delta.base_index(self.layout_file)
+        self.assertEqual(base_index, files[2])
+        digests = layout_delta.read_index(base_index)
+        self.assertEqual(len(digests), 6)
+        self.assertEqual(digests[3], digests[5])
+        self.assertEqual(len(set(digests)), 4)
+
+        layout_file = f"{self.tmp.name}/gcd_cts.json"
+        moved_now = dict(moved, xy=[[40, 0], [50, 10]])
+        added = {"type": "instance", "name": "u_2", "xy": [[0, 20], [10, 30]]}
+        items = [kept, via, moved_now, via, added]
+        with open(layout_file, "wb") as f:
+            f.write(orjson.dumps({"unit": 2000, "data": items}))
+        files = layout_json._split_layout_json(layout_file, delta=True, delta_base=base_index)
+        base = os.path.splitext(layout_file)[0]
+        self.assertEqual(files, [f"{base}-header.json", f"{base}-delta.json", f"{base}-index.bin"])
+        with open(files[1], "rb") as f:
+            delta = orjson.loads(f.read())
+        self.assertEqual(delta["base"], "gcd_route.json")
+        self.assertEqual(delta["header"], {"unit": 2000})
+        self.assertEqual(delta["data"], [moved_now, added])
+        self.assertEqual((delta["added"], delta["removed"]), (2, [0, 2, 5]))
+
+        # the base items patched by the delta are the items of the export, in index order
+        patched = [item for i, item in enumerate(base_items) if i not in delta["removed"]]
+        patched += delta["data"]
+        self.assertEqual(sorted(map(orjson.dumps, patched)), sorted(map(orjson.dumps, items)))
+        writer = layout_delta.Writer(f"{self.tmp.name}/patched.json")
+        for item in patched:
+            writer.add(item)
+        writer.close({})
+        self.assertEqual(
+            layout_delta.read_index(f"{self.tmp.name}/patched-index.bin"),
+            layout_delta.read_index(files[2]),
+        )
+
+        # the delta identifies the index it applies to and the one it results in
+        for key, name in (("base_index", base_index), ("index", files[2])):
+            with open(name, "rb") as f:
+                self.assertEqual(delta[key], layout_delta.index_digest(f.read()))
+        self.assertEqual(delta["base_index"]["items"], 6)
+
+        # an export without deltas does not leave a stale base behind
+        layout_json._split_layout_json(self.layout_file)
+        self.assertIsNone(layout_delta.base_index(self.layout_file))
+        layout_json._split_layout_json(layout_file, delta=True)
+        self.assertFalse(os.path.exists(layout_delta.delta_file(layout_file)))
+
+    def test_def_units(self):
+        def_file = f"{self.tmp.name}/gcd.def"
+        with open(def_file, "w", encoding="utf-8") as f:
+            f.write("VERSION 5.8 ;\nDESIGN gcd ;\nUNITS DISTANCE MICRONS 2000 ;\n")
+        self.assertEqual(layout_tiles.def_units(def_file), 2000)
+        self.assertEqual(layout_tiles.parse_bbox("0 0 108.07 108.07"), (0, 0, 108.07, 108.07))
+        with self.assertRaises(ValueError):
+            layout_tiles.parse_bbox("0, 0, 0, 10")
+
+
+if __name__ == "__main__":
+    unittest.main()
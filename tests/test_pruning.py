@@ -0,0 +1,58 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from rtl2gds import Chip, StepName
+from rtl2gds.flow import pruning
+
+
+class TestPruning(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.chip = Chip(
+            config_dict={
+                "top_name": "gcd",
+                "rtl_file": f"{self.tmp.name}/gcd.v",
+                "result_dir": f"{self.tmp.name}/gcd_results",
+                "clk_port_name": "clk",
+                "clk_freq_mhz": 200,
+                "core_util": 0.5,
+            }
+        )
+        self.result_dir = self.chip.path_setting.result_dir
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_min_wns(self):
+        report_dir = f"{self.result_dir}/evaluation/{StepName.PLACEMENT}"
+        os.makedirs(report_dir)
+        with open(f"{report_dir}/timing_result.json", "w", encoding="utf-8") as f:
+            json.dump({"clocks": [{"name": "clk", "setup_wns": -3.5, "setup_tns": -80}]}, f)
+
+        pruner = pruning.Pruner([pruning.MinWns(-1.0)])
+        with self.assertRaises(pruning.PruneError) as ctx:
+            pruner.check(self.chip, StepName.PLACEMENT)
+        self.assertEqual(ctx.exception.step_name, StepName.PLACEMENT)
+        # steps without a timing report pass
+        pruner.check(self.chip, StepName.CTS)
+
+    def test_max_overflow(self):
+        overflow_csv = f"{self.result_dir}/{pruning.PLACE_OVERFLOW_CSV}"
+        os.makedirs(os.path.dirname(overflow_csv))
+        with open(overflow_csv, "w", encoding="utf-8") as f:
+            f.write("0,1,2\n3,4,5\n")
+
+        pruning.Pruner([pruning.MaxOverflow(20)]).check(self.chip, StepName.PLACEMENT)
+        with self.assertRaises(pruning.PruneError):
+            pruning.Pruner([pruning.MaxOverflow(10)]).check(self.chip, StepName.PLACEMENT)
+
+    def test_pickle_for_sweep_workers(self):
+        pruner = pickle.loads(pickle.dumps(pruning.Pruner([pruning.MaxCoreUtil(0.9)])))
+        self.chip.metrics.area.core_util = 0.95
+        with self.assertRaises(pruning.PruneError) as ctx:
+            pruner.check(self.chip, StepName.FLOORPLAN)
+        error = pickle.loads(pickle.dumps(ctx.exception))
+        self.assertEqual(error.reason, ctx.exception.reason)
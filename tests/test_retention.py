@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from rtl2gds import Chip, StepName
+from rtl2gds.flow import checkpoint, retention
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.result_dir = f"{self.tmp.name}/gcd_results"
+        self.chip = Chip(
+            config_dict={
+                "top_name": "gcd",
+                "result_dir": self.result_dir,
+                "clk_port_name": "clk",
+                "clk_freq_mhz": 200,
+                "core_util": 0.5,
+            }
+        )
+        self.results = {}
+        for step_name in (StepName.PLACEMENT, StepName.FILLER):
+            self.results[step_name] = self._finish_step(step_name)
+            gds_file = self._write(f"gcd_{step_name}.gds", 300)
+            self.results[f"{StepName.LAYOUT_GDS}_{step_name}"] = {"gds_file": gds_file}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name: str, size: int) -> str:
+        path = f"{self.result_dir}/{name}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("x" * size)
+        return path
+
+    def _finish_step(self, step_name: str) -> dict:
+        artifacts = {
+            "def": self._write(f"gcd_{step_name}.def", 1000),
+            "verilog": self._write(f"gcd_{step_name}.v", 100),
+            "design_stat_json": self._write(f"report/{step_name}_stat.json", 10),
+        }
+        self.chip.path_setting.def_file = artifacts["def"]
+        self.chip.finished_step = step_name
+        self.chip.update2config()
+        self.chip.dump_config_yaml()
+        return artifacts
+
+    def _collect(self, policy, status=retention.STATUS_FINISHED, dry_run=False):
+        retention.write_manifest(self.result_dir, "gcd", self.results, status)
+        return retention.collect(
+            self.result_dir, "gcd", policy, config_yaml=self.chip.config_yaml, dry_run=dry_run
+        )
+
+    def test_keep_final(self):
+        placement = self.results[StepName.PLACEMENT]
+        placement_checkpoint = checkpoint.list_checkpoints(self.chip.config_yaml)[1]
+        checkpoint_bytes = os.path.getsize(placement_checkpoint)
+        report = self._collect(retention.RetentionPolicy(mode=retention.KEEP_FINAL))
+
+        self.assertEqual(report.reclaimed_bytes, 1000 + 100 + 300 + checkpoint_bytes)
+        for path in (placement["def"], placement["verilog"]):
+            self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(placement["design_stat_json"]))
+        self.assertTrue(os.path.exists(self.results[StepName.FILLER]["def"]))
+        # the placement checkpoint lost its DEF, the filler one is still valid
+        checkpoints = checkpoint.list_checkpoints(self.chip.config_yaml)
+        self.assertEqual(len(checkpoints), 1)
+        self.assertIsNone(checkpoint.validate_checkpoint(checkpoints[0]))
+
+    def test_keep_checkpoints(self):
+        policy = retention.RetentionPolicy(mode=retention.KEEP_CHECKPOINTS, keep_checkpoints=2)
+        report = self._collect(policy)
+        self.assertEqual(report.deleted, [f"{self.result_dir}/gcd_{StepName.PLACEMENT}.gds"])
+        self.assertTrue(os.path.exists(self.results[StepName.PLACEMENT]["def"]))
+
+    def test_dry_run_and_failed(self):
+        policy = retention.RetentionPolicy.from_config(retention.KEEP_FINAL)
+        report = self._collect(policy, dry_run=True)
+        self.assertEqual(len(report.deleted), 4)
+        self.assertTrue(all(os.path.exists(path) for path in report.deleted))
+
+        report = self._collect(policy, status=retention.STATUS_FAILED)
+        self.assertEqual(report.deleted, [])
+        self.assertEqual(report.skipped, "failed run kept")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import sys
+import tempfile
+import unittest
+
+from rtl2gds.utils import rusage
+from rtl2gds.utils.json_helper import load_json
+
+ALLOCATE_AND_WRITE = """
+import os
+data = bytearray(64 * 1024 * 1024)
+with open(os.devnull, "wb") as f:
+    f.write(data)
+"""
+
+
+class TestRusage(unittest.TestCase):
+    def setUp(self):
+        rusage.reset_resource_data()
+
+    def test_call_records_usage(self):
+        self.assertEqual(rusage.call([sys.executable, "-c", ALLOCATE_AND_WRITE], "demo"), 0)
+        self.assertEqual(rusage.call([sys.executable, "-c", "exit(3)"], "demo"), 3)
+
+        usage = rusage.resource_data["steps"]["demo"]
+        self.assertEqual(usage["processes"], 2)
+        self.assertGreater(usage["max_rss_kb"], 64 * 1024)
+        self.assertGreater(usage["user_cpu_seconds"] + usage["sys_cpu_seconds"], 0)
+
+    def test_save_resource_data(self):
+        rusage.call([sys.executable, "-c", "pass"], "demo")
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = load_json(rusage.save_resource_data(tmp, "gcd"))
+        self.assertEqual(saved["steps"]["demo"]["processes"], 1)
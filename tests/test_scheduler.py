@@ -0,0 +1,106 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+
+from rtl2gds.flow.scheduler import DagScheduler
+
+
+class TestDagScheduler(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def _record(self, event: str):
+        with self.lock:
+            self.events.append(event)
+
+    def _node(self, name: str, seconds: float = 0.0, barrier: threading.Barrier | None = None):
+        def func():
+            self._record(f"{name} start")
+            if barrier is not None:
+                # raises BrokenBarrierError unless the other party runs at the same time
+                barrier.wait()
+            time.sleep(seconds)
+            self._record(f"{name} end")
+            return name.upper()
+
+        return func
+
+    def test_dependency_order(self):
+        scheduler = DagScheduler(max_workers=4)
+        scheduler.add("synth", self._node("synth", 0.05))
+        scheduler.add("place", self._node("place", 0.05), deps=["synth"])
+        scheduler.add("gds", self._node("gds"), deps=["place"], branch="gds")
+        scheduler.add("route", self._node("route"), deps=["synth", "place"])
+        self.assertEqual(
+            scheduler.run(), {"synth": "SYNTH", "place": "PLACE", "gds": "GDS", "route": "ROUTE"}
+        )
+        for dep, node in (("synth", "place"), ("place", "gds"), ("place", "route")):
+            self.assertLess(self.events.index(f"{dep} end"), self.events.index(f"{node} start"))
+
+        with self.assertRaises(ValueError):
+            scheduler.add("sta", self._node("sta"), deps=["cts"])
+        with self.assertRaises(ValueError):
+            scheduler.add("synth", self._node("synth"))
+
+    def test_branches_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+        scheduler = DagScheduler(max_workers=2)
+        scheduler.add("place", self._node("place"))
+        scheduler.add("route", self._node("route", barrier=barrier), deps=["place"])
+        scheduler.add("gds", self._node("gds", barrier=barrier), deps=["place"], branch="gds")
+        scheduler.run()
+        self.assertEqual(set(self.events[2:4]), {"route start", "gds start"})
+
+    def test_first_error_after_running_nodes(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fail():
+            barrier.wait()
+            raise RuntimeError("route failed")
+
+        scheduler = DagScheduler(max_workers=2)
+        scheduler.add("route", fail)
+        scheduler.add("gds", self._node("gds", 0.3, barrier=barrier), branch="gds")
+        scheduler.add("drc", self._node("drc"), deps=["gds"], branch="gds")
+        scheduler.add("sta", self._node("sta"), deps=["route"])
+        with self.assertLogs(level="ERROR"), self.assertRaisesRegex(RuntimeError, "route failed"):
+            scheduler.run()
+        # the running node finished, nothing started after the failure
+        self.assertEqual(self.events, ["gds start", "gds end"])
+        self.assertEqual(scheduler.results, {"gds": "GDS"})
+        self.assertEqual(list(scheduler.branch_report()), ["main", "gds"])
+
+    def test_branch_report(self):
+        barrier = threading.Barrier(2, timeout=5)
+        scheduler = DagScheduler(max_workers=4)
+        scheduler.add("place", self._node("place", 0.1))
+        scheduler.add("route", self._node("route", 0.1), deps=["place"])
+        scheduler.add("gds", self._node("gds", 0.1, barrier), deps=["place"], branch="gds")
+        scheduler.add("json", self._node("json", 0.1, barrier), deps=["place"], branch="gds")
+        scheduler.run()
+
+        report = scheduler.branch_report()
+        self.assertEqual(list(report["main"]["nodes"]), ["place", "route"])
+        self.assertEqual(list(report["gds"]["nodes"]), ["gds", "json"])
+        for name, branch in report.items():
+            nodes = [node for node in scheduler.nodes.values() if node.branch == name]
+            self.assertAlmostEqual(branch["busy_seconds"], sum(node.elapsed for node in nodes))
+            self.assertAlmostEqual(
+                branch["wall_seconds"],
+                max(node.end_time for node in nodes) - min(node.start_time for node in nodes),
+            )
+        # sequential nodes: wall covers busy, overlapping nodes: busy exceeds wall
+        self.assertGreaterEqual(report["main"]["wall_seconds"], report["main"]["busy_seconds"])
+        self.assertLess(report["gds"]["wall_seconds"], report["gds"]["busy_seconds"])
+        self.assertGreaterEqual(report["gds"]["nodes"]["gds"]["elapsed_seconds"], 0.1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(scheduler.save_branch_report(f"{tmp}/branches.json"), "rb") as f:
+                self.assertEqual(list(json.load(f)), ["main", "gds"])
+
+
+if __name__ == "__main__":
+    unittest.main()
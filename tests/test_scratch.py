@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from rtl2gds import Chip, StepName
+from rtl2gds.flow import checkpoint
+from rtl2gds.flow.scratch import ScratchSync
+
+
+class TestScratch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.result_dir = f"{self.tmp.name}/gcd_results"
+        self.chip = Chip(
+            config_dict={
+                "top_name": "gcd",
+                "rtl_file": f"{self.tmp.name}/gcd.v",
+                "netlist_file": f"{self.result_dir}/gcd_netlist.v",
+                "result_dir": self.result_dir,
+                "clk_port_name": "clk",
+                "clk_freq_mhz": 200,
+                "core_util": 0.5,
+            }
+        )
+        self.scratch = ScratchSync(self.result_dir, f"{self.tmp.name}/scratch")
+        self.scratch.attach(self.chip)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _finish_synthesis(self) -> str:
+        netlist_file = self.chip.path_setting.netlist_file
+        with open(netlist_file, "w", encoding="utf-8") as f:
+            f.write("module gcd(); endmodule\n")
+        self.chip.finished_step = StepName.SYNTHESIS
+        self.chip.expected_step = StepName.FLOORPLAN
+        self.chip.update2config()
+        self.scratch.sync_step({"netlist": netlist_file}, self.chip.dump_config_yaml())
+        return netlist_file
+
+    def test_step_synced_with_checkpoint(self):
+        self.assertTrue(self.chip.path_setting.result_dir.startswith(f"{self.tmp.name}/scratch"))
+        netlist_file = self._finish_synthesis()
+        self.scratch.flush()
+
+        self.assertTrue(os.path.exists(f"{self.result_dir}/gcd_netlist.v"))
+        latest = checkpoint.find_latest_checkpoint(f"{self.result_dir}/rtl2gds_gcd.yaml")
+        self.assertEqual(os.path.dirname(latest), self.result_dir)
+        with open(latest, "r", encoding="utf-8") as f:
+            self.assertNotIn(self.scratch.scratch_dir, f.read())
+
+        self.scratch.close(self.chip)
+        self.assertEqual(self.chip.path_setting.result_dir, self.result_dir)
+        self.assertEqual(self.chip.path_setting.netlist_file, f"{self.result_dir}/gcd_netlist.v")
+        self.assertFalse(os.path.exists(netlist_file))
+
+    def test_failed_flow_flushes_everything(self):
+        self._finish_synthesis()
+        os.makedirs(f"{self.chip.path_setting.result_dir}/report")
+        with open(f"{self.chip.path_setting.result_dir}/report/floorplan_stat.rpt", "w") as f:
+            f.write("partial\n")
+
+        self.scratch.close(self.chip, failed=True)
+        self.assertTrue(os.path.exists(f"{self.result_dir}/report/floorplan_stat.rpt"))
+        self.assertFalse(os.path.exists(self.scratch.scratch_dir))
+        # checkpoints are only written with their paths rewritten
+        self.assertFalse(os.path.exists(f"{self.result_dir}/.checkpoints"))
+
+
+if __name__ == "__main__":
+    unittest.main()
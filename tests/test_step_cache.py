@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from rtl2gds.flow.step_cache import StepCache
+
+
+class TestStepCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = StepCache(f"{self.tmp.name}/cache")
+        self.result_dir = f"{self.tmp.name}/run_a"
+        os.makedirs(f"{self.result_dir}/report", exist_ok=True)
+        self.input_def = f"{self.result_dir}/top_floorplan.def"
+        with open(self.input_def, "w", encoding="utf-8") as f:
+            f.write("DESIGN top ;\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _key(self, result_dir, input_def):
+        return self.cache.make_key(
+            step_name="placement",
+            result_dir=result_dir,
+            input_files=[input_def],
+            shell_cmd=["iEDA", "-script", "run_iPL.tcl"],
+            env={"PATH": "", "IEDA_CONFIG_DIR": "/cfg"},
+            params={"result_dir": result_dir, "output_def": f"{result_dir}/top_placement.def"},
+        )
+
+    def test_miss_then_hit_in_another_result_dir(self):
+        key = self._key(self.result_dir, self.input_def)
+        self.assertIsNone(self.cache.load(key, self.result_dir))
+
+        output_def = f"{self.result_dir}/top_placement.def"
+        with open(output_def, "w", encoding="utf-8") as f:
+            f.write("DESIGN top ; PLACED\n")
+        with open(f"{self.result_dir}/report/placement_stat.json", "w", encoding="utf-8") as f:
+            f.write("{}")
+        artifacts = {"def": output_def, "report_dir": f"{self.result_dir}/report"}
+        self.assertTrue(
+            self.cache.save(key, "placement", self.result_dir, {"core_util": 0.5}, artifacts)
+        )
+
+        # same input content in a different result directory hits the same entry
+        other_dir = f"{self.tmp.name}/run_b"
+        os.makedirs(other_dir)
+        other_def = f"{other_dir}/top_floorplan.def"
+        with open(other_def, "w", encoding="utf-8") as f:
+            f.write("DESIGN top ;\n")
+        other_key = self._key(other_dir, other_def)
+        self.assertEqual(key, other_key)
+
+        metrics, restored = self.cache.load(other_key, other_dir)
+        self.assertEqual(metrics, {"core_util": 0.5})
+        self.assertEqual(restored["def"], f"{other_dir}/top_placement.def")
+        with open(restored["def"], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "DESIGN top ; PLACED\n")
+        self.assertTrue(os.path.isfile(f"{other_dir}/report/placement_stat.json"))
+
+    def test_input_change_misses(self):
+        key = self._key(self.result_dir, self.input_def)
+        with open(self.input_def, "a", encoding="utf-8") as f:
+            f.write("END DESIGN\n")
+        self.assertNotEqual(key, self._key(self.result_dir, self.input_def))
+
+    def test_missing_artifact_not_cached(self):
+        key = self._key(self.result_dir, self.input_def)
+        stored = self.cache.save(
+            key, "placement", self.result_dir, {}, {"def": f"{self.result_dir}/missing.def"}
+        )
+        self.assertFalse(stored)
+        self.assertIsNone(self.cache.load(key, self.result_dir))
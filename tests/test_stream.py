@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from rtl2gds.utils import progress, rusage, stream
+
+TOOL_OUTPUT = """
+import sys
+print("1. Executing Verilog-2005 frontend: gcd.v")
+print("[NesterovSolve] Iteration: 10 | Overflow: 0.55 | HPWL: 1.5e+06", flush=True)
+print("warning: something", file=sys.stderr, flush=True)
+for i in range(1000):
+    print(f"line {i}")
+sys.exit(2)
+"""
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        progress.add_listener(self.events.append)
+
+    def tearDown(self):
+        progress.remove_listener(self.events.append)
+
+    def test_call_streams_to_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = stream.step_log_file(tmp, "demo")
+            with self.assertLogs(level="ERROR") as logs:
+                ret_code = rusage.call(
+                    [sys.executable, "-c", TOOL_OUTPUT],
+                    "demo",
+                    log_file=log_file,
+                    parsers=progress.parsers_for("yosys") + progress.parsers_for("iEDA-iPL"),
+                )
+            self.assertEqual(ret_code, 2)
+            with open(log_file, "r", encoding="utf-8") as f:
+                log = f.read()
+        self.assertIn("warning: something", log)
+        self.assertIn("line 999", log)
+        # only the tail is reported
+        self.assertIn("line 999", logs.output[0])
+        self.assertNotIn("line 0\n", logs.output[0])
+
+        kinds = [event.kind for event in self.events]
+        self.assertEqual(kinds[0], progress.START)
+        self.assertEqual(kinds[-1], progress.END)
+        self.assertEqual(self.events[-1].values["returncode"], 2)
+        iteration = next(e for e in self.events if e.kind == progress.ITERATION)
+        self.assertEqual(iteration.values, {"iteration": 10, "overflow": 0.55, "hpwl": 1.5e6})
+        self.assertAlmostEqual(iteration.fraction, 0.5)
+        self.assertIsNotNone(iteration.eta_seconds)
+        yosys_pass = next(e for e in self.events if e.kind == progress.PASS)
+        self.assertEqual(yosys_pass.values["pass"], "Verilog-2005 frontend: gcd.v")
+
+    def test_sink_bounded(self):
+        sink = stream.LineSink("demo", echo=False, tail_lines=3)
+        for i in range(10):
+            sink.feed(f"line {i}")
+        self.assertEqual(sink.tail(), "line 7\nline 8\nline 9\n")
+
+    def test_routing_stages_once(self):
+        parser = progress.RoutingParser()
+        lines = ["[RT] PinAccessor start", "[RT] PinAccessor end", "[RT] DetailedRouter iter 1"]
+        events = [parser.parse("routing", line) for line in lines]
+        self.assertEqual(events[0].values["stage"], "PinAccessor")
+        self.assertIsNone(events[1])
+        self.assertEqual(events[2].values["stage"], "DetailedRouter")
+
+    def test_failing_listener(self):
+        def broken(event):
+            raise RuntimeError("broken listener")
+
+        progress.add_listener(broken)
+        try:
+            with self.assertLogs(level="WARNING"):
+                progress.emit(progress.ProgressEvent("demo", progress.START))
+        finally:
+            progress.remove_listener(broken)
+        self.assertEqual(len(self.events), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from rtl2gds.global_configs import ENV_TOOLS_PATH
+from rtl2gds.step import sv2v, synthesis
+
+# stands in for sv2v: copies the input to `-w`, fails on sources containing "error"
+FAKE_SV2V = """#!{python}
+import sys
+args = sys.argv[1:]
+source, output = args[0], args[args.index("-w") + 1]
+with open(source) as f:
+    text = f.read()
+with open("{calls}", "a") as f:
+    f.write(source + "\\n")
+if "error" in text:
+    print(source + ": parse error", file=sys.stderr)
+    sys.exit(1)
+with open(output, "w") as f:
+    f.write("// converted\\n" + text)
+"""
+
+
+class TestSv2v(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        bin_dir = f"{self.tmp.name}/bin"
+        os.makedirs(bin_dir)
+        self.calls = f"{self.tmp.name}/calls.txt"
+        fake = f"{bin_dir}/sv2v"
+        with open(fake, "w", encoding="utf-8") as f:
+            f.write(FAKE_SV2V.format(python=sys.executable, calls=self.calls))
+        os.chmod(fake, os.stat(fake).st_mode | stat.S_IXUSR)
+        patcher = mock.patch.dict(ENV_TOOLS_PATH, {"PATH": bin_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache_dir = f"{self.tmp.name}/cache"
+
+    def _sources(self, texts: dict[str, str]) -> dict[str, str]:
+        sources = {}
+        for name, text in texts.items():
+            path = f"{self.tmp.name}/{name}.sv"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            sources[path] = f"{self.tmp.name}/{name}.v"
+        return sources
+
+    def _num_calls(self) -> int:
+        with open(self.calls, "r", encoding="utf-8") as f:
+            return len(f.readlines())
+
+    def test_cached(self):
+        sources = self._sources({f"mod{i}": f"module mod{i}; endmodule\n" for i in range(6)})
+        sv2v.convert_files(sources, top="mod0", cache_dir=self.cache_dir, max_workers=3)
+        self.assertEqual(self._num_calls(), 6)
+        for output_v in sources.values():
+            os.remove(output_v)
+
+        sv2v.convert_files(sources, top="mod0", cache_dir=self.cache_dir)
+        self.assertEqual(self._num_calls(), 6)
+        with open(sources[f"{self.tmp.name}/mod3.sv"], "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "// converted\nmodule mod3; endmodule\n")
+
+        # defines are part of the key
+        sv2v.convert_files(sources, top="mod0", define=["SIM"], cache_dir=self.cache_dir)
+        self.assertEqual(self._num_calls(), 12)
+
+    def test_failures_reported_together(self):
+        sources = self._sources({"ok": "module ok; endmodule\n", "bad1": "error", "bad2": "error"})
+        with self.assertRaises(sv2v.Sv2vError) as ctx:
+            sv2v.convert_files(sources, cache_dir=self.cache_dir)
+        self.assertEqual(
+            sorted(ctx.exception.failures),
+            [f"{self.tmp.name}/bad1.sv", f"{self.tmp.name}/bad2.sv"],
+        )
+        self.assertIn("parse error", ctx.exception.failures[f"{self.tmp.name}/bad1.sv"])
+        self.assertTrue(os.path.exists(f"{self.tmp.name}/ok.v"))
+
+    def test_same_file_names(self):
+        # x.sv of b/ would be renamed to x_2.v, the output of d/x_2.sv
+        rtl_files = []
+        for name in ("a/x", "d/x_2", "b/x"):
+            os.makedirs(f"{self.tmp.name}/{os.path.dirname(name)}")
+            rtl_files.append(f"{self.tmp.name}/{name}.sv")
+            with open(rtl_files[-1], "w", encoding="utf-8") as f:
+                f.write(f"// {name}\n")
+        result_dir = f"{self.tmp.name}/result"
+        os.makedirs(result_dir)
+        converted = synthesis._convert_sv_to_v(rtl_files, result_dir, "x", self.cache_dir)
+        self.assertEqual(
+            converted, [f"{result_dir}/x.v", f"{result_dir}/x_2.v", f"{result_dir}/x_3.v"]
+        )
+        for name, output_v in zip(("a/x", "d/x_2", "b/x"), converted):
+            with open(output_v, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), f"// converted\n// {name}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
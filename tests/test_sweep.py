@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+
+from rtl2gds import Chip
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow import sweep
+
+
+class TestSweep(unittest.TestCase):
+    def test_grid_points(self):
+        points = sweep.make_points(
+            {Keyword.CORE_UTIL: [0.4, 0.6], Keyword.CLK_FREQ_MHZ: [100, 200, 300]}
+        )
+        self.assertEqual(len(points), 6)
+        self.assertIn({Keyword.CORE_UTIL: 0.6, Keyword.CLK_FREQ_MHZ: 200}, points)
+
+    def test_lhs_points_cover_every_stratum(self):
+        points = sweep.make_points({Keyword.CORE_UTIL: [0.2, 0.7]}, "lhs", num_points=5, seed=1)
+        strata = sorted(int((p[Keyword.CORE_UTIL] - 0.2) / 0.1) for p in points)
+        self.assertEqual(strata, [0, 1, 2, 3, 4])
+
+    def test_point_config_is_isolated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Chip(
+                config_dict={
+                    "top_name": "gcd",
+                    "rtl_file": f"{tmp}/gcd.v",
+                    "result_dir": f"{tmp}/base",
+                    "clk_port_name": "clk",
+                    "clk_freq_mhz": 100,
+                    "core_util": 0.5,
+                    "die_bbox": "0 0 100 100",
+                }
+            )
+            point = {Keyword.CORE_UTIL: 0.4}
+            config = sweep.point_config(base, point, f"{tmp}/sweep")
+
+            self.assertEqual(config[Keyword.RESULT_DIR], f"{tmp}/sweep/core_util_0.4")
+            self.assertTrue(config[Keyword.DEF_FILE].startswith(config[Keyword.RESULT_DIR]))
+            self.assertEqual(config[Keyword.CORE_UTIL], 0.4)
+            self.assertEqual(config[Keyword.DIE_BBOX], "")
+            self.assertNotIn(Keyword.FINISHED_STEP, config)
+            # the base chip is left untouched
+            self.assertEqual(base.constrain.core_util, 0.5)
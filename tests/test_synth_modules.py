@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+
+from rtl2gds.step import synth_modules
+
+RTL = {
+    "defines.vh": "`define WIDTH 8\n",
+    "top.v": """
+module top (input clk, input [7:0] a, output [7:0] y);
+  wire [7:0] t;
+  // inst_in_comment u0 (.a(a));
+  alu u_alu (.a(a), .y(t));
+  fifo #(.DEPTH(4)) u_fifo (.clk(clk), .d(t), .q(y));
+endmodule
+""",
+    "alu.v": """
+module alu (input [7:0] a, output [7:0] y);
+  adder u_add [1:0] (.a(a), .y(y));
+endmodule
+
+module adder (input [3:0] a, output [3:0] y);
+  assign y = a + 1;
+endmodule
+""",
+    "fifo.v": """
+module fifo #(parameter DEPTH = 2) (input clk, input [7:0] d, output [7:0] q);
+  adder u_add (.a(d[3:0]), .y(q[3:0]));
+endmodule
+""",
+}
+
+
+class TestSynthModules(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.rtl_files = [self._write(name, text) for name, text in RTL.items()]
+
+    def _write(self, name: str, text: str) -> str:
+        path = f"{self.tmp.name}/{name}"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _keys(self) -> dict[str, str]:
+        modules, context = synth_modules.scan_modules(self.rtl_files)
+        units = synth_modules.plan_units(modules, "top")
+        synth_modules.unit_keys(modules, units, context, "100")
+        return {name: unit.key for name, unit in units.items()}
+
+    def test_plan(self):
+        modules, _ = synth_modules.scan_modules(self.rtl_files)
+        self.assertEqual(modules["top"].children, {"alu": False, "fifo": True})
+        self.assertEqual(modules["alu"].children, {"adder": False})
+
+        units = synth_modules.plan_units(modules, "top")
+        # children first, the parameterized fifo is synthesized inside the top
+        self.assertEqual(list(units), ["adder", "alu", "top"])
+        self.assertEqual(units["top"].modules, ["fifo", "top"])
+        self.assertEqual(units["top"].blackboxes, ["adder", "alu"])
+        self.assertEqual(units["adder"].blackboxes, [])
+
+    def test_keys(self):
+        keys = self._keys()
+        self.assertEqual(keys, self._keys())
+
+        # a comment change keeps every key
+        self._write("alu.v", "// reviewed\n" + RTL["alu.v"])
+        self.assertEqual(keys, self._keys())
+
+        # a leaf change invalidates the leaf and the units instantiating it
+        self._write("alu.v", RTL["alu.v"].replace("a + 1", "a + 2"))
+        changed = self._keys()
+        self.assertEqual([name for name in keys if keys[name] == changed[name]], [])
+
+        # a parent change keeps its sub-units
+        self._write("alu.v", RTL["alu.v"])
+        self._write("fifo.v", RTL["fifo.v"].replace("DEPTH = 2", "DEPTH = 3"))
+        changed = self._keys()
+        self.assertEqual([name for name in keys if keys[name] == changed[name]], ["adder", "alu"])
+
+        # defines reach every module
+        self._write("fifo.v", RTL["fifo.v"])
+        self._write("defines.vh", "`define WIDTH 16\n")
+        changed = self._keys()
+        self.assertFalse(any(keys[name] == changed[name] for name in keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+
+from rtl2gds.step import synth_util
+
+REPORT = """
+=== aes_sbox ===
+
+   Number of wires:                 88
+   Number of cells:                 12
+     sg13g2_a21oi_1                  5
+     sg13g2_inv_1                    7
+   Area for cell type $scopeinfo is unknown!
+
+   Chip area for module '\\aes_sbox': 150.250000
+     of which used for sequential elements: 0.000000 (0.00%)
+
+=== $paramod\\aes_key_expand_128\\W=s32'00000000000000000000000000001000 ===
+
+   Number of cells:                  3
+     sg13g2_dfrbp_1                  3
+
+   Chip area for module '$paramod\\aes_key_expand_128\\W=s32'00000000000000000000000000001000': 98.0
+     of which used for sequential elements: 98.000000 (100.00%)
+
+=== design hierarchy ===
+
+   aes_cipher_top      1
+     $paramod\\aes_key_expand_128\\W=s32'00000000000000000000000000001000      1
+       aes_sbox      4
+     aes_sbox      16
+
+   Number of cells:                291
+     sg13g2_a21oi_1                100
+     sg13g2_dfrbp_1                  3
+
+   Chip area for top module '\\aes_cipher_top': 3102.0
+     of which used for sequential elements: 98.000000 (3.16%)
+"""
+
+KEY_EXPAND = "$paramod\\aes_key_expand_128\\W=s32'00000000000000000000000000001000"
+
+
+class TestSynthStatParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile("w", suffix=".txt")
+        self.addCleanup(self.tmp.close)
+        self.tmp.write(REPORT)
+        self.tmp.flush()
+
+    def test_parse(self):
+        parser = synth_util.SynthStatParser(self.tmp.name)
+        self.assertEqual(
+            parser.get_module_stats("\\aes_sbox"),
+            {
+                "name": "aes_sbox",
+                "number_of_wires": 88,
+                "number_of_cells": 12,
+                "cells": {"sg13g2_a21oi_1": 5, "sg13g2_inv_1": 7},
+                "chip_area": 150.25,
+                "sequential_area": 0.0,
+                "sequential_area_percent": 0.0,
+            },
+        )
+        self.assertEqual(parser.get_module_stats(KEY_EXPAND)["cells"], {"sg13g2_dfrbp_1": 3})
+
+        hierarchy = parser.hierarchy_to_dict()
+        self.assertEqual(hierarchy["module_name"], "aes_cipher_top")
+        self.assertEqual(
+            [(node["module_name"], node["instance_count"]) for node in hierarchy["submodules"]],
+            [(KEY_EXPAND, 1), ("aes_sbox", 16)],
+        )
+        self.assertEqual(hierarchy["submodules"][0]["submodules"][0]["instance_count"], 4)
+
+        totals = parser.get_total_stats()
+        self.assertEqual(totals["number_of_cells"], 291)
+        self.assertEqual(totals["cells"], {"sg13g2_a21oi_1": 100, "sg13g2_dfrbp_1": 3})
+        self.assertEqual(totals["chip_area_for_top_module_'aes_cipher_top'"], 3102.0)
+        self.assertEqual(totals["of_which_used_for_sequential_elements_percent"], 3.16)
+
+    def test_iter_module_stats(self):
+        modules = synth_util.iter_module_stats(self.tmp.name)
+        name, stats = next(modules)
+        self.assertEqual((name, stats["chip_area"]), ("aes_sbox", 150.25))
+        self.assertEqual([name for name, _ in modules], [KEY_EXPAND])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import tempfile
+import unittest
+
+from rtl2gds.chip.metrics import DesignMetrics
+from rtl2gds.step import liberty, synthesis
+
+LIBERTY = """
+library (demo) {
+  /* cell (commented_out) { area : 1.0; ff (IQ, IQN) { } } */
+  default_cell_area : 0.5;
+  cell (demo_inv_1) {
+    area : 5.4432;
+    pin (A) { direction : input; }
+    pin (Y) { direction : output; function : "!A"; }
+  }
+  cell ("demo_dfrbp_1") {
+    area : 46.2672;
+    ff (IQ, IQN) { clocked_on : "CLK"; next_state : "D"; }
+    pin (Q) { direction : output; function : "IQ"; }
+  }
+  cell (demo_dlhq_1) {
+    area : 25.4016;
+    latch (IQ, IQN) { enable : "GATE"; data_in : "D"; }
+  }
+}
+"""
+
+SYNTH_STAT = {
+    "creator": "Yosys",
+    "modules": {
+        "\\top": {
+            "num_wires": 40,
+            "num_cells": 13,
+            "area": 354.9,
+            "num_cells_by_type": {"demo_inv_1": 6, "demo_dfrbp_1": 5, "demo_dlhq_1": 2},
+        }
+    },
+    "design": {
+        "num_wires": 40,
+        "num_cells": 13,
+        "area": 354.9,
+        "num_cells_by_type": {"demo_inv_1": 6, "demo_dfrbp_1": 5, "demo_dlhq_1": 2},
+    },
+}
+
+
+class TestParseSynthStat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.liberty_file = f"{self.tmp.name}/demo.lib"
+        with open(self.liberty_file, "w", encoding="utf-8") as f:
+            f.write(LIBERTY)
+        self.stat_json = f"{self.tmp.name}/synth_stat.json"
+        with open(self.stat_json, "w", encoding="utf-8") as f:
+            json.dump(SYNTH_STAT, f)
+
+    def test_liberty(self):
+        cells = liberty.read_cells(self.liberty_file)
+        self.assertEqual(
+            cells.areas, {"demo_inv_1": 5.4432, "demo_dfrbp_1": 46.2672, "demo_dlhq_1": 25.4016}
+        )
+        self.assertEqual(cells.sequential, {"demo_dfrbp_1", "demo_dlhq_1"})
+        for cell_type in (
+            "$_DFF_P_",
+            "$_SDFFCE_PP0P_",
+            "$_DFFSR_PNN_",
+            "$_ALDFF_PP_",
+            "$_DLATCH_N_",
+            "$_DLATCHSR_PPP_",
+            "$_SR_PN_",
+            "$_FF_",
+            "$dff",
+            "$adffe",
+            "$aldff",
+            "$dlatch",
+            "$adlatch",
+            "$sr",
+            "$ff",
+        ):
+            self.assertTrue(cells.is_sequential(cell_type), cell_type)
+        for cell_type in ("$_AND_", "$_MUX_", "$shr", "$sub", "$mem_v2", "demo_inv_1"):
+            self.assertFalse(cells.is_sequential(cell_type), cell_type)
+
+    def test_parse(self):
+        stats = synthesis.parse_synth_stat(self.stat_json, self.liberty_file)
+        self.assertEqual(stats["num_cells"], 13)
+        self.assertEqual(stats["num_sequential_cells"], 7)
+        self.assertAlmostEqual(stats["sequential_area"], 5 * 46.2672 + 2 * 25.4016)
+        self.assertAlmostEqual(stats["sequential_ratio"], stats["sequential_area"] / 354.9)
+        self.assertEqual(stats["cell_types"]["demo_inv_1"], 6)
+        self.assertEqual(stats["module_cells"], {"top": 13})
+        design_metrics = DesignMetrics(module_cells=stats["module_cells"])
+        self.assertEqual(design_metrics.to_dict()["module_cells"], {"top": 13})
+
+        # without a liberty the mapped flip-flops are unknown
+        stats = synthesis.parse_synth_stat(self.stat_json)
+        self.assertEqual((stats["num_sequential_cells"], stats["sequential_ratio"]), (0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+import unittest
+
+from rtl2gds.utils.threads import ThreadBudget, available_cpus
+
+
+class TestThreads(unittest.TestCase):
+    def test_budget_from_config(self):
+        self.assertEqual(ThreadBudget.from_config(None).default, available_cpus())
+        self.assertEqual(ThreadBudget.from_config(8).for_step("routing"), 8)
+        budget = ThreadBudget.from_config({"default": 4, "steps": {"routing": 16}})
+        self.assertEqual(budget.for_step("placement"), 4)
+        self.assertEqual(budget.for_step("routing"), 16)
+        self.assertEqual(ThreadBudget.from_config(budget.to_config()), budget)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+from rtl2gds.utils import rusage, trace
+from rtl2gds.utils.json_helper import load_json
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.tracer = trace.Tracer()
+
+    def test_nesting(self):
+        with self.tracer.span("flow", trace.FLOW) as flow:
+            with self.tracer.span("placement", trace.STEP) as step:
+                with self.tracer.span("iEDA", trace.SUBPROCESS) as sub:
+                    pass
+        self.assertIsNone(flow.parent)
+        self.assertIs(step.parent, flow)
+        self.assertIs(sub.parent, step)
+        self.assertEqual([s.name for s in self.tracer.spans], ["iEDA", "placement", "flow"])
+
+    def test_error_recorded(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("synthesis", trace.STEP):
+                raise ValueError("boom")
+        self.assertIn("boom", self.tracer.spans[0].args["error"])
+
+    def test_threads_keep_parent(self):
+        spans = {}
+
+        def node(name):
+            with self.tracer.span(name, trace.NODE) as s:
+                spans[name] = s
+
+        with self.tracer.span("flow", trace.FLOW) as flow:
+            threads = [
+                threading.Thread(target=contextvars.copy_context().run, args=(node, f"n{i}"))
+                for i in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(spans), 4)
+        for s in spans.values():
+            self.assertIs(s.parent, flow)
+        self.assertEqual(len({s.tid for s in spans.values()}), 4)
+
+    def test_step_times_repeats(self):
+        for _ in range(2):
+            with self.tracer.span("placement", trace.STEP):
+                pass
+        with self.tracer.span("dump_gds", trace.POST):
+            pass
+        report = self.tracer.step_times()
+        self.assertEqual(list(report["steps"]), ["placement", "placement#2"])
+        self.assertTrue(report["summary"]["start_time"])
+
+    def test_subprocess_annotated(self):
+        trace.tracer.reset()
+        with trace.span("demo", trace.STEP):
+            rusage.call([sys.executable, "-c", "exit(3)"], "demo")
+        sub = next(s for s in trace.tracer.spans if s.category == trace.SUBPROCESS)
+        self.assertEqual(sub.args["returncode"], 3)
+        self.assertEqual(sub.parent.name, "demo")
+
+    def test_chrome_trace_merge(self):
+        with self.tracer.span("flow", trace.FLOW, top_name="gcd"):
+            with self.tracer.span("synthesis", trace.STEP):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            a = self.tracer.save_chrome_trace(os.path.join(tmp, "a.json"))
+            b = self.tracer.save_chrome_trace(os.path.join(tmp, "b.json"))
+            merged = load_json(
+                trace.merge_chrome_traces([a, b], os.path.join(tmp, "m.json"), ["p0", "p1"])
+            )
+        events = merged["traceEvents"]
+        complete = [e for e in events if e["ph"] == "X"]
+        self.assertEqual(len(complete), 4)
+        self.assertEqual({e["pid"] for e in complete}, {1, 2})
+        synthesis = next(e for e in complete if e["name"] == "synthesis")
+        self.assertEqual(synthesis["args"]["parent"], "flow")
+        names = [e["args"]["name"] for e in events if e["name"] == "process_name"]
+        self.assertEqual(names, ["p0", "p1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from rtl2gds import Chip
+from rtl2gds.chip.config import Keyword
+from rtl2gds.flow.step_wrapper import StepWrapper
+from rtl2gds.global_configs import StepName
+from rtl2gds.step import ieda_session
+from rtl2gds.utils import rusage, stream, watchdog
+
+IGNORE_SIGTERM = """
+import signal, time
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+CHATTY = """
+import time
+for i in range(8):
+    print(i, flush=True)
+    time.sleep(0.2)
+"""
+
+# answers the session commands like `run_session.tcl`, hangs on "source"
+FAKE_SESSION = """
+import os, sys, time
+token = os.environ["R2G_SESSION_TOKEN"]
+print(token, "0", flush=True)
+for line in sys.stdin:
+    if line.startswith("source"):
+        print("placing", file=sys.stderr, flush=True)
+        time.sleep(60)
+    print(token, "0", flush=True)
+"""
+
+
+class TestWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.poll_seconds = watchdog.POLL_SECONDS
+        watchdog.POLL_SECONDS = 0.1
+
+    def tearDown(self):
+        watchdog.POLL_SECONDS = self.poll_seconds
+
+    def _call(self, code: str, policy: watchdog.WatchdogPolicy, log_file=None) -> float:
+        start = time.perf_counter()
+        with watchdog.policy_scope(policy):
+            rusage.call([sys.executable, "-c", code], "demo", log_file=log_file)
+        return time.perf_counter() - start
+
+    def test_timeout(self):
+        policy = watchdog.WatchdogPolicy(step_timeout_seconds={"demo": 0.5})
+        with self.assertRaises(watchdog.WatchdogError) as ctx:
+            self._call("import time; time.sleep(60)", policy)
+        self.assertIn("timeout", ctx.exception.reason)
+
+    def test_stall_and_kill(self):
+        policy = watchdog.WatchdogPolicy(stall_seconds=0.5, term_grace_seconds=0.5)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            with self.assertRaises(watchdog.WatchdogError) as ctx:
+                self._call(IGNORE_SIGTERM, policy, log_file=stream.step_log_file(tmp, "demo"))
+        self.assertIn("no output", ctx.exception.reason)
+        self.assertLess(time.perf_counter() - start, 10)
+
+    def test_output_is_progress(self):
+        policy = watchdog.WatchdogPolicy(stall_seconds=0.6)
+        with tempfile.TemporaryDirectory() as tmp:
+            self._call(CHATTY, policy, log_file=stream.step_log_file(tmp, "demo"))
+
+    def test_session(self):
+        policy = watchdog.WatchdogPolicy(timeout_seconds=0.5)
+        session_cmd = ieda_session.IEDA_SESSION_CMD
+        ieda_session.IEDA_SESSION_CMD = [sys.executable, "-c", FAKE_SESSION]
+        self.addCleanup(setattr, ieda_session, "IEDA_SESSION_CMD", session_cmd)
+        with tempfile.TemporaryDirectory() as tmp:
+            session = ieda_session.IEDASession("gcd", tmp)
+            with watchdog.policy_scope(policy):
+                self.assertEqual(session.send("set ::env(A) 1"), "")
+                with self.assertRaises(watchdog.WatchdogError) as ctx:
+                    session.run_step(StepName.PLACEMENT, f"{tmp}/gcd.def", {})
+            self.assertEqual(ctx.exception.step_name, StepName.PLACEMENT)
+            # stderr is in the step log
+            with open(stream.step_log_file(tmp, StepName.PLACEMENT), encoding="utf-8") as f:
+                self.assertIn("placing\n", f.read())
+            self.assertIsNone(session._process)
+            self.assertFalse(session.loaded)
+
+    def test_policy_in_checkpoint_and_retry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            policy = watchdog.WatchdogPolicy(timeout_seconds=60, retries=1)
+            chip = Chip(
+                config_dict={
+                    "top_name": "gcd",
+                    "result_dir": tmp,
+                    "clk_port_name": "clk",
+                    "clk_freq_mhz": 100,
+                    Keyword.WATCHDOG: policy.to_config(),
+                }
+            )
+            resumed = Chip(config_yaml=chip.dump_config_yaml())
+            runner = StepWrapper(resumed)
+            self.assertEqual(runner.watchdog_policy, policy)
+
+            calls = []
+
+            def flaky_step():
+                calls.append(watchdog.active_policy())
+                if len(calls) == 1:
+                    os.makedirs(f"{tmp}/log", exist_ok=True)
+                    with open(stream.step_log_file(tmp, "demo"), "w", encoding="utf-8") as f:
+                        f.write("stuck\n")
+                    raise watchdog.WatchdogError("demo", "timeout", ["tool"])
+                return {}, {}
+
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(runner._attempt("demo", flaky_step, {}), ({}, {}))
+            self.assertEqual(calls, [policy, policy])
+            self.assertTrue(os.path.exists(f"{tmp}/attempts/demo_1/demo.log"))
+            self.assertFalse(os.path.exists(stream.step_log_file(tmp, "demo")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 
 set env_vars {
   NUM_THREADS
+  IEDA_CONFIG_DIR
   RESULT_DIR
   INPUT_DEF
   OUTPUT_DEF
@@ -0,0 +1,14 @@
+#===========================================================
+##   cts step body for the persistent iEDA session
+##   the design is already loaded, DEF/netlist are saved on request
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/env_var_setup.tcl
+
+run_cts -config $IEDA_CONFIG_DIR/cts_default_config.json -work_dir $TOOL_REPORT_DIR
+
+report_db -path $DESIGN_STAT_TEXT
+feature_summary -path $DESIGN_STAT_JSON -step CTS
+feature_tool -path $TOOL_METRICS_JSON -step CTS
+cts_report -path $RESULT_DIR/cts
+
+run_timing_eval -eval_output_path $::env(DESIGN_TIMING_EVAL_REPORT) -routing_type $::env(ROUTING_TYPE)
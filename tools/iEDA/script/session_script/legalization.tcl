@@ -0,0 +1,12 @@
+#===========================================================
+##   legalization step body for the persistent iEDA session
+##   the design is already loaded, DEF/netlist are saved on request
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/env_var_setup.tcl
+
+run_incremental_flow -config $IEDA_CONFIG_DIR/pl_default_config.json
+
+report_db -path $DESIGN_STAT_TEXT
+feature_summary -path $DESIGN_STAT_JSON -step legalization
+
+run_timing_eval -eval_output_path $::env(DESIGN_TIMING_EVAL_REPORT) -routing_type $::env(ROUTING_TYPE)
@@ -0,0 +1,13 @@
+#===========================================================
+##   netlist_opt step body for the persistent iEDA session
+##   the design is already loaded, DEF/netlist are saved on request
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/env_var_setup.tcl
+
+run_no_fixfanout -config $IEDA_CONFIG_DIR/no_default_config_fixfanout.json
+
+report_db -path $DESIGN_STAT_TEXT
+feature_summary -step fixFanout -path $DESIGN_STAT_JSON
+feature_tool -step fixFanout -path $TOOL_METRICS_JSON
+
+run_timing_eval -eval_output_path $::env(DESIGN_TIMING_EVAL_REPORT) -routing_type $::env(ROUTING_TYPE)
@@ -0,0 +1,22 @@
+#===========================================================
+##   routing step body for the persistent iEDA session
+##   the design is already loaded, DEF/netlist are saved on request
+#===========================================================
+set NUM_THREADS         64
+source $IEDA_TCL_SCRIPT_DIR/DB_script/env_var_setup.tcl
+
+init_rt -temp_directory_path $TOOL_REPORT_DIR \
+        -bottom_routing_layer "Metal2" \
+        -top_routing_layer "Metal5" \
+        -thread_number $NUM_THREADS \
+        -output_inter_result 0 \
+        -enable_timing 0 \
+        -enable_fast_mode 0
+run_rt
+feature_tool -path $TOOL_METRICS_JSON -step route
+destroy_rt
+
+report_db -path $DESIGN_STAT_TEXT
+feature_summary -path $DESIGN_STAT_JSON -step route
+
+run_timing_eval -eval_output_path $::env(DESIGN_TIMING_EVAL_REPORT) -routing_type $::env(ROUTING_TYPE)
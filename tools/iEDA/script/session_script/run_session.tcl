@@ -0,0 +1,65 @@
+#===========================================================
+##   persistent iEDA session
+##   the tech/cell LEFs, liberty and sdc are read once, then
+##   Tcl commands are read from stdin and evaluated one by one,
+##   so the design database stays in memory between P&R steps.
+##   every command is answered on stdout with a single line:
+##   "$::env(R2G_SESSION_TOKEN) <tcl return code> <result>"
+#===========================================================
+set RESULT_DIR          "./ieda_results"
+
+# script path
+set IEDA_CONFIG_DIR     "$::env(IEDA_CONFIG_DIR)"
+set IEDA_TCL_SCRIPT_DIR "$::env(IEDA_TCL_SCRIPT_DIR)"
+
+#===========================================================
+#   override variables from env
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/env_var_setup.tcl
+
+#===========================================================
+##   init flow config
+#===========================================================
+flow_init -config $IEDA_CONFIG_DIR/flow_config.json
+
+#===========================================================
+##   read db config
+#===========================================================
+db_init -config $IEDA_CONFIG_DIR/db_default_config.json -output_dir_path $RESULT_DIR
+
+#===========================================================
+##   reset data path
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/db_path_setting.tcl
+
+#===========================================================
+##   reset lib
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/db_init_lib.tcl
+
+#===========================================================
+##   reset sdc
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/db_init_sdc.tcl
+
+#===========================================================
+##   read lef
+#===========================================================
+source $IEDA_TCL_SCRIPT_DIR/DB_script/db_init_lef.tcl
+
+#===========================================================
+##   serve commands until stdin is closed
+#===========================================================
+fconfigure stdout -buffering line
+puts "$::env(R2G_SESSION_TOKEN) 0 ready"
+
+while {[gets stdin line] >= 0} {
+    set code [catch {uplevel #0 $line} result]
+    flush stdout
+    puts "$::env(R2G_SESSION_TOKEN) $code [string map {"\n" " "} $result]"
+}
+
+#===========================================================
+##   Exit
+#===========================================================
+flow_exit
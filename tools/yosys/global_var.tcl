@@ -10,6 +10,29 @@ set synth_check_txt         "$::env(SYNTH_CHECK_TXT)"
 
 set tmp_dir        "$::env(RESULT_DIR)/tmp"
 
+# hierarchical synthesis (step/synth_modules.py): submodules synthesized on their own
+# are kept as blackboxes, and the ports are split only once the modules are stitched
+set blackbox_modules ""
+if {[info exists ::env(BLACKBOX_MODULES)]} {
+    set blackbox_modules "$::env(BLACKBOX_MODULES)"
+}
+set keep_ports [expr {[info exists ::env(KEEP_PORTS)] && $::env(KEEP_PORTS)}]
+
+# ABC portfolio (step/abc_portfolio.py): "full" synthesis, or only the "elaborate" or
+# "map" half of it, through the design saved in DESIGN_RTLIL, mapped with ABC_SCRIPT
+set synth_stage "full"
+if {[info exists ::env(SYNTH_STAGE)]} {
+    set synth_stage "$::env(SYNTH_STAGE)"
+}
+set design_rtlil ""
+if {[info exists ::env(DESIGN_RTLIL)]} {
+    set design_rtlil "$::env(DESIGN_RTLIL)"
+}
+set abc_recipe scripts/abc-opt.script
+if {[info exists ::env(ABC_SCRIPT)]} {
+    set abc_recipe "$::env(ABC_SCRIPT)"
+}
+
 set clk_period_ps  [expr 1000000.0 / ${clk_freq_mhz}]
 
 file mkdir $tmp_dir
@@ -28,7 +28,9 @@ set liberty_args [concat {*}$liberty_args_list]
 set tech_cells_args_list [lmap lib $tech_cells {concat "-liberty" $lib}]
 set tech_cells_args [concat {*}$tech_cells_args_list]
 
-# read library files
-foreach file $lib_list {
-	yosys read_liberty -lib "$file"
+# read library files (a saved design of the "map" stage has them already)
+if {$synth_stage ne "map"} {
+	foreach file $lib_list {
+		yosys read_liberty -lib "$file"
+	}
 }
@@ -0,0 +1,94 @@
+# Copyright (c) 2022 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Authors:
+# - Philippe Sauter <phsauter@iis.ee.ethz.ch>
+
+# elaboration, generic optimization and flip-flop mapping, sourced by yosys_synthesis.tcl
+
+foreach file $verilog_files {
+    yosys read_verilog $file
+}
+
+# -----------------------------------------------------------------------------
+# this section heavily borrows from the yosys synth command:
+# synth - check
+if {$blackbox_modules ne ""} {
+    yosys blackbox {*}$blackbox_modules
+}
+yosys hierarchy -top $top_design
+yosys check
+yosys proc
+yosys tee -q -o "${tmp_dir}/rpt_${top_design}_elaborated.rpt" stat
+yosys write_verilog -norename -noexpr -attr2comment ${tmp_dir}/${top_design}_yosys_elaborated.v
+
+# synth - coarse:
+# similar to yosys synth -run coarse -noalumacc
+yosys opt_expr
+yosys opt -noff
+yosys fsm
+yosys tee -q -o "${tmp_dir}/rpt_${top_design}_initial_opt.rpt" stat
+yosys wreduce 
+yosys peepopt
+yosys opt_clean
+yosys opt -full
+yosys booth
+yosys share
+yosys opt
+yosys memory -nomap
+yosys tee -q -o "${tmp_dir}/rpt_${top_design}_memories.rpt" stat
+yosys write_verilog -norename -noexpr -attr2comment ${tmp_dir}/${top_design}_yosys_memories.v
+yosys memory_map
+yosys opt -fast
+
+yosys opt_dff -sat -nodffe -nosdff
+yosys share
+yosys opt -full
+yosys clean -purge
+
+yosys write_verilog -norename ${tmp_dir}/${top_design}_yosys_abstract.v
+yosys tee -q -o "${tmp_dir}/rpt_${top_design}_abstract.rpt" stat -tech cmos
+
+yosys techmap
+yosys opt -fast
+yosys clean -purge
+
+
+# -----------------------------------------------------------------------------
+yosys tee -q -o "${tmp_dir}/rpt_${top_design}_generic.rpt" stat -tech cmos
+yosys tee -q -o "${tmp_dir}/rpt_${top_design}_generic.json" stat -json -tech cmos
+
+# flatten all hierarchy except marked modules
+yosys flatten
+
+yosys clean -purge
+
+
+# -----------------------------------------------------------------------------
+# Preserve flip-flop names as far as possible
+# split internal nets
+yosys splitnets -format __v
+# rename DFFs from the driven signal
+yosys rename -wire -suffix _reg t:*DFF*
+yosys select -write ${tmp_dir}/rpt_${top_design}_registers.rpt t:*DFF*
+# rename all other cells
+yosys autoname t:*DFF* %n
+yosys clean -purge
+
+# print paths to important instances (hierarchy and naming is final here)
+# yosys select -write ${tmp_dir}/rpt_${top_design}_registers.rpt t:*DFF*
+# yosys tee -q -o ${tmp_dir}/rpt_${top_design}_instances.rpt  select -list "t:RM_IHPSG13_*"
+# yosys tee -q -a ${tmp_dir}/rpt_${top_design}_instances.rpt  select -list "t:tc_clk*$*"
+
+
+# -----------------------------------------------------------------------------
+# mapping to technology
+
+# set don't use cells
+set dfflibmap_args ""
+foreach cell $dont_use_cells {
+  lappend dfflibmap_args -dont_use $cell
+}
+# first map flip-flops
+yosys dfflibmap {*}$tech_cells_args {*}$dfflibmap_args
@@ -0,0 +1,39 @@
+# Copyright (c) 2022 ETH Zurich and University of Bologna.
+# Licensed under the Apache License, Version 2.0, see LICENSE for details.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Authors:
+# - Philippe Sauter <phsauter@iis.ee.ethz.ch>
+
+# ABC mapping and final netlist, sourced by yosys_synthesis.tcl
+
+# then perform bit-level optimization and mapping on all combinational clouds in ABC
+# pre-process abc file (written to tmp directory)
+set abc_comb_script   [processAbcScript $abc_recipe]
+# call ABC
+yosys abc {*}$tech_cells_args -D $clk_period_ps -script $abc_comb_script -constr src/abc.constr -showtmp
+
+yosys clean -purge
+
+
+# -----------------------------------------------------------------------------
+# prep for openROAD
+# yosys write_verilog -norename -noexpr -attr2comment ${tmp_dir}/${top_design}_yosys_debug.v
+
+if {!$keep_ports} {
+    yosys splitnets -ports -format __v
+}
+yosys setundef -zero
+yosys clean -purge
+# map constants to tie cells
+yosys hilomap -singleton -hicell {*}$tech_cell_tiehi -locell {*}$tech_cell_tielo
+
+# final reports
+# yosys tee -q -o "${tmp_dir}/rpt_${top_design}_area.rpt" stat -top $top_design {*}$liberty_args
+# yosys tee -q -o "${tmp_dir}/rpt_${top_design}_area_logic.rpt" stat -top $top_design {*}$tech_cells_args
+yosys tee -q -o "${synth_stat_json}" stat -json {*}$liberty_args
+yosys tee -q -o "${synth_stat_json}.rpt" stat {*}$liberty_args
+yosys tee -q -o "${synth_check_txt}" check
+
+# final netlist
+yosys write_verilog -noattr -noexpr -nohex -nodec ${final_netlist_file}
@@ -0,0 +1,28 @@
+# Stitch the netlists of separately synthesized modules (step/synth_modules.py)
+# into the flat netlist and reports of yosys_synthesis.tcl
+
+if {[info script] ne ""} {
+    cd "[file dirname [info script]]/../"
+}
+source global_var.tcl
+
+# read liberty files and prepare some variables
+source scripts/init_tech.tcl
+
+# the mapped netlist of every module
+foreach file $verilog_files {
+    yosys read_verilog $file
+}
+
+yosys hierarchy -check -top $top_design
+yosys flatten
+yosys splitnets -ports -format __v
+yosys clean -purge
+
+# final reports
+yosys tee -q -o "${synth_stat_json}" stat -json {*}$liberty_args
+yosys tee -q -o "${synth_stat_json}.rpt" stat {*}$liberty_args
+yosys tee -q -o "${synth_check_txt}" check
+
+# final netlist
+yosys write_verilog -noattr -noexpr -nohex -nodec ${final_netlist_file}
@@ -34,114 +34,15 @@ set abc_script [processAbcScript scripts/abc-opt.script]
 # read liberty files and prepare some variables
 source scripts/init_tech.tcl
 
-foreach file $verilog_files {
-    yosys read_verilog $file
+# the ABC portfolio (step/abc_portfolio.py) elaborates once ("elaborate" stage,
+# the design is saved to DESIGN_RTLIL) and maps it with each recipe ("map" stage)
+if {$synth_stage ne "map"} {
+    source scripts/synth_elaborate.tcl
+} else {
+    yosys read_rtlil $design_rtlil
 }
-
-# -----------------------------------------------------------------------------
-# this section heavily borrows from the yosys synth command:
-# synth - check
-yosys hierarchy -top $top_design
-yosys check
-yosys proc
-yosys tee -q -o "${tmp_dir}/rpt_${top_design}_elaborated.rpt" stat
-yosys write_verilog -norename -noexpr -attr2comment ${tmp_dir}/${top_design}_yosys_elaborated.v
-
-# synth - coarse:
-# similar to yosys synth -run coarse -noalumacc
-yosys opt_expr
-yosys opt -noff
-yosys fsm
-yosys tee -q -o "${tmp_dir}/rpt_${top_design}_initial_opt.rpt" stat
-yosys wreduce 
-yosys peepopt
-yosys opt_clean
-yosys opt -full
-yosys booth
-yosys share
-yosys opt
-yosys memory -nomap
-yosys tee -q -o "${tmp_dir}/rpt_${top_design}_memories.rpt" stat
-yosys write_verilog -norename -noexpr -attr2comment ${tmp_dir}/${top_design}_yosys_memories.v
-yosys memory_map
-yosys opt -fast
-
-yosys opt_dff -sat -nodffe -nosdff
-yosys share
-yosys opt -full
-yosys clean -purge
-
-yosys write_verilog -norename ${tmp_dir}/${top_design}_yosys_abstract.v
-yosys tee -q -o "${tmp_dir}/rpt_${top_design}_abstract.rpt" stat -tech cmos
-
-yosys techmap
-yosys opt -fast
-yosys clean -purge
-
-
-# -----------------------------------------------------------------------------
-yosys tee -q -o "${tmp_dir}/rpt_${top_design}_generic.rpt" stat -tech cmos
-yosys tee -q -o "${tmp_dir}/rpt_${top_design}_generic.json" stat -json -tech cmos
-
-# flatten all hierarchy except marked modules
-yosys flatten
-
-yosys clean -purge
-
-
-# -----------------------------------------------------------------------------
-# Preserve flip-flop names as far as possible
-# split internal nets
-yosys splitnets -format __v
-# rename DFFs from the driven signal
-yosys rename -wire -suffix _reg t:*DFF*
-yosys select -write ${tmp_dir}/rpt_${top_design}_registers.rpt t:*DFF*
-# rename all other cells
-yosys autoname t:*DFF* %n
-yosys clean -purge
-
-# print paths to important instances (hierarchy and naming is final here)
-# yosys select -write ${tmp_dir}/rpt_${top_design}_registers.rpt t:*DFF*
-# yosys tee -q -o ${tmp_dir}/rpt_${top_design}_instances.rpt  select -list "t:RM_IHPSG13_*"
-# yosys tee -q -a ${tmp_dir}/rpt_${top_design}_instances.rpt  select -list "t:tc_clk*$*"
-
-
-# -----------------------------------------------------------------------------
-# mapping to technology
-
-# set don't use cells
-set dfflibmap_args ""
-foreach cell $dont_use_cells {
-  lappend dfflibmap_args -dont_use $cell
+if {$synth_stage eq "elaborate"} {
+    yosys write_rtlil $design_rtlil
+} else {
+    source scripts/synth_map.tcl
 }
-# first map flip-flops
-yosys dfflibmap {*}$tech_cells_args {*}$dfflibmap_args
-
-# then perform bit-level optimization and mapping on all combinational clouds in ABC
-# pre-process abc file (written to tmp directory)
-set abc_comb_script   [processAbcScript scripts/abc-opt.script]
-# call ABC
-yosys abc {*}$tech_cells_args -D $clk_period_ps -script $abc_comb_script -constr src/abc.constr -showtmp
-
-yosys clean -purge
-
-
-# -----------------------------------------------------------------------------
-# prep for openROAD
-# yosys write_verilog -norename -noexpr -attr2comment ${tmp_dir}/${top_design}_yosys_debug.v
-
-yosys splitnets -ports -format __v
-yosys setundef -zero
-yosys clean -purge
-# map constants to tie cells
-yosys hilomap -singleton -hicell {*}$tech_cell_tiehi -locell {*}$tech_cell_tielo
-
-# final reports
-# yosys tee -q -o "${tmp_dir}/rpt_${top_design}_area.rpt" stat -top $top_design {*}$liberty_args
-# yosys tee -q -o "${tmp_dir}/rpt_${top_design}_area_logic.rpt" stat -top $top_design {*}$tech_cells_args
-yosys tee -q -o "${synth_stat_json}" stat -json {*}$liberty_args
-yosys tee -q -o "${synth_stat_json}.rpt" stat {*}$liberty_args
-yosys tee -q -o "${synth_check_txt}" check
-
-# final netlist
-yosys write_verilog -noattr -noexpr -nohex -nodec ${final_netlist_file}